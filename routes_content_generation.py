@@ -3,9 +3,11 @@ Content Generation Routes
 Routes for accessing the four Content Generation AI Agents
 """
 
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, Response, stream_with_context
 import json
 import logging
+import time
+import threading
 from datetime import datetime
 
 # Import the content generation agents
@@ -13,9 +15,100 @@ from services.digital_course_creator import digital_course_creator
 from services.lead_magnet_generator import lead_magnet_generator
 from services.ebook_publishing_specialist import ebook_publishing_specialist
 from services.webinar_content_engine import webinar_content_engine
+from services.sympathetic_writing_agent import create_sympathetic_writing_agent
+from services.professional_thought_leader_agent import create_professional_thought_leader_agent
+from services.job_queue import get_shared_job_queue
+from services.content_store import ID_FIELDS, get_shared_content_store
+from services.export_engine import EXPORT_FORMATS, create_export_engine
 
 content_generation_bp = Blueprint('content_generation', __name__)
 
+# Shared objects are created on first use and reused across requests; the locks
+# stop concurrent first requests under a threaded server from building two
+_writing_agents = {}
+_writing_agents_lock = threading.Lock()
+
+def _get_writing_agent(agent_type):
+    """Return the shared sympathetic or professional writing agent"""
+    with _writing_agents_lock:
+        if agent_type not in _writing_agents:
+            if agent_type == 'sympathetic':
+                _writing_agents[agent_type] = create_sympathetic_writing_agent()
+            else:
+                _writing_agents[agent_type] = create_professional_thought_leader_agent()
+        return _writing_agents[agent_type]
+
+# Long-running generation runs on the job queue's workers instead of the request thread
+_GENERATORS = {
+    'course': digital_course_creator.create_complete_course,
+    'lead_magnet': lead_magnet_generator.create_lead_magnet_suite,
+    'ebook': ebook_publishing_specialist.create_complete_ebook,
+    'webinar': webinar_content_engine.create_complete_webinar_system
+}
+
+def _generate_and_store(kind, generate):
+    """Wrap a generator so successful results land in the content store for export"""
+    def handler(data):
+        result = generate(data)
+        if isinstance(result, dict) and result.get('success'):
+            # Same-second generations share an id; report the unique one the store assigned
+            result[ID_FIELDS[kind]] = get_shared_content_store().save(kind, result,
+                                                                      expertise_area=data.get('expertise_area', ''),
+                                                                      title=data.get('title', ''))
+        return result
+    return handler
+
+_JOB_HANDLERS = {kind: _generate_and_store(kind, generate) for kind, generate in _GENERATORS.items()}
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def _get_job_queue():
+    """Return the shared job queue with the generation handlers registered"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            job_queue = get_shared_job_queue()
+            for kind, handler in _JOB_HANDLERS.items():
+                job_queue.register(kind, handler)
+            job_queue.resume_queued()
+            _job_queue = job_queue
+        return _job_queue
+
+def _enqueue(kind, data, message, **extra):
+    """Queue a generation job and answer 202 with where to poll for it"""
+    job_id = _get_job_queue().submit(kind, data)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': url_for('content_generation.job_status', job_id=job_id),
+        'message': message,
+        **extra
+    }), 202
+
+_pdf_service = None
+_pdf_service_lock = threading.Lock()
+
+def _get_pdf_service():
+    """Return the shared PDF service, created on first use so fonts and stylesheets load once"""
+    global _pdf_service
+    with _pdf_service_lock:
+        if _pdf_service is None:
+            from services.pdf_generation_service import create_pdf_service
+            _pdf_service = create_pdf_service()
+        return _pdf_service
+
+_export_engine = None
+_export_engine_lock = threading.Lock()
+
+def _get_export_engine():
+    """Return the shared export engine; PDF and HTML exports reuse the shared PDF service"""
+    global _export_engine
+    with _export_engine_lock:
+        if _export_engine is None:
+            _export_engine = create_export_engine(get_shared_content_store(), pdf_service_factory=_get_pdf_service)
+        return _export_engine
+
 @content_generation_bp.route('/content-generation')
 def content_generation_dashboard():
     """Content Generation Dashboard"""
@@ -60,22 +153,9 @@ def create_course():
             'pricing_tier': request.form.get('pricing_tier', 'premium')
         }
         
-        # Create the course
-        result = digital_course_creator.create_complete_course(course_data)
+        # Create the course in the background
+        return _enqueue('course', course_data, 'Course creation started')
         
-        if result.get('success'):
-            return jsonify({
-                'success': True,
-                'course': result,
-                'message': 'Course created successfully!'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'message': 'Course creation failed'
-            })
-            
     except Exception as e:
         logging.error(f"Course creation error: {e}")
         return jsonify({
@@ -107,22 +187,9 @@ def create_lead_magnet():
             'conversion_goal': request.form.get('conversion_goal', 'course_enrollment')
         }
         
-        # Create the lead magnet
-        result = lead_magnet_generator.create_lead_magnet_suite(magnet_data)
+        # Create the lead magnet in the background
+        return _enqueue('lead_magnet', magnet_data, 'Lead magnet creation started')
         
-        if result.get('success'):
-            return jsonify({
-                'success': True,
-                'magnet': result,
-                'message': 'Lead magnet created successfully!'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'message': 'Lead magnet creation failed'
-            })
-            
     except Exception as e:
         logging.error(f"Lead magnet creation error: {e}")
         return jsonify({
@@ -154,22 +221,9 @@ def create_ebook():
             'pricing': request.form.get('pricing', 'premium')
         }
         
-        # Create the eBook
-        result = ebook_publishing_specialist.create_complete_ebook(book_data)
+        # Create the eBook in the background
+        return _enqueue('ebook', book_data, 'eBook creation started')
         
-        if result.get('success'):
-            return jsonify({
-                'success': True,
-                'ebook': result,
-                'message': 'eBook created successfully!'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'message': 'eBook creation failed'
-            })
-            
     except Exception as e:
         logging.error(f"eBook creation error: {e}")
         return jsonify({
@@ -202,22 +256,9 @@ def create_webinar():
             'pricing_tier': request.form.get('pricing_tier', 'premium')
         }
         
-        # Create the webinar
-        result = webinar_content_engine.create_complete_webinar_system(webinar_data)
+        # Create the webinar system in the background
+        return _enqueue('webinar', webinar_data, 'Webinar creation started')
         
-        if result.get('success'):
-            return jsonify({
-                'success': True,
-                'webinar': result,
-                'message': 'Webinar system created successfully!'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'message': 'Webinar creation failed'
-            })
-            
     except Exception as e:
         logging.error(f"Webinar creation error: {e}")
         return jsonify({
@@ -252,7 +293,7 @@ def quick_generate_content():
                 'duration_hours': 6,
                 'pricing_tier': 'premium'
             }
-            result = digital_course_creator.create_complete_course(course_data)
+            kind, data = 'course', course_data
             
         elif content_type == 'lead_magnet':
             magnet_data = {
@@ -262,7 +303,7 @@ def quick_generate_content():
                 'type': 'pdf_guide',
                 'conversion_goal': 'course_enrollment'
             }
-            result = lead_magnet_generator.create_lead_magnet_suite(magnet_data)
+            kind, data = 'lead_magnet', magnet_data
             
         elif content_type == 'ebook':
             book_data = {
@@ -272,7 +313,7 @@ def quick_generate_content():
                 'length': 'standard',
                 'pricing': 'premium'
             }
-            result = ebook_publishing_specialist.create_complete_ebook(book_data)
+            kind, data = 'ebook', book_data
             
         elif content_type == 'webinar':
             webinar_data = {
@@ -283,7 +324,7 @@ def quick_generate_content():
                 'conversion_goal': 'course_enrollment',
                 'pricing_tier': 'premium'
             }
-            result = webinar_content_engine.create_complete_webinar_system(webinar_data)
+            kind, data = 'webinar', webinar_data
             
         else:
             return jsonify({
@@ -292,20 +333,8 @@ def quick_generate_content():
                 'message': 'Content generation failed'
             })
         
-        if result.get('success'):
-            return jsonify({
-                'success': True,
-                'content': result,
-                'content_type': content_type,
-                'message': f'{content_type.title()} generated successfully!'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error'),
-                'message': f'{content_type.title()} generation failed'
-            })
-            
+        return _enqueue(kind, data, f'{content_type.title()} generation started', content_type=content_type)
+        
     except Exception as e:
         logging.error(f"Quick content generation error: {e}")
         return jsonify({
@@ -314,6 +343,104 @@ def quick_generate_content():
             'message': 'Content generation failed'
         })
 
+@content_generation_bp.route('/stream-content')
+def stream_content():
+    """Stream writing agent output to the browser as Server-Sent Events"""
+    agent_type = request.args.get('agent', 'professional')
+    topic = request.args.get('topic', '').strip()
+    target_length = request.args.get('target_length', 'medium')
+    
+    if agent_type not in ('sympathetic', 'professional') or not topic:
+        return jsonify({
+            'success': False,
+            'error': 'A topic and an agent of "sympathetic" or "professional" are required',
+            'message': 'Content streaming failed'
+        })
+    
+    agent = _get_writing_agent(agent_type)
+    if agent_type == 'sympathetic':
+        deltas = agent.generate_sympathetic_content(
+            topic, request.args.get('content_type', 'blog_post'), target_length, stream=True
+        )
+    else:
+        deltas = agent.generate_professional_content(
+            topic, request.args.get('content_type', 'thought_leadership'), target_length, stream=True
+        )
+    
+    def event_stream():
+        try:
+            for delta in deltas:
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            logging.error(f"Content streaming error: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(event_stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@content_generation_bp.route('/preview-content', methods=['POST'])
+def preview_content():
+    """Render content with a chosen backend: "draft" (HTML) or "draft-pdf" for previews, "weasyprint" for exports"""
+    data = request.get_json(silent=True) or request.form
+    content = data.get('content', '')
+    renderer = data.get('renderer', 'draft')
+    
+    if not content.strip():
+        return jsonify({
+            'success': False,
+            'error': 'Content is required',
+            'message': 'Preview failed'
+        })
+    
+    try:
+        started = time.perf_counter()
+        document, media_type = _get_pdf_service().render(
+            content, renderer, data.get('content_type', 'markdown'), data.get('theme')
+        )
+        if not document:
+            raise ValueError('Renderer produced an empty document')
+        
+        return Response(document, mimetype=media_type, headers={
+            'X-Renderer': renderer,
+            'X-Render-Seconds': f'{time.perf_counter() - started:.3f}'
+        })
+    except Exception as e:
+        logging.error(f"Content preview error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Preview failed'
+        })
+
+@content_generation_bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status of a background generation job, with its result once it has finished"""
+    job = _get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job id',
+            'message': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': {
+            'id': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'result': job['result'],
+            'error': job['error'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at']
+        }
+    })
+
 @content_generation_bp.route('/content-analytics')
 def content_analytics():
     """Content generation analytics and performance tracking"""
@@ -352,15 +479,31 @@ def content_analytics():
 
 @content_generation_bp.route('/export-content/<content_type>/<content_id>')
 def export_content(content_type, content_id):
-    """Export generated content in various formats"""
+    """Export generated content by id from the content store"""
     try:
-        # This would typically fetch the content from database
-        # For now, return a sample export
+        record = get_shared_content_store().get_record(content_id)
+        if record is None or record['content_type'] != content_type:
+            return jsonify({
+                'success': False,
+                'error': f'No stored {content_type} with id {content_id}',
+                'message': 'Content not found'
+            }), 404
+        
         export_data = {
             'content_type': content_type,
             'content_id': content_id,
-            'export_formats': ['PDF', 'DOCX', 'HTML', 'JSON'],
-            'export_url': f'/download/{content_type}/{content_id}',
+            'title': record['title'],
+            'expertise_area': record['expertise_area'],
+            'created_at': record['created_at'],
+            'export_formats': [export_format.upper() for export_format in EXPORT_FORMATS],
+            'export_url': url_for('content_generation.download_content', content_type=content_type,
+                                  content_id=content_id),
+            'download_urls': {
+                export_format: url_for('content_generation.download_content', content_type=content_type,
+                                       content_id=content_id, format=export_format)
+                for export_format in EXPORT_FORMATS
+            },
+            'content': record['content'],
             'message': f'{content_type.title()} ready for export'
         }
         
@@ -378,6 +521,72 @@ def export_content(content_type, content_id):
             'message': 'Export preparation failed'
         })
 
+@content_generation_bp.route('/download/<content_type>/<content_id>')
+def download_content(content_type, content_id):
+    """Stream a cached export (?format=pdf|docx|html|json), answering 304 when the client copy is current"""
+    export_format = request.args.get('format', 'pdf').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown export format: {export_format}',
+            'message': f'Choose one of {", ".join(EXPORT_FORMATS)}'
+        }), 400
+    
+    try:
+        engine = _get_export_engine()
+        info = engine.content_store.get_info(content_id)
+        if info is None or info['content_type'] != content_type:
+            return jsonify({
+                'success': False,
+                'error': f'No stored {content_type} with id {content_id}',
+                'message': 'Content not found'
+            }), 404
+        
+        # The ETag comes from store metadata, so a revalidation never touches the rendition
+        etag = engine.etag(content_id, export_format)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if request.if_none_match.contains_weak(etag.strip('"')):
+            return Response(status=304, headers=headers)
+        
+        rendition = engine.export(content_id, export_format)
+        headers.update({
+            'Content-Length': str(rendition.size),
+            'Content-Disposition': f'attachment; filename="{rendition.filename}"'
+        })
+        return Response(stream_with_context(engine.iter_chunks(rendition)), mimetype=rendition.media_type,
+                        headers=headers)
+        
+    except Exception as e:
+        logging.error(f"Content download error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Export failed'
+        }), 500
+
+@content_generation_bp.route('/stored-content')
+def stored_content():
+    """List stored content, newest first, filtered by type, expertise area and creation time"""
+    try:
+        items = get_shared_content_store().list(
+            content_type=request.args.get('type'),
+            expertise_area=request.args.get('expertise_area'),
+            since=request.args.get('since', type=float),
+            limit=min(request.args.get('limit', 50, type=int), 500)
+        )
+        return jsonify({
+            'success': True,
+            'items': items,
+            'count': len(items)
+        })
+    except Exception as e:
+        logging.error(f"Stored content listing error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Listing stored content failed'
+        })
+
 @content_generation_bp.route('/test-agents')
 def test_agents():
     """Test all content generation agents"""
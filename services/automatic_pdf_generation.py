@@ -7,20 +7,53 @@ articles, and blog posts.
 """
 
 import os
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from services.sympathetic_writing_agent import create_sympathetic_writing_agent
 from services.professional_thought_leader_agent import create_professional_thought_leader_agent
 from services.pdf_generation_service import create_pdf_service
+from services.openai_client_registry import get_shared_client_registry
+from services.document_preparation import find_title
+from services.keyword_matcher import create_keyword_matcher
+
+
+# Professional indicators
+PROFESSIONAL_KEYWORDS = [
+    "strategy", "framework", "methodology", "roi", "revenue", "profit",
+    "enterprise", "fortune", "competitive", "market", "analytics",
+    "implementation", "execution", "performance", "optimization",
+    "technology", "digital", "cloud", "ai", "data", "insights",
+    "transformation", "innovation", "scaling", "growth", "acquisition"
+]
+
+# Sympathetic indicators
+SYMPATHETIC_KEYWORDS = [
+    "journey", "story", "experience", "learn", "struggle", "failure",
+    "vulnerable", "authentic", "personal", "emotional", "relationship",
+    "trust", "connection", "human", "heart", "soul", "spiritual",
+    "cultural", "family", "challenge", "overcome", "growth", "wisdom"
+]
+
+# Structure markers that tip long, evenly scored documents to the professional agent
+LONG_FORM_KEYWORDS = ["chapter", "framework"]
 
 
 class AutomaticPDFGenerator:
     """Automatic PDF generation with AI agent enhancement for all content requests"""
     
-    def __init__(self):
-        self.sympathetic_agent = create_sympathetic_writing_agent()
-        self.professional_agent = create_professional_thought_leader_agent()
+    def __init__(self, client_registry=None):
+        # Both agents share the registry's pooled OpenAI connections
+        self.client_registry = client_registry or get_shared_client_registry()
+        self.sympathetic_agent = create_sympathetic_writing_agent(self.client_registry)
+        self.professional_agent = create_professional_thought_leader_agent(self.client_registry)
         self.pdf_service = create_pdf_service()
         
+        # Compiled once; routing is a single pass over the content however many keywords there are
+        self.keyword_matcher = create_keyword_matcher({
+            "professional": PROFESSIONAL_KEYWORDS,
+            "sympathetic": SYMPATHETIC_KEYWORDS,
+            "long_form": LONG_FORM_KEYWORDS
+        })
+        
         # Content type mappings for agent selection
         self.content_type_mapping = {
             # Personal/Emotional Content -> Sympathetic Agent
@@ -72,28 +105,10 @@ class AutomaticPDFGenerator:
             elif any(term in audience_lower for term in ["personal", "individual", "coaching", "development", "growth"]):
                 return "sympathetic"
         
-        # Analyze content for keywords
-        content_lower = content.lower()
-        
-        # Professional indicators
-        professional_keywords = [
-            "strategy", "framework", "methodology", "roi", "revenue", "profit",
-            "enterprise", "fortune", "competitive", "market", "analytics", 
-            "implementation", "execution", "performance", "optimization",
-            "technology", "digital", "cloud", "ai", "data", "insights",
-            "transformation", "innovation", "scaling", "growth", "acquisition"
-        ]
-        
-        # Sympathetic indicators  
-        sympathetic_keywords = [
-            "journey", "story", "experience", "learn", "struggle", "failure",
-            "vulnerable", "authentic", "personal", "emotional", "relationship",
-            "trust", "connection", "human", "heart", "soul", "spiritual",
-            "cultural", "family", "challenge", "overcome", "growth", "wisdom"
-        ]
-        
-        professional_score = sum(1 for keyword in professional_keywords if keyword in content_lower)
-        sympathetic_score = sum(1 for keyword in sympathetic_keywords if keyword in content_lower)
+        # Score both keyword lists in one pass over the content
+        scores = self.keyword_matcher.score(content)
+        professional_score = scores["professional"]
+        sympathetic_score = scores["sympathetic"]
         
         # Default to professional for business content, sympathetic for personal
         if professional_score > sympathetic_score:
@@ -102,11 +117,41 @@ class AutomaticPDFGenerator:
             return "sympathetic"
         else:
             # Default based on content length and structure
-            if len(content) > 5000 and ("chapter" in content_lower or "framework" in content_lower):
+            if len(content) > 5000 and scores["long_form"]:
                 return "professional"
             else:
                 return "sympathetic"
     
+    def determine_agent_types(self, documents: List[Dict]) -> List[str]:
+        """
+        Route many documents at once
+        
+        Each document is {"content"} plus optional "content_type" and
+        "target_audience"; all of them share the one compiled matcher.
+        """
+        
+        return [
+            self.determine_agent_type(doc["content"], doc.get("content_type"), doc.get("target_audience"))
+            for doc in documents
+        ]
+    
+    def enhance_content(self, content: str, agent_type: str, strict: bool = False) -> str:
+        """Apply the sympathetic or professional agent to content; strict raises EnhancementError on failure"""
+        
+        if agent_type == "sympathetic":
+            return self.sympathetic_agent.transform_to_sympathetic_style(content, strict=strict)
+        return self.professional_agent.transform_to_professional_style(content, "comprehensive", strict=strict)
+    
+    def pdf_filename(self, title: str, agent_type: str, custom_filename: str = None) -> str:
+        """Repository path of the enhanced PDF for a title"""
+        
+        if custom_filename:
+            base_filename = custom_filename.replace('.pdf', '').replace(' ', '-').lower()
+        else:
+            base_filename = title.replace(' ', '-').replace(':', '').replace(',', '').lower()
+        
+        return f"enhanced_content/{base_filename}-{agent_type}-enhanced.pdf"
+    
     def generate_enhanced_content_pdf(self, content: str, title: str, 
                                     content_type: str = None, 
                                     target_audience: str = None,
@@ -125,30 +170,18 @@ class AutomaticPDFGenerator:
             print(f"🤖 Using {agent_type.title()} AI Agent for content enhancement")
             
             # Apply appropriate AI agent
-            if agent_type == "sympathetic":
-                enhanced_content = self.sympathetic_agent.transform_to_sympathetic_style(content)
-                agent_label = "sympathetic-enhanced"
-            else:
-                enhanced_content = self.professional_agent.transform_to_professional_style(content, "comprehensive")
-                agent_label = "professional-enhanced"
-            
-            # Generate filename
-            if custom_filename:
-                base_filename = custom_filename.replace('.pdf', '').replace(' ', '-').lower()
-            else:
-                base_filename = title.replace(' ', '-').replace(':', '').replace(',', '').lower()
-            
-            pdf_filename = f"enhanced_content/{base_filename}-{agent_label}.pdf"
+            enhanced_content = self.enhance_content(content, agent_type)
+            pdf_filename = self.pdf_filename(title, agent_type, custom_filename)
             
-            # Generate PDF
-            pdf_content = self.pdf_service.generate_pdf(enhanced_content, pdf_filename)
+            # Generate PDF straight into the artifact cache
+            pdf_path = self.pdf_service.get_or_render_path(enhanced_content, pdf_filename, theme=agent_type)
             
-            if not pdf_content:
+            if not pdf_path:
                 return False, agent_type, ""
             
-            # Upload to GitHub
+            # Upload to GitHub, streaming from disk
             commit_message = f"Add {agent_type} enhanced content: {title}"
-            success = self.pdf_service.upload_pdf_to_github(pdf_content, pdf_filename, commit_message)
+            success = self.pdf_service.upload_file_to_github(pdf_path, pdf_filename, commit_message)
             
             if success:
                 github_url = f"https://github.com/{self.pdf_service.github_username}/{self.pdf_service.repo_name}/blob/main/{pdf_filename}"
@@ -174,13 +207,7 @@ class AutomaticPDFGenerator:
         
         if not title:
             # Extract title from content
-            lines = content.split('\n')
-            for line in lines:
-                if line.startswith('# '):
-                    title = line[2:].strip()
-                    break
-            if not title:
-                title = f"Enhanced {request_type.replace('_', ' ').title()}"
+            title = find_title(content, default="") or f"Enhanced {request_type.replace('_', ' ').title()}"
         
         print(f"📝 Processing {request_type.replace('_', ' ').title()}: {title}")
         print("=" * 60)
@@ -214,9 +241,9 @@ class AutomaticPDFGenerator:
 
 
 # Factory function for easy instantiation
-def create_automatic_pdf_generator() -> AutomaticPDFGenerator:
+def create_automatic_pdf_generator(client_registry=None) -> AutomaticPDFGenerator:
     """Create and return automatic PDF generator instance"""
-    return AutomaticPDFGenerator()
+    return AutomaticPDFGenerator(client_registry)
 
 
 # Convenience functions for different content types
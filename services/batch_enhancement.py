@@ -0,0 +1,549 @@
+"""
+Offline Batch Enhancement
+
+Bulk regeneration mode for Gilbert's writing agents. Instead of hundreds of
+interactive calls, every pending document is serialized as fused
+analyze+transform+polish requests into one JSONL job file, submitted as a
+single batch job, polled until it completes and mapped back onto its source
+documents, which are then rendered through PDFGenerationService. Progress is
+checkpointed after every stage so an interrupted overnight rebuild resumes
+where it stopped instead of paying for the same completions twice.
+"""
+
+import os
+import json
+import time
+import glob
+import shutil
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class BatchDocument:
+    """One source document tracked by a batch job"""
+    doc_id: str
+    title: str
+    source_path: str
+    output_path: str
+    agent_type: str
+    request_ids: List[str] = field(default_factory=list)
+    status: str = "pending"  # pending -> collected -> rendered, or failed
+    error: str = ""
+
+
+class BatchBackend(ABC):
+    """
+    Interface for submitting a JSONL job file of chat completion requests.
+
+    Lines follow the OpenAI Batch API format (`custom_id`, `method`, `url`,
+    `body`) and results come back keyed by `custom_id`, so a local stand-in can
+    replace the hosted service without changing the job logic.
+    """
+
+    @abstractmethod
+    def submit(self, job_file: str) -> str:
+        """Submit a JSONL job file and return the backend's batch id"""
+
+    @abstractmethod
+    def poll(self, batch_id: str) -> Dict:
+        """Return at least {"status": ...} for a submitted batch"""
+
+    @abstractmethod
+    def fetch_results(self, batch_id: str) -> Dict[str, Dict]:
+        """Return {custom_id: {"content": str} or {"error": str}} for a finished batch"""
+
+
+def _parse_result_lines(lines) -> Dict[str, Dict]:
+    """Map Batch API output lines onto {custom_id: {"content"} | {"error"}}"""
+
+    results = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            results[custom_id] = {"error": json.dumps(record.get("error") or response.get("body"))}
+            continue
+        choices = response.get("body", {}).get("choices") or [{}]
+        results[custom_id] = {"content": choices[0].get("message", {}).get("content") or ""}
+    return results
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Hosted OpenAI Batch API backend (24h completion window, separate rate limits)"""
+
+    def __init__(self, client=None, completion_window: str = "24h"):
+        if client is None:
+            # Not the agents' client: these calls bypass the rate limiter, so they need the SDK's retries
+            from services.openai_client_registry import get_shared_client_registry
+            client = get_shared_client_registry().get_batch_client()
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, job_file: str) -> str:
+        with open(job_file, 'rb') as handle:
+            uploaded = self.client.files.create(file=handle, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> Dict:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = getattr(batch, 'request_counts', None)
+        return {
+            "status": batch.status,
+            "completed": getattr(counts, 'completed', 0) if counts else 0,
+            "failed": getattr(counts, 'failed', 0) if counts else 0,
+            "total": getattr(counts, 'total', 0) if counts else 0,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id
+        }
+
+    def fetch_results(self, batch_id: str) -> Dict[str, Dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                results.update(_parse_result_lines(self.client.files.content(file_id).text.splitlines()))
+        return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Local stand-in that executes a job file with an ordinary completion function.
+
+    `complete` takes a request dict and returns the response text, e.g. an
+    agent's `_complete` with `stage` bound, so results still flow through the
+    response cache and the shared rate limiter. Given {agent type: function} instead, each line
+    goes to the agent named by its custom_id prefix, so every request is cached
+    and instrumented under its own agent. Output is written next to the job
+    file in Batch API format, which makes a finished local job resumable like a
+    hosted one.
+    """
+
+    def __init__(self, complete: Union[Callable[[Dict], Optional[str]], Dict[str, Callable[[Dict], Optional[str]]]],
+                 concurrency: int = 4):
+        self.complete = complete
+        self.concurrency = concurrency
+
+    def _completer(self, custom_id: str) -> Callable[[Dict], Optional[str]]:
+        if callable(self.complete):
+            return self.complete
+        agent_type = custom_id.split(":", 1)[0]
+        if agent_type not in self.complete:
+            raise KeyError(f"No completion function for agent '{agent_type}' ({custom_id})")
+        return self.complete[agent_type]
+
+    def _output_path(self, batch_id: str) -> str:
+        return f"{batch_id}.output.jsonl"
+
+    def _run_line(self, line: str) -> Dict:
+        record = json.loads(line)
+        try:
+            content = self._completer(record["custom_id"])(record["body"])
+            return {
+                "custom_id": record["custom_id"],
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+                "error": None
+            }
+        except Exception as e:
+            return {"custom_id": record["custom_id"], "response": None, "error": {"message": str(e)}}
+
+    def submit(self, job_file: str) -> str:
+        batch_id = os.path.splitext(job_file)[0]
+        with open(job_file, encoding='utf-8') as handle:
+            lines = [line for line in handle if line.strip()]
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            records = list(executor.map(self._run_line, lines))
+
+        with open(self._output_path(batch_id), 'w', encoding='utf-8') as handle:
+            for record in records:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return batch_id
+
+    def poll(self, batch_id: str) -> Dict:
+        done = os.path.exists(self._output_path(batch_id))
+        return {"status": "completed" if done else "failed"}
+
+    def fetch_results(self, batch_id: str) -> Dict[str, Dict]:
+        with open(self._output_path(batch_id), encoding='utf-8') as handle:
+            return _parse_result_lines(handle)
+
+
+class BatchEnhancementJob:
+    """
+    Checkpointed prepare -> submit -> poll -> collect -> render pipeline.
+
+    All state lives in `job_dir/checkpoint.json`; calling `run()` again after
+    an interruption continues from the last completed stage.
+    """
+
+    def __init__(self, job_dir: str, backend: BatchBackend, agents: Dict, pdf_service=None,
+                 determine_agent_type: Optional[Callable[[str], str]] = None,
+                 target_enhancement: str = "comprehensive", max_attempts: int = 2, render_pool=None):
+        """
+        Args:
+            job_dir: Directory holding the job files, results and checkpoint
+            backend: Batch backend used to run the job files
+            agents: {"sympathetic": agent, "professional": agent}
+            pdf_service: PDFGenerationService used to render collected documents
+            determine_agent_type: Picks an agent for a document when none is given
+            target_enhancement: Enhancement passed to the agents' fused requests
+            max_attempts: Submissions allowed before pending requests are marked failed
+            render_pool: Optional PDFRenderPool that lays documents out in parallel
+        """
+        self.job_dir = job_dir
+        self.backend = backend
+        self.agents = agents
+        self.pdf_service = pdf_service
+        self.determine_agent_type = determine_agent_type
+        self.target_enhancement = target_enhancement
+        self.max_attempts = max_attempts
+        self.render_pool = render_pool
+        self.checkpoint_path = os.path.join(job_dir, "checkpoint.json")
+        os.makedirs(job_dir, exist_ok=True)
+        self.state = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict:
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as handle:
+                state = json.load(handle)
+            state["documents"] = [BatchDocument(**doc) for doc in state["documents"]]
+            state.setdefault("sources", {})
+            return state
+        return {"documents": [], "requests": {}, "sources": {}, "results": {}, "batches": [], "attempts": 0}
+
+    def _save_checkpoint(self):
+        """Write the checkpoint atomically so a crash never leaves it half written"""
+
+        state = dict(self.state, documents=[asdict(doc) for doc in self.state["documents"]])
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle, ensure_ascii=False)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def _fused_requests(self, agent, content: str) -> List[Tuple[Dict, str]]:
+        """One (fused request, source text) pair per manuscript chunk, carrying the previous chunk's tail as context"""
+
+        if not agent.chunker.needs_chunking(content):
+            return [(agent.fused_transformation_request(content, self.target_enhancement), content)]
+        return [
+            (agent.fused_transformation_request(chunk.text, self.target_enhancement, chunk.context), chunk.text)
+            for chunk in agent.chunker.split(content)
+        ]
+
+    def add_documents(self, documents: List[Dict]):
+        """
+        Queue documents for the next submission.
+
+        Each document is {"source_path", "output_path"} plus optional
+        "content", "title" and "agent_type". Documents already in the
+        checkpoint are skipped, so re-adding a directory is safe.
+        """
+
+        known = {doc.source_path for doc in self.state["documents"]}
+        for document in documents:
+            if document["source_path"] in known:
+                continue
+
+            content = document.get("content")
+            if content is None:
+                with open(document["source_path"], encoding='utf-8') as handle:
+                    content = handle.read()
+
+            agent_type = document.get("agent_type")
+            if not agent_type:
+                agent_type = self.determine_agent_type(content) if self.determine_agent_type else "sympathetic"
+
+            doc = BatchDocument(
+                doc_id=f"doc-{len(self.state['documents']):05d}",
+                title=document.get("title") or os.path.splitext(os.path.basename(document["source_path"]))[0],
+                source_path=document["source_path"],
+                output_path=document["output_path"],
+                agent_type=agent_type
+            )
+            for index, (request, source) in enumerate(self._fused_requests(self.agents[agent_type], content)):
+                # The agent type prefix lets a local backend answer with the right agent
+                request_id = f"{agent_type}:{doc.doc_id}:{index:03d}"
+                doc.request_ids.append(request_id)
+                self.state["requests"][request_id] = request
+                self.state["sources"][request_id] = source
+
+            self.state["documents"].append(doc)
+            known.add(doc.source_path)
+
+        self._save_checkpoint()
+
+    def _pending_request_ids(self) -> List[str]:
+        return [request_id for request_id in self.state["requests"] if request_id not in self.state["results"]]
+
+    def _in_flight(self) -> Optional[Dict]:
+        """The submitted batch whose results have not been collected yet, if any"""
+        batches = self.state["batches"]
+        return batches[-1] if batches and not batches[-1].get("collected") else None
+
+    def write_job_file(self) -> Optional[str]:
+        """Serialize every request without a result to a new JSONL job file"""
+
+        pending = self._pending_request_ids()
+        if not pending:
+            return None
+
+        job_file = os.path.join(self.job_dir, f"batch-{len(self.state['batches']) + 1:03d}.jsonl")
+        with open(job_file, 'w', encoding='utf-8') as handle:
+            for request_id in pending:
+                handle.write(json.dumps({
+                    "custom_id": request_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self.state["requests"][request_id]
+                }, ensure_ascii=False) + "\n")
+        return job_file
+
+    def submit(self) -> Optional[str]:
+        """Submit pending requests unless a batch is already in flight"""
+
+        in_flight = self._in_flight()
+        if in_flight:
+            return in_flight["batch_id"]
+
+        job_file = self.write_job_file()
+        if not job_file:
+            return None
+
+        batch_id = self.backend.submit(job_file)
+        self.state["batches"].append({"batch_id": batch_id, "job_file": job_file, "status": "submitted"})
+        self.state["attempts"] += 1
+        self._save_checkpoint()
+        print(f"📤 Submitted batch {batch_id} ({len(self._pending_request_ids())} requests)")
+        return batch_id
+
+    def wait(self, poll_interval: float = 60.0, timeout: Optional[float] = None) -> Dict:
+        """Poll the in-flight batch until it reaches a terminal status"""
+
+        batch = self.state["batches"][-1]
+        started = time.monotonic()
+        while True:
+            status = self.backend.poll(batch["batch_id"])
+            if batch["status"] != status["status"]:
+                batch["status"] = status["status"]
+                self._save_checkpoint()
+            if status["status"] in TERMINAL_STATUSES:
+                return status
+            if timeout is not None and time.monotonic() - started > timeout:
+                return status
+            print(f"⏳ Batch {batch['batch_id']}: {status['status']}")
+            time.sleep(poll_interval)
+
+    def collect(self):
+        """Map finished results back onto their documents"""
+
+        batch = self._in_flight()
+        if batch is None or batch["status"] not in TERMINAL_STATUSES:
+            return
+
+        if batch["status"] == "completed":
+            for request_id, result in self.backend.fetch_results(batch["batch_id"]).items():
+                if "content" in result and request_id in self.state["requests"]:
+                    self.state["results"][request_id] = result["content"]
+        batch["collected"] = True
+
+        for doc in self.state["documents"]:
+            if doc.status == "pending" and all(rid in self.state["results"] for rid in doc.request_ids):
+                doc.status = "collected"
+            elif doc.status == "pending" and self.state["attempts"] >= self.max_attempts:
+                doc.status = "failed"
+                doc.error = "no result after maximum attempts"
+
+        self._save_checkpoint()
+
+    def _assemble(self, doc: BatchDocument) -> str:
+        """
+        Parse each chunk's fused response and reassemble the document in order.
+
+        Like the interactive path, a chunk whose response is missing, malformed
+        or refused keeps its source text instead of dropping out of the book.
+        """
+
+        agent = self.agents[doc.agent_type]
+        parts = []
+        for request_id in doc.request_ids:
+            response_content = self.state["results"][request_id]
+            try:
+                _, final_content = agent.parse_fused_response(response_content)
+            except ValueError:
+                final_content = ""
+
+            if not final_content:
+                print(f"⚠️ No usable batch response for {request_id}; keeping the source text")
+                parts.append(self.state["sources"].get(request_id, ""))
+                continue
+
+            # Seed the interactive cache so later single-document runs are free
+            if agent.response_cache:
+                agent.response_cache.set(agent.response_cache.key_for_request(self.state["requests"][request_id]),
+                                         response_content)
+            parts.append(final_content)
+        return agent.chunker.reassemble(parts)
+
+    def _submit_render(self, doc: BatchDocument) -> Future:
+        """Queue a document on the render pool, surfacing assembly errors through the future"""
+
+        try:
+            return self.render_pool.submit(self._assemble(doc), doc.output_path, theme=doc.agent_type)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def render(self, upload: bool = False) -> List[BatchDocument]:
+        """Render every collected document to PDF through the PDF service"""
+
+        collected = [doc for doc in self.state["documents"] if doc.status == "collected"]
+        # With a render pool every document is queued up front and laid out in parallel
+        futures = {doc.doc_id: self._submit_render(doc) for doc in collected} if self.render_pool else {}
+
+        rendered = []
+        for doc in collected:
+            try:
+                directory = os.path.dirname(doc.output_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+
+                if doc.doc_id in futures:
+                    # The worker rendered into the artifact cache; copy the file rather than pass bytes around
+                    pdf_path = futures[doc.doc_id].result()
+                    if not pdf_path:
+                        raise ValueError("PDF rendering failed")
+                    shutil.copyfile(pdf_path, doc.output_path)
+                elif not self.pdf_service.render_to_file(self._assemble(doc), doc.output_path, theme=doc.agent_type):
+                    raise ValueError("PDF rendering failed")
+
+                doc.status = "rendered"
+                rendered.append(doc)
+                print(f"✅ {doc.output_path}")
+            except Exception as e:
+                doc.status = "failed"
+                doc.error = str(e)
+                print(f"❌ {doc.output_path}: {e}")
+            self._save_checkpoint()
+
+        if upload and rendered:
+            # One commit for the whole batch instead of one Contents API commit per PDF
+            self.pdf_service.publish_files(
+                {doc.output_path: doc.output_path for doc in rendered},
+                f"Add {len(rendered)} enhanced document(s) from batch {os.path.basename(self.job_dir)}"
+            )
+
+        return rendered
+
+    def run(self, poll_interval: float = 60.0, upload: bool = False) -> Dict:
+        """Drive the job to completion, resuming from the checkpoint"""
+
+        while True:
+            if self._in_flight():
+                self.wait(poll_interval)
+                self.collect()
+            elif not (self._pending_request_ids() and self.state["attempts"] < self.max_attempts and self.submit()):
+                break
+
+        self.render(upload)
+        return self.get_summary()
+
+    def get_summary(self) -> Dict:
+        """Return document counts by status and batch history"""
+
+        counts: Dict[str, int] = {}
+        for doc in self.state["documents"]:
+            counts[doc.status] = counts.get(doc.status, 0) + 1
+        return {
+            "documents": len(self.state["documents"]),
+            "requests": len(self.state["requests"]),
+            "results": len(self.state["results"]),
+            "status_counts": counts,
+            "batches": [batch["batch_id"] for batch in self.state["batches"]],
+            "failed": {doc.source_path: doc.error for doc in self.state["documents"] if doc.status == "failed"}
+        }
+
+
+def documents_from_directory(source_dir: str, output_dir: str, pattern: str = "*.md",
+                             agent_type: Optional[str] = None) -> List[Dict]:
+    """Describe every markdown file in `source_dir` as a batch document rendering into `output_dir`"""
+
+    documents = []
+    for source_path in sorted(glob.glob(os.path.join(source_dir, pattern))):
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        documents.append({
+            "source_path": source_path,
+            "output_path": os.path.join(output_dir, f"{stem}.pdf"),
+            "agent_type": agent_type
+        })
+    return documents
+
+
+def create_batch_enhancement_job(job_dir: str, backend: str = "openai", render_workers: int = 0,
+                                 **kwargs) -> BatchEnhancementJob:
+    """Factory function to create a batch enhancement job wired to the automatic PDF generator"""
+    # Imported here so the job and backends stay usable without WeasyPrint or OpenAI installed
+    from services.automatic_pdf_generation import create_automatic_pdf_generator
+
+    generator = create_automatic_pdf_generator()
+    agents = {"sympathetic": generator.sympathetic_agent, "professional": generator.professional_agent}
+
+    if backend == "local":
+        batch_backend = LocalBatchBackend({
+            agent_type: functools.partial(agent._complete, stage="batch") for agent_type, agent in agents.items()
+        })
+    else:
+        batch_backend = OpenAIBatchBackend()
+
+    render_pool = None
+    if render_workers:
+        from services.pdf_render_pool import create_pdf_render_pool
+        render_pool = create_pdf_render_pool(max_workers=render_workers)
+
+    return BatchEnhancementJob(
+        job_dir, batch_backend, agents, generator.pdf_service,
+        determine_agent_type=generator.determine_agent_type, render_pool=render_pool, **kwargs
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Regenerate enhanced documents through one offline batch job")
+    parser.add_argument("source_dir", help="Directory of markdown source documents")
+    parser.add_argument("--output-dir", default="enhanced_content/additional-legal-documents")
+    parser.add_argument("--job-dir", default=os.path.join(".cache", "batch_jobs", "additional-legal-documents"))
+    parser.add_argument("--backend", choices=["openai", "local"], default="openai")
+    parser.add_argument("--agent", choices=["sympathetic", "professional"], default=None)
+    parser.add_argument("--poll-interval", type=float, default=60.0)
+    parser.add_argument("--upload", action="store_true", help="Also upload rendered PDFs to GitHub")
+    parser.add_argument("--render-workers", type=int, default=os.cpu_count() or 1,
+                        help="PDF render processes (0 renders in this process)")
+    args = parser.parse_args()
+
+    job = create_batch_enhancement_job(args.job_dir, args.backend, render_workers=args.render_workers)
+    job.add_documents(documents_from_directory(args.source_dir, args.output_dir, agent_type=args.agent))
+    try:
+        summary = job.run(poll_interval=args.poll_interval, upload=args.upload)
+    finally:
+        if job.render_pool:
+            job.render_pool.shutdown()
+
+    print("\n📊 Batch Summary:")
+    print(json.dumps(summary, indent=2))
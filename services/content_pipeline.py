@@ -0,0 +1,305 @@
+"""
+Staged Content Pipeline
+
+Directory-scale entry point for AutomaticPDFGenerator. Markdown sources are
+discovered under the content directories and pushed through routing, LLM
+enhancement, PDF rendering and upload as separate stages. Each stage has its
+own worker threads and hands items to the next through a bounded queue, so
+slow LLM calls for one document overlap with WeasyPrint layout and uploads of
+others instead of alternating with them, and memory stays bounded however
+many sources there are. Per-stage throughput is reported at the end.
+"""
+
+import os
+import glob
+import time
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from services.document_preparation import find_title
+
+
+DEFAULT_SOURCE_DIRS = ("generated_ebooks", "generated_lead_magnets", "video_scripts")
+
+# Request type by source directory, as passed to process_content_request
+REQUEST_TYPES = {
+    "generated_ebooks": "ebook",
+    "generated_lead_magnets": "lead_magnet",
+    "video_scripts": "video_script",
+}
+
+_DONE = object()
+
+
+@dataclass
+class PipelineItem:
+    """One source document moving through the stages"""
+    source_path: str
+    request_type: str
+    content: str = ""
+    title: str = ""
+    agent_type: str = ""
+    enhanced_content: str = ""
+    pdf_filename: str = ""
+    pdf_path: str = ""
+    uploaded: bool = False
+    failed_stage: str = ""
+    error: str = ""
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class StageStats:
+    """Counters for one stage"""
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per second of the stage's wall time"""
+        elapsed = self.finished_at - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class StagedPipeline:
+    """Runs items through named stages, each with its own threads and a bounded input queue"""
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable, int]], queue_size: int = 8):
+        """
+        Args:
+            stages: (name, function, workers); a function takes an item and returns it, raising to fail it
+            queue_size: Capacity of the queue in front of every stage
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats: List[StageStats] = self._new_stats()
+
+    def _new_stats(self) -> List[StageStats]:
+        return [StageStats(name, max(1, workers)) for name, _, workers in self.stages]
+
+    def run(self, items) -> List:
+        """Feed `items` through every stage and return them all, failed ones included"""
+
+        # Fresh counters each run, so `stats` always describes the latest run only
+        run_stats = self.stats = self._new_stats()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        finished: List = []
+        finished_lock = threading.Lock()
+        threads = []
+
+        for index, (name, function, _) in enumerate(self.stages):
+            stats = run_stats[index]
+            remaining = [stats.workers]
+            lock = threading.Lock()
+
+            def work(index=index, name=name, function=function, stats=stats, remaining=remaining, lock=lock):
+                source = queues[index]
+                target = queues[index + 1] if index + 1 < len(queues) else None
+                while True:
+                    item = source.get()
+                    if item is _DONE:
+                        break
+
+                    started = time.perf_counter()
+                    with lock:
+                        stats.started_at = stats.started_at or started
+                    try:
+                        item = function(item)
+                        failed = False
+                    except Exception as e:
+                        item.failed_stage, item.error = name, str(e)
+                        failed = True
+                    elapsed = time.perf_counter() - started
+                    item.stage_seconds[name] = elapsed
+
+                    with lock:
+                        stats.busy_seconds += elapsed
+                        stats.failed += failed
+                        stats.processed += not failed
+                        stats.finished_at = time.perf_counter()
+
+                    if failed or target is None:
+                        with finished_lock:
+                            finished.append(item)
+                    else:
+                        target.put(item)
+
+                # The last worker out tells every worker of the next stage to stop
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and target is not None:
+                    for _ in range(run_stats[index + 1].workers):
+                        target.put(_DONE)
+
+            for _ in range(stats.workers):
+                thread = threading.Thread(target=work, name=f"pipeline-{name}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(run_stats[0].workers):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        return finished
+
+
+def discover_sources(source_dirs: Sequence[str] = DEFAULT_SOURCE_DIRS, pattern: str = "*.md") -> List[PipelineItem]:
+    """Find markdown sources (recursively) and tag each with the request type of its directory"""
+
+    items = []
+    for source_dir in source_dirs:
+        request_type = REQUEST_TYPES.get(os.path.basename(os.path.normpath(source_dir)), "content")
+        for source_path in sorted(glob.glob(os.path.join(source_dir, "**", pattern), recursive=True)):
+            items.append(PipelineItem(source_path, request_type))
+    return items
+
+
+class ContentPipeline:
+    """Route -> enhance -> render -> upload over AutomaticPDFGenerator, with per-stage concurrency"""
+
+    def __init__(self, generator, enhance_workers: int = 4, render_workers: int = 2, upload_workers: int = 4,
+                 queue_size: int = 8, upload: bool = True, render_pool=None):
+        """
+        Args:
+            generator: AutomaticPDFGenerator supplying routing, agents and the PDF service
+            enhance_workers: Concurrent LLM enhancements
+            render_workers: Concurrent renders; with a render pool these run in its processes
+            upload_workers: Concurrent uploads over the PDF service's pooled session
+            queue_size: Items buffered between stages
+            upload: Set False to stop after rendering
+            render_pool: Optional PDFRenderPool so layout uses several cores
+        """
+        self.generator = generator
+        self.pdf_service = generator.pdf_service
+        self.render_pool = render_pool
+        stages = [
+            ("route", self._route, 1),
+            ("enhance", self._enhance, enhance_workers),
+            ("render", self._render, render_workers),
+        ]
+        if upload:
+            stages.append(("upload", self._upload, upload_workers))
+        self.pipeline = StagedPipeline(stages, queue_size)
+
+    def _route(self, item: PipelineItem) -> PipelineItem:
+        with open(item.source_path, encoding='utf-8') as handle:
+            item.content = handle.read()
+        stem = os.path.splitext(os.path.basename(item.source_path))[0]
+        item.title = find_title(item.content, default=stem.replace('_', ' ').replace('-', ' ').title())
+        item.agent_type = self.generator.determine_agent_type(item.content)
+        item.pdf_filename = self.generator.pdf_filename(item.title, item.agent_type, stem)
+        return item
+
+    def _enhance(self, item: PipelineItem) -> PipelineItem:
+        # strict: a failed LLM step fails the item here instead of rendering the unenhanced source
+        item.enhanced_content = self.generator.enhance_content(item.content, item.agent_type, strict=True)
+        return item
+
+    def _render(self, item: PipelineItem) -> PipelineItem:
+        if self.render_pool:
+            # Layout happens in the pool's processes, which render into the shared artifact cache
+            item.pdf_path = self.render_pool.submit(item.enhanced_content, item.pdf_filename, "markdown",
+                                                    item.agent_type).result()
+        else:
+            item.pdf_path = self.pdf_service.get_or_render_path(item.enhanced_content, item.pdf_filename,
+                                                                theme=item.agent_type)
+        if not item.pdf_path:
+            raise ValueError("PDF rendering failed")
+        return item
+
+    def _upload(self, item: PipelineItem) -> PipelineItem:
+        commit_message = f"Add {item.agent_type} enhanced {item.request_type.replace('_', ' ')}: {item.title}"
+        if not self.pdf_service.upload_file_to_github(item.pdf_path, item.pdf_filename, commit_message):
+            raise ValueError("upload failed")
+        item.uploaded = True
+        return item
+
+    def run(self, items: List[PipelineItem]) -> Dict:
+        """Process every item and return the per-stage report"""
+
+        started = time.perf_counter()
+        finished = self.pipeline.run(items)
+        wall_seconds = time.perf_counter() - started
+
+        return {
+            "documents": len(items),
+            "succeeded": sum(1 for item in finished if not item.failed_stage),
+            "wall_seconds": round(wall_seconds, 3),
+            "stages": {
+                stats.name: {
+                    "workers": stats.workers,
+                    "processed": stats.processed,
+                    "failed": stats.failed,
+                    "busy_seconds": round(stats.busy_seconds, 3),
+                    "items_per_second": round(stats.throughput, 3)
+                }
+                for stats in self.pipeline.stats
+            },
+            "failed": {item.source_path: f"{item.failed_stage}: {item.error}" for item in finished if item.failed_stage}
+        }
+
+
+def print_pipeline_report(report: Dict):
+    """Print per-stage throughput for the CLI"""
+
+    print(f"\n📊 {report['succeeded']}/{report['documents']} documents in {report['wall_seconds']:.1f}s")
+    print(f"{'Stage':<10} {'Workers':>7} {'Done':>6} {'Failed':>6} {'Busy s':>9} {'Items/s':>8}")
+    for name, stage in report["stages"].items():
+        print(f"{name:<10} {stage['workers']:>7} {stage['processed']:>6} {stage['failed']:>6} "
+              f"{stage['busy_seconds']:>9.1f} {stage['items_per_second']:>8.2f}")
+    for source_path, error in report["failed"].items():
+        print(f"❌ {source_path}: {error}")
+
+
+def create_content_pipeline(render_processes: int = 0, **kwargs) -> ContentPipeline:
+    """Factory function to create a content pipeline wired to the automatic PDF generator"""
+    # Imported here so the pipeline stays usable without WeasyPrint or OpenAI installed
+    from services.automatic_pdf_generation import create_automatic_pdf_generator
+
+    render_pool = None
+    if render_processes:
+        from services.pdf_render_pool import create_pdf_render_pool
+        render_pool = create_pdf_render_pool(max_workers=render_processes)
+
+    return ContentPipeline(create_automatic_pdf_generator(), render_pool=render_pool, **kwargs)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enhance, render and upload every markdown source in staged batches")
+    parser.add_argument("source_dirs", nargs="*", default=list(DEFAULT_SOURCE_DIRS))
+    parser.add_argument("--pattern", default="*.md")
+    parser.add_argument("--enhance-workers", type=int, default=4)
+    parser.add_argument("--render-workers", type=int, default=2)
+    parser.add_argument("--render-processes", type=int, default=0,
+                        help="Lay out PDFs in a process pool of this size (0 renders in this process)")
+    parser.add_argument("--upload-workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--no-upload", action="store_true", help="Stop after rendering")
+    args = parser.parse_args()
+
+    content_pipeline = create_content_pipeline(
+        render_processes=args.render_processes,
+        enhance_workers=args.enhance_workers,
+        render_workers=max(args.render_workers, args.render_processes),
+        upload_workers=args.upload_workers,
+        queue_size=args.queue_size,
+        upload=not args.no_upload
+    )
+    try:
+        print_pipeline_report(content_pipeline.run(discover_sources(args.source_dirs, args.pattern)))
+    finally:
+        if content_pipeline.render_pool:
+            content_pipeline.render_pool.shutdown()
@@ -0,0 +1,209 @@
+"""
+Generated Content Store
+
+Persists the dictionaries returned by the content generation agents so
+exports are a lookup instead of a regeneration. Payloads are stored as
+zlib-compressed JSON in SQLite, keyed by the generator's own id
+(course_id, magnet_id, book_id, webinar_id) and indexed by content type,
+expertise area and creation time for listing.
+"""
+
+import os
+import json
+import time
+import uuid
+import zlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+DEFAULT_CONTENT_DB = os.path.join('.cache', 'content_store.sqlite3')
+
+# Field holding the generated id, by content type
+ID_FIELDS = {
+    "course": "course_id",
+    "lead_magnet": "magnet_id",
+    "ebook": "book_id",
+    "webinar": "webinar_id",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    content_id TEXT PRIMARY KEY,
+    content_type TEXT NOT NULL,
+    expertise_area TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    raw_size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contents_type_area_created ON contents (content_type, expertise_area, created_at);
+CREATE INDEX IF NOT EXISTS contents_created ON contents (created_at);
+"""
+
+_METADATA_COLUMNS = "content_id, content_type, expertise_area, title, created_at, raw_size, LENGTH(payload) AS stored_size"
+
+
+class ContentStore:
+    """SQLite store of compressed generator payloads"""
+
+    def __init__(self, db_path: str = DEFAULT_CONTENT_DB, compression_level: int = 6):
+        """
+        Args:
+            db_path: SQLite file holding the payloads
+            compression_level: zlib level (1 fastest, 9 smallest)
+        """
+        self.db_path = db_path
+        self.compression_level = compression_level
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def save(self, content_type: str, content: Dict, expertise_area: str = "", title: str = "",
+             content_id: Optional[str] = None, replace: bool = False) -> str:
+        """
+        Compress and store a generator result; returns its content id.
+
+        Generator ids only have one-second resolution, so an id that is already
+        taken gets a random suffix rather than overwriting the earlier content,
+        and the payload's id field is rewritten to match. Pass replace=True to
+        store a new version under an existing id on purpose.
+        """
+
+        id_field = ID_FIELDS.get(content_type, "")
+        content_id = content_id or content.get(id_field)
+        if not content_id:
+            raise ValueError(f"No content id in {content_type} payload")
+
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        connection = self._connect()
+        try:
+            candidate = content_id
+            while True:
+                payload = dict(content, **{id_field: candidate}) if candidate != content_id else content
+                raw = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+                try:
+                    with connection:
+                        connection.execute(
+                            f"{verb} INTO contents "
+                            "(content_id, content_type, expertise_area, title, created_at, raw_size, payload) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (candidate, content_type, expertise_area or "", title or "", time.time(), len(raw),
+                             zlib.compress(raw, self.compression_level))
+                        )
+                    return candidate
+                except sqlite3.IntegrityError:
+                    candidate = f"{content_id}_{uuid.uuid4().hex[:8]}"
+        finally:
+            connection.close()
+
+    def get_record(self, content_id: str) -> Optional[Dict]:
+        """Metadata plus the decompressed payload under "content", or None"""
+
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                f"SELECT {_METADATA_COLUMNS}, payload FROM contents WHERE content_id = ?", (content_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+
+        record = dict(row)
+        record["content"] = json.loads(zlib.decompress(record.pop("payload")).decode('utf-8'))
+        return record
+
+    def get_info(self, content_id: str) -> Optional[Dict]:
+        """Metadata only, without reading or decompressing the payload"""
+
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                f"SELECT {_METADATA_COLUMNS} FROM contents WHERE content_id = ?", (content_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        return dict(row) if row else None
+
+    def get(self, content_id: str) -> Optional[Dict]:
+        """The stored payload, or None"""
+        record = self.get_record(content_id)
+        return record["content"] if record else None
+
+    def list(self, content_type: Optional[str] = None, expertise_area: Optional[str] = None,
+             since: Optional[float] = None, limit: int = 50) -> List[Dict]:
+        """Metadata of stored content, newest first, without decompressing payloads"""
+
+        clauses, params = [], []
+        for column, value in (("content_type", content_type), ("expertise_area", expertise_area)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT {_METADATA_COLUMNS} FROM contents {where} ORDER BY created_at DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows]
+
+    def delete(self, content_id: str) -> bool:
+        connection = self._connect()
+        try:
+            with connection:
+                return connection.execute("DELETE FROM contents WHERE content_id = ?", (content_id,)).rowcount == 1
+        finally:
+            connection.close()
+
+    def get_stats(self) -> Dict:
+        """Entry counts per type and raw vs stored bytes"""
+
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT content_type, COUNT(*) AS entries, SUM(raw_size) AS raw_bytes, "
+                "SUM(LENGTH(payload)) AS stored_bytes FROM contents GROUP BY content_type"
+            ).fetchall()
+        finally:
+            connection.close()
+        return {row["content_type"]: {"entries": row["entries"], "raw_bytes": row["raw_bytes"],
+                                      "stored_bytes": row["stored_bytes"]} for row in rows}
+
+
+_shared_store: Optional[ContentStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def create_content_store(db_path: str = DEFAULT_CONTENT_DB, **kwargs) -> ContentStore:
+    """Factory function to create a content store"""
+    return ContentStore(db_path, **kwargs)
+
+
+def get_shared_content_store() -> ContentStore:
+    """Return the process-wide content store (CONTENT_STORE_DB overrides the location)"""
+    global _shared_store
+
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = create_content_store(os.environ.get('CONTENT_STORE_DB', DEFAULT_CONTENT_DB))
+        return _shared_store
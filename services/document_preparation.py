@@ -0,0 +1,127 @@
+"""
+Document Preparation
+
+Parses markdown once and shares the result between enhancement, rendering and
+export. A PreparedDocument carries the title (found with one regex search
+instead of a line-by-line split), the converted HTML, the table of contents
+and the heading anchors, and is memoized by content hash in a bounded LRU, so
+repeated renders of the same text never run markdown2 again.
+"""
+
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+
+MARKDOWN_EXTRAS = ['fenced-code-blocks', 'tables', 'header-ids', 'toc']
+DEFAULT_TITLE = "Enhanced Content"
+
+TITLE_PATTERN = re.compile(r'^# (.*)$', re.MULTILINE)
+HEADING_PATTERN = re.compile(r'<h([1-6]) id="([^"]*)">(.*?)</h\1>', re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def find_title(markdown: str, default: str = DEFAULT_TITLE) -> str:
+    """Text of the first `# ` heading, or `default` when there is none"""
+
+    match = TITLE_PATTERN.search(markdown)
+    return match.group(1).strip() if match else default
+
+
+def _convert_with_markdown2(markdown: str) -> Tuple[str, str]:
+    # Imported here so title lookups and the memo work without markdown2 installed
+    import markdown2
+
+    html = markdown2.markdown(markdown, extras=MARKDOWN_EXTRAS)
+    return str(html), getattr(html, 'toc_html', None) or ""
+
+
+@dataclass
+class PreparedDocument:
+    """One parsed markdown document"""
+    content_hash: str
+    title: Optional[str]  # None when the document has no `# ` heading
+    html: str
+    toc_html: str = ""
+    headings: List[Tuple[int, str, str]] = field(default_factory=list)  # (level, text, anchor)
+
+
+class DocumentPreparer:
+    """Thread-safe LRU of PreparedDocuments keyed by content hash"""
+
+    def __init__(self, max_entries: int = 256, convert: Optional[Callable[[str], Tuple[str, str]]] = None):
+        """
+        Args:
+            max_entries: Documents kept before the least recently used is dropped
+            convert: markdown -> (html, toc_html); markdown2 with the TOC and header-id extras by default
+        """
+        self.max_entries = max_entries
+        self.convert = convert or _convert_with_markdown2
+        self.hits = 0
+        self.misses = 0
+        self._documents: "OrderedDict[str, PreparedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prepare(self, markdown: str) -> PreparedDocument:
+        """Return the parsed document, converting only on the first sight of this content"""
+
+        content_hash = hashlib.sha256(markdown.encode('utf-8')).hexdigest()
+        with self._lock:
+            document = self._documents.get(content_hash)
+            if document is not None:
+                self._documents.move_to_end(content_hash)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        html, toc_html = self.convert(markdown)
+        match = TITLE_PATTERN.search(markdown)
+        document = PreparedDocument(
+            content_hash=content_hash,
+            title=match.group(1).strip() if match else None,
+            html=html,
+            toc_html=toc_html,
+            headings=[(int(level), TAG_PATTERN.sub('', text).strip(), anchor)
+                      for level, anchor, text in HEADING_PATTERN.findall(html)]
+        )
+
+        with self._lock:
+            self._documents[content_hash] = document
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._documents), "hits": self.hits, "misses": self.misses}
+
+
+_shared_preparer: Optional[DocumentPreparer] = None
+_shared_preparer_lock = threading.Lock()
+
+
+def create_document_preparer(**kwargs) -> DocumentPreparer:
+    """Factory function to create a document preparer"""
+    return DocumentPreparer(**kwargs)
+
+
+def get_shared_document_preparer() -> DocumentPreparer:
+    """Return the process-wide preparer shared by enhancement, rendering and export"""
+    global _shared_preparer
+
+    with _shared_preparer_lock:
+        if _shared_preparer is None:
+            _shared_preparer = create_document_preparer()
+        return _shared_preparer
+
+
+def prepare_document(markdown: str) -> PreparedDocument:
+    """Parse markdown through the shared preparer"""
+    return get_shared_document_preparer().prepare(markdown)
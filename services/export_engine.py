@@ -0,0 +1,360 @@
+"""
+Multi-Format Export Engine
+
+Turns a generation result from the content store into PDF, DOCX, HTML or
+JSON. Each rendition is written once to an on-disk cache keyed by (content
+id, format, version), where the version combines the stored entry's creation
+time with EXPORT_VERSION, so repeated downloads are served from disk and the
+strong ETag can be computed from store metadata alone: a matching
+If-None-Match is answered without reading the payload or the file. Files are
+handed out as fixed-size chunks so large exports stream to the client.
+Superseded renditions are only deleted once they have gone unserved for a
+grace period, so a download that is still being streamed keeps its file.
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import zipfile
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+from services.content_store import ID_FIELDS
+
+
+DEFAULT_EXPORT_CACHE = os.path.join('.cache', 'exports')
+
+# Bump when the conversion below changes so cached renditions are rebuilt
+EXPORT_VERSION = "1"
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# format: (media type, file extension)
+EXPORT_FORMATS = {
+    "pdf": ("application/pdf", "pdf"),
+    "docx": (DOCX_MEDIA_TYPE, "docx"),
+    "html": ("text/html; charset=utf-8", "html"),
+    "json": ("application/json", "json"),
+}
+
+# Bookkeeping fields of a generator result that are not part of the document
+SKIP_KEYS = {"success", "error", "timestamp"} | set(ID_FIELDS.values())
+
+
+def _label(key: str) -> str:
+    return str(key).replace('_', ' ').title()
+
+
+def _heading(level: int, text: str) -> str:
+    return f"{'#' * min(level, 6)} {text}"
+
+
+def _append_markdown(value, level: int, lines: List[str]):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in SKIP_KEYS:
+                continue
+            if isinstance(item, (dict, list)) or (isinstance(item, str) and '\n' in item):
+                lines.extend([_heading(level, _label(key)), ""])
+                _append_markdown(item, level + 1, lines)
+            else:
+                lines.extend([f"**{_label(key)}:** {item}", ""])
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                heading = item.get('title') or item.get('name')
+                if heading:
+                    lines.extend([_heading(level, str(heading)), ""])
+                    item = {key: field for key, field in item.items() if key not in ('title', 'name')}
+                _append_markdown(item, level + 1 if heading else level, lines)
+            elif isinstance(item, list):
+                _append_markdown(item, level, lines)
+            else:
+                lines.append(f"- {item}")
+        lines.append("")
+    elif value is not None:
+        lines.extend([str(value).strip(), ""])
+
+
+def content_to_markdown(content: Dict, title: str) -> str:
+    """Lay out a generator result as markdown: nested keys become headings, lists become bullets"""
+
+    lines = [_heading(1, title), ""]
+    _append_markdown(content, 2, lines)
+    return "\n".join(lines).rstrip() + "\n"
+
+
+# Minimal WordprocessingML package: the document, heading styles and the relationships tying them together
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+_DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+_W_NAMESPACE = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_DOCX_HEADING_SIZES = {1: 36, 2: 30, 3: 26, 4: 24, 5: 22, 6: 22}  # half-points
+
+
+def _docx_styles() -> str:
+    headings = "".join(
+        f'<w:style w:type="paragraph" w:styleId="Heading{level}"><w:name w:val="heading {level}"/>'
+        f'<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:pPr><w:keepNext/><w:spacing w:before="240"/>'
+        f'<w:outlineLvl w:val="{level - 1}"/></w:pPr><w:rPr><w:b/><w:color w:val="2C3E50"/>'
+        f'<w:sz w:val="{size}"/></w:rPr></w:style>'
+        for level, size in _DOCX_HEADING_SIZES.items()
+    )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:styles {_W_NAMESPACE}>'
+        '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+        '<w:pPr><w:spacing w:after="120"/></w:pPr><w:rPr><w:sz w:val="22"/></w:rPr></w:style>'
+        '<w:style w:type="paragraph" w:styleId="ListParagraph"><w:name w:val="List Paragraph"/>'
+        '<w:basedOn w:val="Normal"/><w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:style>'
+        f'{headings}</w:styles>'
+    )
+
+
+_INLINE_PATTERN = re.compile(r'\*\*(.+?)\*\*')
+_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\([^)]*\)')
+
+
+def _docx_runs(text: str) -> str:
+    """Runs for one line, with **bold** spans kept and other inline markup dropped"""
+
+    text = _LINK_PATTERN.sub(r'\1', text).replace('`', '')
+    runs = []
+    for index, part in enumerate(_INLINE_PATTERN.split(text)):
+        if part:
+            bold = '<w:rPr><w:b/></w:rPr>' if index % 2 else ''
+            runs.append(f'<w:r>{bold}<w:t xml:space="preserve">{escape(part)}</w:t></w:r>')
+    return "".join(runs)
+
+
+def _docx_paragraph(text: str, style: str = "") -> str:
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{properties}{_docx_runs(text)}</w:p>'
+
+
+def markdown_to_docx(markdown: str, target):
+    """Write markdown as a .docx (a path or binary file object): headings, bullets and paragraphs"""
+
+    paragraphs = []
+    pending: List[str] = []
+
+    def flush():
+        if pending:
+            paragraphs.append(_docx_paragraph(" ".join(pending)))
+            pending.clear()
+
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        heading = re.match(r'^(#{1,6})\s+(.*)$', stripped)
+        bullet = re.match(r'^(?:[-*+]|\d+\.)\s+(.*)$', stripped)
+        if not stripped or stripped.startswith('```'):
+            flush()
+        elif heading:
+            flush()
+            paragraphs.append(_docx_paragraph(heading.group(2), f"Heading{len(heading.group(1))}"))
+        elif bullet:
+            flush()
+            paragraphs.append(_docx_paragraph("•\t" + bullet.group(1), "ListParagraph"))
+        else:
+            pending.append(stripped)
+    flush()
+
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_W_NAMESPACE}><w:body>'
+        f'{"".join(paragraphs)}<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+        '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1134"/></w:sectPr></w:body></w:document>'
+    )
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _DOCX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _DOCX_RELS)
+        archive.writestr('word/_rels/document.xml.rels', _DOCX_DOCUMENT_RELS)
+        archive.writestr('word/styles.xml', _docx_styles())
+        archive.writestr('word/document.xml', document)
+
+
+@dataclass
+class Rendition:
+    """A cached export ready to be streamed"""
+    path: str
+    etag: str
+    media_type: str
+    filename: str
+    size: int
+
+
+class ExportEngine:
+    """Renders stored content into export formats and caches each rendition on disk"""
+
+    def __init__(self, content_store, cache_dir: str = DEFAULT_EXPORT_CACHE,
+                 pdf_service_factory: Optional[Callable] = None, chunk_size: int = 64 * 1024,
+                 lock_stripes: int = 64, stale_after: float = 3600.0):
+        """
+        Args:
+            content_store: ContentStore holding the generation results
+            cache_dir: Directory for rendered exports
+            pdf_service_factory: Returns the PDFGenerationService used for PDF and HTML; called on first need
+            chunk_size: Bytes per chunk when streaming a rendition
+            lock_stripes: Fixed number of render locks that renditions are hashed onto
+            stale_after: Seconds a superseded rendition must go unserved before it is deleted
+        """
+        self.content_store = content_store
+        self.cache_dir = cache_dir
+        self.pdf_service_factory = pdf_service_factory
+        self.chunk_size = chunk_size
+        self.stale_after = stale_after
+        self.hits = 0
+        self.misses = 0
+        self._pdf_service = None
+        self._lock = threading.Lock()
+        self._render_locks = [threading.Lock() for _ in range(max(1, lock_stripes))]
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def pdf_service(self):
+        with self._lock:
+            if self._pdf_service is None:
+                if self.pdf_service_factory is None:
+                    # Imported here so JSON and DOCX exports work without WeasyPrint installed
+                    from services.pdf_generation_service import create_pdf_service
+                    self.pdf_service_factory = create_pdf_service
+                self._pdf_service = self.pdf_service_factory()
+            return self._pdf_service
+
+    @staticmethod
+    def _check_format(export_format: str):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}', expected one of {sorted(EXPORT_FORMATS)}")
+
+    def _stem(self, content_id: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', content_id)
+
+    def _digest(self, info: Dict, export_format: str) -> str:
+        version = f"{EXPORT_VERSION}:{info['created_at']!r}"
+        return hashlib.sha256(f"{info['content_id']}\0{export_format}\0{version}".encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, content_id: str, digest: str, export_format: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._stem(content_id)}-{digest}.{EXPORT_FORMATS[export_format][1]}")
+
+    def etag(self, content_id: str, export_format: str) -> Optional[str]:
+        """Strong ETag of the current rendition, from store metadata only; None for unknown content"""
+
+        self._check_format(export_format)
+        info = self.content_store.get_info(content_id)
+        return f'"{self._digest(info, export_format)}"' if info else None
+
+    def export(self, content_id: str, export_format: str) -> Optional[Rendition]:
+        """Return the cached rendition, rendering it on the first request; None for unknown content"""
+
+        self._check_format(export_format)
+        info = self.content_store.get_info(content_id)
+        if info is None:
+            return None
+
+        digest = self._digest(info, export_format)
+        path = self._path(content_id, digest, export_format)
+        render_lock = self._render_locks[int(digest[:8], 16) % len(self._render_locks)]
+
+        # One render per rendition; concurrent requests for it wait and then read the file
+        with render_lock:
+            if os.path.exists(path):
+                os.utime(path)  # mtime records when the rendition was last served
+                with self._lock:
+                    self.hits += 1
+            else:
+                with self._lock:
+                    self.misses += 1
+                self._render(content_id, export_format, path)
+
+        media_type, extension = EXPORT_FORMATS[export_format]
+        return Rendition(
+            path=path,
+            etag=f'"{digest}"',
+            media_type=media_type,
+            filename=f"{self._stem(content_id)}.{extension}",
+            size=os.path.getsize(path)
+        )
+
+    def _render(self, content_id: str, export_format: str, path: str):
+        """Write one rendition through a temporary file, then drop older versions nobody has fetched lately"""
+
+        record = self.content_store.get_record(content_id)
+        if record is None:
+            raise KeyError(content_id)
+        title = record["title"] or record["content"].get("title") or _label(record["content_type"])
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            if export_format == "json":
+                with open(temporary_path, 'w', encoding='utf-8') as handle:
+                    json.dump(record["content"], handle, ensure_ascii=False, indent=2)
+            else:
+                markdown = content_to_markdown(record["content"], title)
+                if export_format == "docx":
+                    markdown_to_docx(markdown, temporary_path)
+                elif export_format == "html":
+                    html = self.pdf_service.markdown_to_html(markdown, title, inline_styles=True)
+                    with open(temporary_path, 'w', encoding='utf-8') as handle:
+                        handle.write(html)
+                elif not self.pdf_service.render_to_file(markdown, temporary_path):
+                    raise RuntimeError(f"PDF rendering failed for {content_id}")
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        # A superseded file may still be streaming to a client that fetched it
+        # just before the new version was saved, so it is only removed once idle
+        served_before = time.time() - self.stale_after
+        pattern = f"{glob.escape(self._stem(content_id))}-{'[0-9a-f]' * 32}.{EXPORT_FORMATS[export_format][1]}"
+        for stale_path in glob.glob(os.path.join(self.cache_dir, pattern)):
+            try:
+                if stale_path != path and os.path.getmtime(stale_path) < served_before:
+                    os.remove(stale_path)
+            except FileNotFoundError:
+                pass
+
+    def iter_chunks(self, rendition: Rendition) -> Iterator[bytes]:
+        """Yield the rendition's bytes in chunk_size pieces"""
+
+        with open(rendition.path, 'rb') as handle:
+            while True:
+                chunk = handle.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def create_export_engine(content_store, cache_dir: str = DEFAULT_EXPORT_CACHE, **kwargs) -> ExportEngine:
+    """Factory function to create an export engine"""
+    return ExportEngine(content_store, cache_dir=cache_dir, **kwargs)
@@ -0,0 +1,331 @@
+"""
+GitHub Bulk Publisher
+
+Publishes many files as a single commit through the Git Data API instead of
+one Contents API commit per file. Blobs are created concurrently, files whose
+git blob SHA already matches the branch are skipped, and the new tree, commit
+and ref update happen once, so publishing N files costs about N/concurrency
+round-trips plus a constant. A local bare-repository backend built on git
+plumbing stands in for GitHub in tests and dry runs.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import subprocess
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import requests
+except ImportError:  # only the GitHub backend needs requests; the local backend runs without it
+    requests = None
+
+
+class StreamingContentsBody:
+    """
+    File-like JSON body for the GitHub APIs that base64-encodes a file as it is read.
+
+    Its length is known up front, so requests sends a normal Content-Length
+    request while only one block of the file is in memory at a time.
+    """
+
+    # A multiple of 3 so independently encoded blocks concatenate into valid base64
+    BLOCK_SIZE = 3 * 64 * 1024
+
+    def __init__(self, path: str, fields: Dict):
+        encoded_fields = json.dumps(fields)
+        self._prefix = (encoded_fields[:-1] + ', "content": "').encode('utf-8')
+        self._suffix = b'"}'
+        self._file = open(path, 'rb')
+        self.len = len(self._prefix) + 4 * ((os.path.getsize(path) + 2) // 3) + len(self._suffix)
+        self.seek(0)
+
+    def __len__(self) -> int:
+        return self.len
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """Only rewinding is supported; urllib3 rewinds the body before retrying a request"""
+
+        if (offset, whence) != (0, 0):
+            raise OSError("StreamingContentsBody can only be rewound to the start")
+        self._file.seek(0)
+        self._buffer = self._prefix
+        self._finished = False
+        self._position = 0
+        return 0
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._finished and (size < 0 or len(self._buffer) < size):
+            block = self._file.read(self.BLOCK_SIZE)
+            if block:
+                self._buffer += base64.b64encode(block)
+            else:
+                self._buffer += self._suffix
+                self._finished = True
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def git_blob_sha_of_bytes(data: bytes) -> str:
+    """Compute the git blob SHA-1 of in-memory content"""
+    return hashlib.sha1(f"blob {len(data)}\0".encode('utf-8') + data).hexdigest()
+
+
+def git_blob_sha(path: str, block_size: int = 1024 * 1024) -> str:
+    """Compute the git blob SHA-1 of a file without reading it into memory at once"""
+
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode('utf-8'))
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class PublishResult:
+    """Outcome of one bulk publish"""
+    commit_sha: Optional[str] = None
+    uploaded: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.commit_sha is not None or not self.uploaded
+
+
+class GitDataBackend(ABC):
+    """Interface over the handful of Git Data operations a bulk publish needs"""
+
+    @abstractmethod
+    def get_ref(self, branch: str) -> Optional[str]:
+        """Commit SHA the branch points at, or None when it does not exist yet"""
+
+    @abstractmethod
+    def get_commit_tree(self, commit_sha: str) -> str:
+        """Tree SHA of a commit"""
+
+    @abstractmethod
+    def list_tree(self, tree_sha: str) -> Dict[str, str]:
+        """Recursive {path: blob sha} listing of a tree"""
+
+    @abstractmethod
+    def create_blob(self, local_path: str) -> str:
+        """Upload a local file as a blob and return its SHA"""
+
+    @abstractmethod
+    def create_tree(self, base_tree: Optional[str], entries: List[Tuple[str, str]]) -> str:
+        """Create a tree from `base_tree` with (path, blob sha) entries added or replaced"""
+
+    @abstractmethod
+    def create_commit(self, message: str, tree_sha: str, parents: List[str]) -> str:
+        """Create a commit of `tree_sha` on top of `parents` and return its SHA"""
+
+    @abstractmethod
+    def update_ref(self, branch: str, commit_sha: str, previous_sha: Optional[str]):
+        """Point the branch at `commit_sha`, creating it when `previous_sha` is None"""
+
+
+class GitHubDataBackend(GitDataBackend):
+    """Git Data API backend for a GitHub repository"""
+
+    def __init__(self, owner: str, repo: str, token: Optional[str] = None,
+                 session: Optional["requests.Session"] = None, timeout: float = 60.0):
+        self.base_url = f"https://api.github.com/repos/{owner}/{repo}/git"
+        self.session = session or requests.Session()
+        self.headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, **kwargs) -> "requests.Response":
+        response = self.session.request(method, f"{self.base_url}/{path}", headers=self.headers,
+                                        timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def get_ref(self, branch: str) -> Optional[str]:
+        response = self.session.get(f"{self.base_url}/ref/heads/{branch}", headers=self.headers, timeout=self.timeout)
+        # 404: branch missing, 409: repository still empty
+        if response.status_code in (404, 409):
+            return None
+        response.raise_for_status()
+        return response.json()["object"]["sha"]
+
+    def get_commit_tree(self, commit_sha: str) -> str:
+        return self._request('GET', f"commits/{commit_sha}").json()["tree"]["sha"]
+
+    def list_tree(self, tree_sha: str) -> Dict[str, str]:
+        tree = self._request('GET', f"trees/{tree_sha}", params={"recursive": "1"}).json()
+        return {entry["path"]: entry["sha"] for entry in tree.get("tree", []) if entry["type"] == "blob"}
+
+    def create_blob(self, local_path: str) -> str:
+        headers = dict(self.headers, **{'Content-Type': 'application/json'})
+        with StreamingContentsBody(local_path, {"encoding": "base64"}) as body:
+            response = self.session.post(f"{self.base_url}/blobs", data=body, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["sha"]
+
+    def create_tree(self, base_tree: Optional[str], entries: List[Tuple[str, str]]) -> str:
+        payload = {"tree": [{"path": path, "mode": "100644", "type": "blob", "sha": sha} for path, sha in entries]}
+        if base_tree:
+            payload["base_tree"] = base_tree
+        return self._request('POST', "trees", json=payload).json()["sha"]
+
+    def create_commit(self, message: str, tree_sha: str, parents: List[str]) -> str:
+        payload = {"message": message, "tree": tree_sha, "parents": parents}
+        return self._request('POST', "commits", json=payload).json()["sha"]
+
+    def update_ref(self, branch: str, commit_sha: str, previous_sha: Optional[str]):
+        if previous_sha is None:
+            self._request('POST', "refs", json={"ref": f"refs/heads/{branch}", "sha": commit_sha})
+        else:
+            self._request('PATCH', f"refs/heads/{branch}", json={"sha": commit_sha, "force": False})
+
+
+class LocalBareRepoBackend(GitDataBackend):
+    """Stand-in backend that publishes into a local bare repository with git plumbing"""
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        if not os.path.exists(os.path.join(repo_path, "HEAD")):
+            subprocess.run(["git", "init", "--bare", "-q", repo_path], check=True)
+
+    def _git(self, *args: str, stdin: Optional[str] = None, env: Optional[Dict] = None,
+             check: bool = True) -> subprocess.CompletedProcess:
+        environment = dict(os.environ, GIT_DIR=self.repo_path,
+                           GIT_AUTHOR_NAME=os.environ.get('GIT_AUTHOR_NAME', 'Content Publisher'),
+                           GIT_AUTHOR_EMAIL=os.environ.get('GIT_AUTHOR_EMAIL', 'publisher@localhost'),
+                           GIT_COMMITTER_NAME=os.environ.get('GIT_COMMITTER_NAME', 'Content Publisher'),
+                           GIT_COMMITTER_EMAIL=os.environ.get('GIT_COMMITTER_EMAIL', 'publisher@localhost'),
+                           **(env or {}))
+        return subprocess.run(["git", *args], input=stdin, env=environment, capture_output=True,
+                              text=True, check=check)
+
+    def get_ref(self, branch: str) -> Optional[str]:
+        result = self._git("rev-parse", "--verify", "-q", f"refs/heads/{branch}", check=False)
+        return result.stdout.strip() or None
+
+    def get_commit_tree(self, commit_sha: str) -> str:
+        return self._git("rev-parse", f"{commit_sha}^{{tree}}").stdout.strip()
+
+    def list_tree(self, tree_sha: str) -> Dict[str, str]:
+        listing = {}
+        for line in self._git("ls-tree", "-r", "-z", tree_sha).stdout.split("\0"):
+            if line:
+                meta, path = line.split("\t", 1)
+                _, object_type, sha = meta.split()
+                if object_type == "blob":
+                    listing[path] = sha
+        return listing
+
+    def create_blob(self, local_path: str) -> str:
+        return self._git("hash-object", "-w", "--", os.path.abspath(local_path)).stdout.strip()
+
+    def create_tree(self, base_tree: Optional[str], entries: List[Tuple[str, str]]) -> str:
+        index_path = os.path.join(self.repo_path, f"publish-index-{os.getpid()}")
+        env = {"GIT_INDEX_FILE": index_path}
+        try:
+            if base_tree:
+                self._git("read-tree", base_tree, env=env)
+            else:
+                self._git("read-tree", "--empty", env=env)
+            self._git("update-index", "--add", "-z", "--index-info",
+                      stdin="".join(f"100644 {sha}\t{path}\0" for path, sha in entries), env=env)
+            return self._git("write-tree", env=env).stdout.strip()
+        finally:
+            if os.path.exists(index_path):
+                os.remove(index_path)
+
+    def create_commit(self, message: str, tree_sha: str, parents: List[str]) -> str:
+        parent_args = [arg for parent in parents for arg in ("-p", parent)]
+        return self._git("commit-tree", tree_sha, *parent_args, "-m", message).stdout.strip()
+
+    def update_ref(self, branch: str, commit_sha: str, previous_sha: Optional[str]):
+        # The old value makes the update fail if the branch moved since it was read
+        self._git("update-ref", f"refs/heads/{branch}", commit_sha, previous_sha or "0" * 40)
+
+
+class GitHubBulkPublisher:
+    """Publishes a set of local files to a branch as one commit"""
+
+    def __init__(self, backend: GitDataBackend, concurrency: int = 8):
+        self.backend = backend
+        self.concurrency = concurrency
+
+    def publish(self, files: Dict[str, str], message: str, branch: str = "main") -> PublishResult:
+        """
+        Publish {repo path: local path} in one commit.
+
+        Files whose blob SHA already matches the branch are skipped; when
+        nothing changed no commit is created.
+        """
+
+        started = time.perf_counter()
+        result = PublishResult()
+
+        head = self.backend.get_ref(branch)
+        base_tree = self.backend.get_commit_tree(head) if head else None
+        existing = self.backend.list_tree(base_tree) if base_tree else {}
+
+        workers = max(1, min(self.concurrency, len(files) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            local_shas = dict(zip(files, executor.map(git_blob_sha, files.values())))
+
+            changed = []
+            for repo_path, sha in local_shas.items():
+                if existing.get(repo_path) == sha:
+                    result.unchanged.append(repo_path)
+                else:
+                    changed.append(repo_path)
+
+            if not changed:
+                result.elapsed_seconds = time.perf_counter() - started
+                return result
+
+            blob_shas = list(executor.map(self.backend.create_blob, [files[path] for path in changed]))
+
+        tree_sha = self.backend.create_tree(base_tree, list(zip(changed, blob_shas)))
+        commit_sha = self.backend.create_commit(message, tree_sha, [head] if head else [])
+        self.backend.update_ref(branch, commit_sha, head)
+
+        result.commit_sha = commit_sha
+        result.uploaded = changed
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
+
+
+def create_github_bulk_publisher(owner: Optional[str] = None, repo: str = 'content-generation-ai-agents',
+                                 token: Optional[str] = None, local_repo_path: Optional[str] = None,
+                                 concurrency: int = 8, session=None) -> GitHubBulkPublisher:
+    """Factory function to create a bulk publisher for GitHub, or for a local bare repo when a path is given"""
+
+    if local_repo_path:
+        backend = LocalBareRepoBackend(local_repo_path)
+    else:
+        backend = GitHubDataBackend(
+            owner or os.environ.get('GITHUB_USERNAME'), repo, token or os.environ.get('GITHUB_TOKEN'), session
+        )
+    return GitHubBulkPublisher(backend, concurrency)
@@ -0,0 +1,173 @@
+"""
+Heuristic Style Scorer
+
+Deterministic, zero-API scorer for Gilbert's sympathetic and professional
+writing styles. Most of the traits the LLM analysis rates are lexical
+(ellipses, strategic CAPS, question cascades, "AHO!", sacred vocabulary, ROI
+figures, framework headings), so they are counted with patterns compiled once
+at import time. Every document is scanned in a single pass of one combined
+regex, and the counts are mapped onto the same StyleAnalysis /
+ProfessionalStyleAnalysis dataclasses the agents return.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+
+# Each feature is one named group in a combined pattern. Order matters: the
+# first alternative that matches at a position wins, so specific features
+# (AHO!) come before general ones (strategic CAPS).
+SYMPATHETIC_FEATURES = [
+    ("ellipsis", r"\.{2,}|\u2026"),
+    ("aho", r"\bAHO\b!?"),
+    ("caps", r"\b[A-Z]{3,}\b"),
+    ("question", r"\?"),
+    ("sacred", r"(?i:\b(?:sanctuary|temple|holy|sacred|prayer|faith|spiritual\w*|soul|god)\b)"),
+    ("vulnerability", r"(?i:\b(?:fail\w*|mistakes?|embarrass\w*|struggl\w*|humiliat\w*|doubt\w*|afraid|fear\w*|wrong|fraud)\b)"),
+    ("emotional", r"(?i:\b(?:felt|feel\w*|heart\w*|lonel\w*|anxious|worried|tears|cried|sacrific\w*|emotional\w*|family|wife|children|kids)\b)"),
+    ("cultural", r"(?i:\b(?:german\w*|italian|swiss|american|cultur\w*|multicultural)\b)"),
+    ("journey", r"(?i:\b(?:journey|process|attempts?|again|gradually|learn\w*|grace)\b)"),
+    ("universal", r"(?i:\b(?:we all|everyone|every one of us|you've|you have|you know that|all of us|human)\b)"),
+    ("flow", r"(?i:\b(?:flow|training grounds?|the way you do anything|laborator\w*)\b)"),
+    ("first_person", r"(?i:\b(?:i|i'm|i've|me|my|myself)\b)"),
+]
+
+PROFESSIONAL_FEATURES = [
+    ("framework_heading", r"(?im:^#{1,6}[^\n]*\b(?:framework|methodology|approach|model|roadmap|phase|strategy)\b[^\n]*$)"),
+    ("named_framework", r"\b(?:The\s+)?(?:[A-Z][\w-]*\s+){1,4}(?:Framework|Approach|Methodology|Model)\b"),
+    ("roi", r"(?i:\d+(?:\.\d+)?\s?(?:%|x\b|percent\b)|\broi\b|\breturn on investment\b|[$\u20ac\u00a3]\s?\d[\d,.]*|\bchf\s?\d[\d,.]*|\b\d+(?:\.\d+)?\s?(?:million|billion|bn)\b)"),
+    ("authority", r"(?i:\b(?:fortune 500|in my experience|we implemented|our framework|based on|delivered|implemented|deployed|client engagements?)\b)"),
+    ("strategic", r"(?i:\b(?:strateg\w*|systems?|long-term|competitive advantage|stakeholders?|governance|roadmap)\b)"),
+    ("cultural", r"(?i:\b(?:german\w*|italian|swiss|american|cultur\w*|multicultural|global|international|cross-cultural)\b)"),
+    ("expertise", r"(?i:\b(?:cloud|hybrid|analytics|ai|machine learning|data|architecture|enterprise|platform|infrastructure)\b)"),
+    ("thought", r"(?i:\b(?:future|trends?|emerging|insights?|original|next[- ]generation|innovat\w*|vision)\b)"),
+    ("implementation", r"(?i:\b(?:implement\w*|next steps?|action\w*|execution|phase \d|kpis?|metrics?|milestones?)\b)"),
+    ("bold", r"\*\*[^*\n]+\*\*"),
+    ("first_person", r"(?i:\b(?:i|my|we|our)\b)"),
+]
+
+WORD_PATTERN = re.compile(r"\b[\w'-]+\b")
+
+
+def _compile(features) -> re.Pattern:
+    return re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in features))
+
+
+SYMPATHETIC_PATTERN = _compile(SYMPATHETIC_FEATURES)
+PROFESSIONAL_PATTERN = _compile(PROFESSIONAL_FEATURES)
+
+
+def _saturate(value: float, target: float) -> float:
+    """Map a density onto 0.0-1.0, reaching 1.0 at `target`"""
+    return round(min(1.0, value / target), 3) if target > 0 else 0.0
+
+
+class HeuristicStyleScorer:
+    """Local fast-path replacement for the agents' LLM style analysis"""
+
+    def _densities(self, pattern: re.Pattern, document: str) -> Dict[str, float]:
+        """Count every feature in one pass and normalize to occurrences per 100 words"""
+
+        counts = Counter(match.lastgroup for match in pattern.finditer(document))
+        words = max(1, len(WORD_PATTERN.findall(document)))
+        return {name: counts.get(name, 0) * 100.0 / words for name in pattern.groupindex}
+
+    def sympathetic_scores(self, document: str) -> Dict[str, float]:
+        """Score one document on the StyleAnalysis dimensions (0.0-1.0)"""
+
+        d = self._densities(SYMPATHETIC_PATTERN, document)
+        return {
+            "vulnerability_score": _saturate(d["vulnerability"], 1.0),
+            "relatability_score": round(0.5 * _saturate(d["universal"], 0.5) + 0.5 * _saturate(d["first_person"], 3.0), 3),
+            "authenticity_score": round(0.5 * _saturate(d["first_person"], 3.0) + 0.25 * _saturate(d["ellipsis"], 0.5)
+                                        + 0.25 * _saturate(d["question"], 0.5), 3),
+            "cultural_intelligence": _saturate(d["cultural"], 0.5),
+            "emotional_depth": _saturate(d["emotional"], 0.8),
+            "flow_integration": round(0.5 * _saturate(d["flow"], 0.3) + 0.25 * _saturate(d["sacred"], 0.3)
+                                      + 0.25 * _saturate(d["caps"] + d["aho"], 0.3), 3),
+        }
+
+    def professional_scores(self, document: str) -> Dict[str, float]:
+        """Score one document on the ProfessionalStyleAnalysis dimensions (0.0-1.0)"""
+
+        d = self._densities(PROFESSIONAL_PATTERN, document)
+        frameworks = d["framework_heading"] + d["named_framework"]
+        return {
+            "executive_authority": round(0.5 * _saturate(d["authority"], 0.5) + 0.5 * _saturate(d["roi"], 0.8), 3),
+            "strategic_insight": round(0.6 * _saturate(d["strategic"], 1.5) + 0.4 * _saturate(frameworks, 0.2), 3),
+            "cultural_intelligence": _saturate(d["cultural"], 0.5),
+            "business_expertise": round(0.7 * _saturate(d["expertise"], 2.0) + 0.3 * _saturate(d["roi"], 0.8), 3),
+            "thought_leadership": round(0.5 * _saturate(d["thought"], 0.8) + 0.25 * _saturate(frameworks, 0.2)
+                                        + 0.25 * _saturate(d["bold"], 0.5), 3),
+            "authenticity_score": _saturate(d["first_person"], 2.0),
+        }
+
+    def score_sympathetic_batch(self, documents: List[str]) -> List:
+        """Return a StyleAnalysis for each document"""
+        # Imported here because the agent module imports this scorer
+        from services.sympathetic_writing_agent import StyleAnalysis
+
+        return [StyleAnalysis(**self.sympathetic_scores(document)) for document in documents]
+
+    def score_professional_batch(self, documents: List[str]) -> List:
+        """Return a ProfessionalStyleAnalysis for each document"""
+        # Imported here because the agent module imports this scorer
+        from services.professional_thought_leader_agent import ProfessionalStyleAnalysis
+
+        return [ProfessionalStyleAnalysis(**self.professional_scores(document)) for document in documents]
+
+    def _report(self, criteria: Dict[str, float]) -> Dict:
+        """Shape 0.0-1.0 criteria like the agents' 1-10 validation JSON"""
+
+        ratings = {name: round(1 + 9 * value, 1) for name, value in criteria.items()}
+        ranked = sorted(ratings, key=ratings.get, reverse=True)
+        return {
+            "overall_score": round(sum(ratings.values()) / len(ratings), 1),
+            **ratings,
+            "strengths": ranked[:2],
+            "improvements": ranked[-2:],
+            "scoring_method": "heuristic"
+        }
+
+    def validate_sympathetic(self, document: str) -> Dict:
+        """Local stand-in for validate_style_authenticity"""
+
+        d = self._densities(SYMPATHETIC_PATTERN, document)
+        s = self.sympathetic_scores(document)
+        return self._report({
+            "vulnerability": s["vulnerability_score"],
+            "authenticity": s["authenticity_score"],
+            "relatability": s["relatability_score"],
+            "cultural_depth": s["cultural_intelligence"],
+            "emotional_honesty": s["emotional_depth"],
+            "journey_focus": _saturate(d["journey"], 1.0),
+            "spiritual_integration": _saturate(d["sacred"], 0.3),
+            "linguistic_patterns": round((_saturate(d["ellipsis"], 0.5) + _saturate(d["caps"] + d["aho"], 0.3)
+                                          + _saturate(d["question"], 0.5)) / 3, 3),
+            "universal_connection": _saturate(d["universal"], 0.5),
+            "flow_philosophy": _saturate(d["flow"], 0.3),
+        })
+
+    def validate_professional(self, document: str) -> Dict:
+        """Local stand-in for validate_professional_authenticity"""
+
+        d = self._densities(PROFESSIONAL_PATTERN, document)
+        s = self.professional_scores(document)
+        return self._report({
+            "executive_authority": s["executive_authority"],
+            "strategic_insight": s["strategic_insight"],
+            "cultural_intelligence": s["cultural_intelligence"],
+            "business_expertise": s["business_expertise"],
+            "thought_leadership": s["thought_leadership"],
+            "authenticity": s["authenticity_score"],
+            "professional_tone": round(1.0 - 0.5 * _saturate(d["first_person"], 6.0), 3),
+            "results_focus": _saturate(d["roi"], 0.8),
+            "framework_quality": _saturate(d["framework_heading"] + d["named_framework"], 0.2),
+            "implementation_value": _saturate(d["implementation"], 1.0),
+        })
+
+
+def create_heuristic_style_scorer() -> HeuristicStyleScorer:
+    """Factory function to create a heuristic style scorer"""
+    return HeuristicStyleScorer()
@@ -0,0 +1,202 @@
+"""
+Incremental Chapter-Level PDF Rendering
+
+Renders a manuscript chapter by chapter instead of as one document. The
+markdown is split on `# ` chapter headings, every chapter is laid out into its
+own PDF fragment cached on disk under a hash of its content, theme and the
+renderer and WeasyPrint versions, and the fragments are merged into the final
+book. After a one-chapter edit only that chapter is laid out again, even when
+it changed length.
+
+Fragments are laid out without page numbers, so they do not depend on where
+they land in the book. At merge time every page is stamped from one overlay
+document holding nothing but the page-number footer, numbered 1..N. Every
+chapter fragment opens with its own `# ` heading, so the running
+`string(chapter)` header is correct on each of its pages.
+"""
+
+import io
+import os
+import re
+import json
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from weasyprint import HTML, CSS, __version__ as WEASYPRINT_VERSION
+
+from services.pdf_artifact_cache import create_pdf_artifact_cache
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # without pypdf the service falls back to a full render
+    PdfReader = PdfWriter = None
+
+
+DEFAULT_FRAGMENT_CACHE = os.path.join('.cache', 'pdf_fragments')
+CHAPTER_HEADING = re.compile(r'^# ')
+FENCE = re.compile(r'^\s*```')
+
+# Fragments leave the footer empty; the page-number overlay draws only the footer
+NO_PAGE_NUMBERS = "@page { @bottom-center { content: none; } }"
+PAGE_NUMBERS_ONLY = """
+@page { @top-center { content: none; } background: none; }
+html, body { background: none; }
+.page + .page { break-before: page; }
+"""
+
+
+@dataclass
+class ManuscriptSection:
+    """Front matter (index 0, rendered with the title page) or one `# ` chapter"""
+    index: int
+    title: str
+    markdown: str
+
+
+@dataclass
+class RenderStats:
+    """What the last incremental render reused and what it laid out again"""
+    sections: int = 0
+    cache_hits: int = 0
+    rendered: int = 0
+    pages: int = 0
+
+
+def split_chapters(markdown: str) -> List[ManuscriptSection]:
+    """Split markdown on `# ` headings outside fenced code blocks; section 0 is the front matter"""
+
+    sections = [ManuscriptSection(0, "", "")]
+    lines: List[str] = []
+    in_fence = False
+
+    for line in markdown.split('\n'):
+        if FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and CHAPTER_HEADING.match(line):
+            sections[-1].markdown = '\n'.join(lines)
+            sections.append(ManuscriptSection(len(sections), line[2:].strip(), ""))
+            lines = []
+        lines.append(line)
+
+    sections[-1].markdown = '\n'.join(lines)
+    return sections
+
+
+class IncrementalPDFRenderer:
+    """Chapter-fragment renderer with an on-disk fragment cache, merged with pypdf"""
+
+    def __init__(self, pdf_service, cache_dir: Optional[str] = DEFAULT_FRAGMENT_CACHE,
+                 max_bytes: int = 512 * 1024 * 1024, max_age_seconds: Optional[float] = 30 * 24 * 3600,
+                 renderer_version: str = ""):
+        """
+        Args:
+            pdf_service: PDFGenerationService providing the HTML builder, themes and fonts
+            cache_dir: Directory for cached fragments, or None to disable the disk cache
+            max_bytes: Size cap of the fragment cache; least recently used fragments go first
+            max_age_seconds: Fragments not reused for this long are evicted
+            renderer_version: The service's HTML template version, so template changes invalidate fragments
+        """
+        self.pdf_service = pdf_service
+        self.version = f"{renderer_version}/{WEASYPRINT_VERSION}"
+        self.cache_dir = cache_dir
+        self.last_stats = RenderStats()
+        self.fragment_cache = create_pdf_artifact_cache(
+            cache_dir, max_bytes=max_bytes, max_age_seconds=max_age_seconds
+        ) if cache_dir else None
+
+    @property
+    def available(self) -> bool:
+        return PdfWriter is not None
+
+    def _styles(self, theme: str) -> str:
+        return self.pdf_service.css_styles + self.pdf_service.theme_overrides.get(theme, "")
+
+    def _fragment_key(self, section: ManuscriptSection, book_title: str, theme: str) -> str:
+        front_matter = section.index == 0
+        payload = json.dumps({
+            "markdown": section.markdown,
+            # The front matter carries the title page, so its title and month of rendering are part of its content
+            "title": book_title if front_matter else "",
+            "title_date": datetime.now().strftime("%B %Y") if front_matter else "",
+            "styles": self._styles(theme),
+            "version": self.version
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _cached(self, key: str, render) -> Tuple[bytes, bool]:
+        """Return (pdf bytes, cache hit) for `key`, rendering and storing it on a miss"""
+
+        if self.fragment_cache:
+            pdf_bytes = self.fragment_cache.get(key)
+            if pdf_bytes is not None:
+                return pdf_bytes, True
+        pdf_bytes = render()
+        if self.fragment_cache:
+            self.fragment_cache.set(key, pdf_bytes)
+        return pdf_bytes, False
+
+    def _render_fragment(self, section: ManuscriptSection, book_title: str, theme: str) -> bytes:
+        """Lay out one section without page numbers, so the fragment fits anywhere in the book"""
+
+        html_content = self.pdf_service.markdown_to_html(
+            section.markdown, book_title if section.index == 0 else section.title,
+            include_title_page=section.index == 0
+        )
+        return HTML(string=html_content).write_pdf(
+            stylesheets=[self.pdf_service.get_stylesheet(theme), CSS(string=NO_PAGE_NUMBERS)],
+            font_config=self.pdf_service.font_config
+        )
+
+    def _render_page_numbers(self, theme: str, pages: int) -> bytes:
+        """Lay out `pages` empty pages carrying only the theme's page-number footer"""
+
+        return HTML(string='<div class="page"></div>' * pages).write_pdf(
+            stylesheets=[self.pdf_service.get_stylesheet(theme), CSS(string=PAGE_NUMBERS_ONLY)],
+            font_config=self.pdf_service.font_config
+        )
+
+    def render(self, content: str, theme: Optional[str] = None, target=None) -> Optional[bytes]:
+        """
+        Render a markdown manuscript, reusing cached chapter fragments.
+
+        Returns the PDF bytes, or writes them to `target` (a path or binary
+        file object) and returns None.
+        """
+
+        theme = theme or "default"
+        sections = split_chapters(content)
+        book_title = next((section.title for section in sections[1:]), "Enhanced Content")
+        stats = RenderStats(sections=len(sections))
+
+        writer = PdfWriter()
+        for section in sections:
+            if section.index == 0 or section.markdown.strip():
+                pdf_bytes, hit = self._cached(self._fragment_key(section, book_title, theme),
+                                              lambda: self._render_fragment(section, book_title, theme))
+                stats.cache_hits += hit
+                stats.rendered += not hit
+                writer.append(io.BytesIO(pdf_bytes))
+
+        # Stamp 1..N onto the merged pages; the overlay only changes when the page count does
+        stats.pages = len(writer.pages)
+        numbers_key = hashlib.sha256(
+            f"page-numbers:{stats.pages}:{self.version}:{self._styles(theme)}".encode('utf-8')
+        ).hexdigest()
+        numbers, _ = self._cached(numbers_key, lambda: self._render_page_numbers(theme, stats.pages))
+        for page, number_page in zip(writer.pages, PdfReader(io.BytesIO(numbers)).pages):
+            page.merge_page(number_page)
+        self.last_stats = stats
+
+        if target is not None:
+            writer.write(target)
+            return None
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+
+def create_incremental_pdf_renderer(pdf_service, **kwargs) -> IncrementalPDFRenderer:
+    """Factory function to create an incremental PDF renderer"""
+    return IncrementalPDFRenderer(pdf_service, **kwargs)
@@ -0,0 +1,289 @@
+"""
+Background Job Queue
+
+Long-running generation requests are recorded as jobs in SQLite and executed
+by a bounded worker pool instead of the HTTP request thread. Routes return
+202 with a job id straight away, and clients poll `/jobs/<id>` for the status
+and result, so request workers stay free and throughput depends on the job
+pool size rather than the web server's worker count. Job state survives
+restarts: queued jobs are picked up again when the queue starts, and a job is
+claimed with a conditional UPDATE so it runs once even with several web
+processes sharing the database. Jobs left running by a process that died are
+queued again on startup (or failed once they have been attempted too often),
+and jobs running for longer than the stale limit are failed.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+DEFAULT_JOB_DB = os.path.join('.cache', 'jobs.sqlite3')
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+# Columns added after the first release, for databases created before them
+_MIGRATIONS = {
+    "owner": "ALTER TABLE jobs ADD COLUMN owner TEXT",
+    "attempts": "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def _process_owner() -> str:
+    """Identify this worker process as host:pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_is_dead(owner: Optional[str]) -> bool:
+    """True only when the owner is a process on this host that no longer exists"""
+
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+class JobStore:
+    """SQLite persistence for jobs; safe to share between threads and processes"""
+
+    def __init__(self, db_path: str = DEFAULT_JOB_DB):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+            for column, statement in _MIGRATIONS.items():
+                if column not in columns:
+                    connection.execute(statement)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        connection = self._connect()
+        try:
+            with connection:
+                return connection.execute(sql, params)
+        finally:
+            connection.close()
+
+    def create(self, kind: str, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(payload), time.time())
+        )
+        return job_id
+
+    def claim(self, job_id: str) -> Optional[Dict]:
+        """Move a queued job to running; returns it, or None when another worker already has it"""
+
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, owner = ?, attempts = attempts + 1 "
+            "WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), _process_owner(), job_id, QUEUED)
+        )
+        return self.get(job_id) if cursor.rowcount == 1 else None
+
+    def recover_stale(self, stale_after: float, max_attempts: int = 3) -> Dict[str, int]:
+        """
+        Reset running jobs that can no longer finish.
+
+        A job whose owner process on this host has died goes back to queued,
+        or to failed once it has been attempted `max_attempts` times. A job
+        running for more than `stale_after` seconds is failed, whoever owns
+        it. Returns {"requeued": n, "failed": n}.
+        """
+
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT id, started_at, owner, attempts FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+        finally:
+            connection.close()
+
+        recovered = {"requeued": 0, "failed": 0}
+        now = time.time()
+        # Each update only applies while the job is still held by the owner that was read
+        still_held = "WHERE id = ? AND status = ? AND owner IS ?"
+        for row in rows:
+            held = (row["id"], RUNNING, row["owner"])
+            dead = _owner_is_dead(row["owner"])
+            if dead and row["attempts"] < max_attempts:
+                cursor = self._execute(
+                    f"UPDATE jobs SET status = ?, started_at = NULL, owner = NULL {still_held}", (QUEUED,) + held
+                )
+                recovered["requeued"] += cursor.rowcount
+            elif dead or now - (row["started_at"] or 0) > stale_after:
+                error = (f"Abandoned after {row['attempts']} attempt(s)" if dead
+                         else f"Abandoned: still running after {stale_after:.0f}s")
+                cursor = self._execute(
+                    f"UPDATE jobs SET status = ?, error = ?, finished_at = ? {still_held}", (FAILED, error, now) + held
+                )
+                recovered["failed"] += cursor.rowcount
+        return recovered
+
+    def finish(self, job_id: str, result=None, error: str = ""):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (FAILED if error else SUCCEEDED, json.dumps(result, default=str), error or None, time.time(), job_id)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def queued_ids(self):
+        connection = self._connect()
+        try:
+            rows = connection.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,))
+            return [row["id"] for row in rows.fetchall()]
+        finally:
+            connection.close()
+
+    def counts(self) -> Dict[str, int]:
+        connection = self._connect()
+        try:
+            rows = connection.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        finally:
+            connection.close()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class JobQueue:
+    """Runs registered handlers for persisted jobs on a bounded thread pool"""
+
+    def __init__(self, store: JobStore, max_workers: int = 4, handlers: Optional[Dict[str, Callable]] = None,
+                 stale_after: float = 3600.0):
+        """
+        Args:
+            store: Where job state and results are persisted
+            max_workers: Jobs executed concurrently
+            handlers: {job kind: function(payload) -> JSON-serializable result}
+            stale_after: Seconds after which a job still marked running is failed on startup
+        """
+        self.store = store
+        self.max_workers = max_workers
+        self.stale_after = stale_after
+        self.handlers: Dict[str, Callable] = dict(handlers or {})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def register(self, kind: str, handler: Callable):
+        self.handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Dict) -> str:
+        """Persist a job and queue it; returns the job id immediately"""
+
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job_id = self.store.create(kind, payload)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def resume_queued(self) -> int:
+        """Queue jobs left waiting or orphaned by a previous process; returns how many were picked up"""
+
+        recovered = self.store.recover_stale(self.stale_after)
+        if any(recovered.values()):
+            logging.warning(f"Recovered stale running jobs: {recovered['requeued']} requeued, "
+                            f"{recovered['failed']} failed")
+        job_ids = self.store.queued_ids()
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+        return len(job_ids)
+
+    def _run(self, job_id: str):
+        job = self.store.claim(job_id)
+        if job is None:
+            return
+
+        try:
+            result = self.handlers[job["kind"]](job["payload"])
+            # Agents report their own failures as {"success": False, "error": ...}
+            if isinstance(result, dict) and result.get("success") is False:
+                self.store.finish(job_id, result, result.get("error") or "Generation failed")
+            else:
+                self.store.finish(job_id, result)
+        except Exception as e:
+            # An exception with an empty message still has to mark the job failed
+            error = str(e) or type(e).__name__
+            logging.error(f"Job {job_id} ({job['kind']}) failed: {error}")
+            self.store.finish(job_id, error=error)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+_shared_queue: Optional[JobQueue] = None
+_shared_queue_lock = threading.Lock()
+
+
+def create_job_queue(db_path: str = DEFAULT_JOB_DB, **kwargs) -> JobQueue:
+    """Factory function to create a job queue backed by a SQLite file"""
+    return JobQueue(JobStore(db_path), **kwargs)
+
+
+def get_shared_job_queue() -> JobQueue:
+    """Return the process-wide job queue (JOB_QUEUE_DB, JOB_WORKERS and JOB_STALE_AFTER_SECONDS override the defaults)"""
+    global _shared_queue
+
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            _shared_queue = create_job_queue(
+                os.environ.get('JOB_QUEUE_DB', DEFAULT_JOB_DB),
+                max_workers=int(os.environ.get('JOB_WORKERS', 4)),
+                stale_after=float(os.environ.get('JOB_STALE_AFTER_SECONDS', 3600))
+            )
+        return _shared_queue
@@ -0,0 +1,90 @@
+"""
+Single-Pass Keyword Matcher
+
+Scores a document against several keyword groups with one compiled regex.
+The keywords are folded into a character trie and emitted as a nested
+alternation, so at each position the engine follows at most one branch per
+character and a scan stays linear in the document length however many
+keywords are added. Matches are whole words (with a few plural/verb endings),
+so "ai" no longer fires inside "said" or "chair".
+"""
+
+import re
+from typing import Dict, Iterable, List, Set
+
+
+# Endings accepted after a keyword, so "learn" still matches "learning" and "failure" matches "failures"
+DEFAULT_SUFFIXES = ("s", "es", "ed", "ing", "er", "ers")
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation equivalent to `words`, factored by common prefix"""
+
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Compiled matcher scoring text against named keyword groups in one pass"""
+
+    def __init__(self, keyword_groups: Dict[str, Iterable[str]], suffixes: Iterable[str] = DEFAULT_SUFFIXES):
+        """
+        Args:
+            keyword_groups: {group name: keywords}; a keyword may belong to several groups
+            suffixes: Word endings allowed after a keyword
+        """
+        self.groups: Dict[str, Set[str]] = {name: {kw.lower() for kw in keywords}
+                                            for name, keywords in keyword_groups.items()}
+        self._keyword_groups: Dict[str, List[str]] = {}
+        for name, keywords in self.groups.items():
+            for keyword in keywords:
+                self._keyword_groups.setdefault(keyword, []).append(name)
+
+        suffix_pattern = "|".join(re.escape(suffix) for suffix in sorted(suffixes, key=len, reverse=True))
+        self.pattern = re.compile(
+            r"\b(" + _trie_pattern(self._keyword_groups) + r")(?:" + suffix_pattern + r")?\b",
+            re.IGNORECASE
+        )
+
+    def matches(self, text: str) -> Dict[str, Set[str]]:
+        """Distinct keywords found in `text`, per group"""
+
+        found: Dict[str, Set[str]] = {name: set() for name in self.groups}
+        seen: Set[str] = set()
+        for match in self.pattern.finditer(text):
+            keyword = match.group(1).lower()
+            if keyword not in seen:
+                seen.add(keyword)
+                for name in self._keyword_groups[keyword]:
+                    found[name].add(keyword)
+                if len(seen) == len(self._keyword_groups):
+                    break  # every keyword is already counted
+        return found
+
+    def score(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords from each group present in `text`"""
+        return {name: len(keywords) for name, keywords in self.matches(text).items()}
+
+    def score_many(self, texts: Iterable[str]) -> List[Dict[str, int]]:
+        """Score several documents with the same compiled pattern"""
+        return [self.score(text) for text in texts]
+
+
+def create_keyword_matcher(keyword_groups: Dict[str, Iterable[str]], **kwargs) -> KeywordMatcher:
+    """Factory function to create a keyword matcher"""
+    return KeywordMatcher(keyword_groups, **kwargs)
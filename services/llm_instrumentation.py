@@ -0,0 +1,175 @@
+"""
+LLM Call Instrumentation
+
+Hot-path accounting for every chat completion made by Gilbert's writing
+agents. Each call records prompt/completion tokens from `response.usage`, wall
+time, model, the calling method (stage) and cache status into a bounded
+in-process ring buffer. Summaries break tokens, estimated cost and latency down
+per stage, so it is clear which step of a transformation burns the budget.
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+
+# USD per 1K tokens (prompt, completion); unknown models are costed as gpt-4
+MODEL_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+@dataclass
+class LLMCallRecord:
+    """One completion call as seen by an agent"""
+    sequence: int
+    timestamp: float
+    agent: str
+    stage: str
+    model: str
+    cache_status: str  # "hit", "miss" or "bypass" (no cache configured)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    wall_seconds: float = 0.0
+    streamed: bool = False
+    error: str = ""
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def estimated_cost(self) -> float:
+        prompt_price, completion_price = MODEL_PRICING.get(self.model, MODEL_PRICING["gpt-4"])
+        return (self.prompt_tokens * prompt_price + self.completion_tokens * completion_price) / 1000.0
+
+
+class LLMInstrumentation:
+    """Thread-safe ring buffer of LLMCallRecords with per-stage summaries"""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._records: "deque[LLMCallRecord]" = deque(maxlen=capacity)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, stage: str, request: Dict, started_at: float, cache_status: str,
+               response=None, streamed: bool = False, error: str = "") -> LLMCallRecord:
+        """
+        Record one completion call.
+
+        `started_at` is a `time.perf_counter()` reading taken before the call;
+        token counts come from `response.usage` when the response carries it.
+        """
+
+        usage = getattr(response, 'usage', None)
+        with self._lock:
+            self._sequence += 1
+            entry = LLMCallRecord(
+                sequence=self._sequence,
+                timestamp=time.time(),
+                agent=agent,
+                stage=stage,
+                model=request.get("model", ""),
+                cache_status=cache_status,
+                prompt_tokens=getattr(usage, 'prompt_tokens', 0) or 0,
+                completion_tokens=getattr(usage, 'completion_tokens', 0) or 0,
+                wall_seconds=time.perf_counter() - started_at,
+                streamed=streamed,
+                error=error
+            )
+            self._records.append(entry)
+        return entry
+
+    def mark(self) -> int:
+        """Return the current sequence number, for summarizing only the calls made after it"""
+        with self._lock:
+            return self._sequence
+
+    def records(self, since: int = 0) -> List[LLMCallRecord]:
+        """Return buffered records with a sequence number greater than `since`"""
+        with self._lock:
+            return [entry for entry in self._records if entry.sequence > since]
+
+    def summary(self, since: int = 0) -> Dict:
+        """Aggregate calls, cache hits, tokens, estimated cost and wall time per stage"""
+
+        stages: Dict[str, Dict] = {}
+        totals = {"calls": 0, "cache_hits": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                  "estimated_cost": 0.0, "wall_seconds": 0.0}
+
+        for entry in self.records(since):
+            stage = stages.setdefault(entry.stage, {
+                "calls": 0, "cache_hits": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "estimated_cost": 0.0, "wall_seconds": 0.0, "max_wall_seconds": 0.0
+            })
+            for bucket in (stage, totals):
+                bucket["calls"] += 1
+                bucket["cache_hits"] += entry.cache_status == "hit"
+                bucket["errors"] += bool(entry.error)
+                bucket["prompt_tokens"] += entry.prompt_tokens
+                bucket["completion_tokens"] += entry.completion_tokens
+                bucket["estimated_cost"] += entry.estimated_cost
+                bucket["wall_seconds"] += entry.wall_seconds
+            stage["max_wall_seconds"] = max(stage["max_wall_seconds"], entry.wall_seconds)
+
+        for bucket in list(stages.values()) + [totals]:
+            bucket["avg_wall_seconds"] = bucket["wall_seconds"] / bucket["calls"] if bucket["calls"] else 0.0
+            bucket["estimated_cost"] = round(bucket["estimated_cost"], 6)
+
+        return {"stages": stages, "totals": totals}
+
+    def export_jsonl(self, path: str, since: int = 0) -> int:
+        """Append buffered records to a JSONL file; returns the number written"""
+
+        entries = self.records(since)
+        with open(path, 'a', encoding='utf-8') as handle:
+            for entry in entries:
+                row = asdict(entry)
+                row["total_tokens"] = entry.total_tokens
+                row["estimated_cost"] = entry.estimated_cost
+                handle.write(json.dumps(row) + "\n")
+        return len(entries)
+
+    def clear(self):
+        """Drop every buffered record"""
+        with self._lock:
+            self._records.clear()
+
+
+def print_stage_summary(summary: Dict):
+    """Print a per-stage table for benchmark output"""
+
+    print(f"{'Stage':<45} {'Calls':>5} {'Hits':>5} {'Prompt':>8} {'Compl.':>8} {'Cost $':>9} {'Avg s':>7}")
+    for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["wall_seconds"]):
+        print(f"{name:<45} {stage['calls']:>5} {stage['cache_hits']:>5} {stage['prompt_tokens']:>8} "
+              f"{stage['completion_tokens']:>8} {stage['estimated_cost']:>9.4f} {stage['avg_wall_seconds']:>7.2f}")
+    totals = summary["totals"]
+    print(f"{'TOTAL':<45} {totals['calls']:>5} {totals['cache_hits']:>5} {totals['prompt_tokens']:>8} "
+          f"{totals['completion_tokens']:>8} {totals['estimated_cost']:>9.4f} {totals['avg_wall_seconds']:>7.2f}")
+
+
+_shared_instrumentation: Optional[LLMInstrumentation] = None
+_shared_instrumentation_lock = threading.Lock()
+
+
+def create_llm_instrumentation(**kwargs) -> LLMInstrumentation:
+    """Factory function to create an LLM call recorder"""
+    return LLMInstrumentation(**kwargs)
+
+
+def get_shared_instrumentation() -> LLMInstrumentation:
+    """Return the process-wide recorder shared by both writing agents"""
+    global _shared_instrumentation
+
+    with _shared_instrumentation_lock:
+        if _shared_instrumentation is None:
+            _shared_instrumentation = create_llm_instrumentation()
+        return _shared_instrumentation
@@ -0,0 +1,246 @@
+"""
+Content-Addressed LLM Response Cache
+
+Shared response cache for Gilbert's writing agents. Responses are keyed on the
+full completion request (model, system prompt, user prompt, temperature,
+max_tokens) so re-running unchanged content through the agents costs zero API
+calls. Lookups go through a small in-memory LRU tier first and fall back to an
+on-disk SQLite tier that survives process restarts.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'llm_response_cache.sqlite3')
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for the response cache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache for chat completion responses.
+
+    Any object exposing `get(key)`, `set(key, value)` and `key_for_request(request)`
+    can be plugged into the agents in place of this class.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CACHE_PATH, memory_entries: int = 256,
+                 ttl_seconds: Optional[float] = 30 * 24 * 3600, max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            db_path: SQLite file for the disk tier, or None for a memory-only cache
+            memory_entries: Maximum number of responses kept in the LRU tier
+            ttl_seconds: Entry lifetime, or None to keep entries until evicted
+            max_disk_bytes: Size cap for the disk tier; least recently used rows are evicted first
+        """
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = CacheStats()
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(db_path, check_same_thread=False)
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            self._connection.commit()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str,
+                 temperature: Optional[float] = None, max_tokens: Optional[int] = None, **params) -> str:
+        """Build the content address for a completion request"""
+
+        payload = {
+            "model": model,
+            "system": system_prompt,
+            "user": user_prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        payload.update(params)
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def key_for_request(self, request: Dict) -> str:
+        """Build the content address for a `chat.completions.create` keyword dict"""
+
+        messages = request.get("messages", [])
+        system_prompt = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+        user_prompt = "\n".join(m["content"] for m in messages if m.get("role") != "system")
+        extra = {k: v for k, v in request.items()
+                 if k not in ("model", "messages", "temperature", "max_tokens", "stream")}
+
+        return self.make_key(
+            request.get("model", ""),
+            system_prompt,
+            user_prompt,
+            request.get("temperature"),
+            request.get("max_tokens"),
+            **extra
+        )
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None on a miss"""
+
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return value
+                del self._memory[key]
+                self.stats.expirations += 1
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._connection.commit()
+                        self._remember(key, value, created_at)
+                        self.stats.disk_hits += 1
+                        return value
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._connection.commit()
+                    self.stats.expirations += 1
+
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Store a response under `key` in both tiers"""
+
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, value, now)
+            self.stats.writes += 1
+
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value.encode('utf-8')), now, now)
+                )
+                self._evict_disk()
+                self._connection.commit()
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Insert into the memory tier, evicting the least recently used entry when full"""
+
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _evict_disk(self):
+        """Drop expired rows, then least recently used rows until under the size cap"""
+
+        if self.ttl_seconds is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self.stats.expirations += cursor.rowcount
+
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM responses")
+                self._connection.commit()
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+
+        with self._lock:
+            stats = asdict(self.stats)
+            stats["hit_rate"] = self.stats.hit_rate
+            stats["memory_entries"] = len(self._memory)
+            if self._connection is not None:
+                count, size = self._connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+        return stats
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def create_llm_response_cache(db_path: Optional[str] = DEFAULT_CACHE_PATH, **kwargs) -> LLMResponseCache:
+    """Factory function to create an LLM response cache"""
+    return LLMResponseCache(db_path=db_path, **kwargs)
+
+
+def get_shared_response_cache() -> LLMResponseCache:
+    """Return the process-wide cache shared by both writing agents"""
+    global _shared_cache
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = create_llm_response_cache(os.environ.get('LLM_CACHE_PATH', DEFAULT_CACHE_PATH))
+        return _shared_cache
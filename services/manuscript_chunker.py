@@ -0,0 +1,239 @@
+"""
+Manuscript Chunking Engine
+
+Splits long markdown manuscripts into token-budgeted segments on heading and
+paragraph boundaries so the writing agents can transform full books instead of
+truncating them. Segments are transformed concurrently and reassembled in their
+original order; each segment carries a short tail of the previous one as
+read-only context to keep Gilbert's voice continuous across boundaries.
+"""
+
+import re
+import asyncio
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List
+
+try:
+    import tiktoken
+except ImportError:  # fall back to the character heuristic below
+    tiktoken = None
+
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+@dataclass
+class ManuscriptChunk:
+    """One token-budgeted segment of a manuscript"""
+    index: int
+    text: str
+    context: str  # tail of the previous segment, for voice continuity only
+    token_estimate: int
+
+
+class MarkdownChunker:
+    """Token-budgeted markdown splitter that prefers heading, then paragraph, then sentence boundaries"""
+
+    def __init__(self, max_tokens: int = 900, overlap_tokens: int = 80, chars_per_token: float = 4.0,
+                 model: str = "gpt-4"):
+        """
+        Args:
+            max_tokens: Input budget per segment; keep well under the transformation's max_tokens
+                        because the agents expand text while rewriting it
+            overlap_tokens: Size of the previous-segment tail passed along as context
+            chars_per_token: Estimation ratio used when tiktoken is not installed
+            model: Model name used to select the tiktoken encoding
+        """
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.chars_per_token = chars_per_token
+        self._encoding = None
+
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def estimate_tokens(self, text: str) -> int:
+        """Estimate the number of tokens in `text`"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return int(len(text) / self.chars_per_token) + 1
+
+    def needs_chunking(self, text: str) -> bool:
+        """True when `text` exceeds a single segment's budget"""
+        return self.estimate_tokens(text) > self.max_tokens
+
+    def _blocks(self, markdown: str) -> List[str]:
+        """Split markdown into headings and paragraphs, keeping fenced code blocks whole"""
+
+        blocks = []
+        current = []
+        in_fence = False
+
+        for line in markdown.split('\n'):
+            stripped = line.strip()
+
+            if stripped.startswith('```'):
+                in_fence = not in_fence
+                current.append(line)
+                continue
+
+            if not in_fence and HEADING_PATTERN.match(line):
+                if current:
+                    blocks.append('\n'.join(current).strip('\n'))
+                blocks.append(line)
+                current = []
+            elif not in_fence and not stripped:
+                if current:
+                    blocks.append('\n'.join(current).strip('\n'))
+                current = []
+            else:
+                current.append(line)
+
+        if current:
+            blocks.append('\n'.join(current).strip('\n'))
+
+        return [block for block in blocks if block.strip()]
+
+    def _split_oversized(self, block: str) -> List[str]:
+        """Break a single block that exceeds the budget on sentence, then character, boundaries"""
+
+        pieces = []
+        current = ""
+
+        for sentence in SENTENCE_BOUNDARY.split(block):
+            candidate = f"{current} {sentence}".strip() if current else sentence
+            if self.estimate_tokens(candidate) <= self.max_tokens:
+                current = candidate
+                continue
+
+            if current:
+                pieces.append(current)
+            current = sentence
+
+            # A single sentence over budget is cut at a fixed character width
+            max_chars = int(self.max_tokens * self.chars_per_token)
+            while self.estimate_tokens(current) > self.max_tokens and len(current) > max_chars:
+                pieces.append(current[:max_chars])
+                current = current[max_chars:]
+
+        if current:
+            pieces.append(current)
+
+        return pieces
+
+    def _tail(self, text: str) -> str:
+        """Return roughly `overlap_tokens` worth of text from the end of `text`, on a word boundary"""
+
+        if self.overlap_tokens <= 0:
+            return ""
+
+        max_chars = int(self.overlap_tokens * self.chars_per_token)
+        if len(text) <= max_chars:
+            return text
+
+        tail = text[-max_chars:]
+        space = tail.find(' ')
+        return tail[space + 1:] if space != -1 else tail
+
+    def split(self, markdown: str) -> List[ManuscriptChunk]:
+        """Split a manuscript into ordered, token-budgeted chunks"""
+
+        segments = []
+        current: List[str] = []
+        current_tokens = 0
+
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                segments.append('\n\n'.join(current))
+            current = []
+            current_tokens = 0
+
+        for block in self._blocks(markdown):
+            block_tokens = self.estimate_tokens(block)
+            is_heading = bool(HEADING_PATTERN.match(block))
+
+            # Start a fresh segment at a heading once the current one is half full,
+            # so sections stay together whenever the budget allows
+            if is_heading and current_tokens > self.max_tokens // 2:
+                flush()
+
+            if block_tokens > self.max_tokens:
+                flush()
+                for piece in self._split_oversized(block):
+                    segments.append(piece)
+                continue
+
+            if current_tokens + block_tokens > self.max_tokens:
+                flush()
+
+            current.append(block)
+            current_tokens += block_tokens
+
+        flush()
+
+        # Never leave a heading stranded at the end of a segment
+        merged: List[str] = []
+        carry = ""
+        for segment in segments:
+            text = f"{carry}\n\n{segment}" if carry else segment
+            carry = ""
+            lines = text.rstrip().split('\n')
+            if len(lines) > 1 and HEADING_PATTERN.match(lines[-1]):
+                carry = lines[-1]
+                text = '\n'.join(lines[:-1]).rstrip()
+            merged.append(text)
+        if carry:
+            merged.append(carry)
+
+        chunks = []
+        previous = ""
+        for index, text in enumerate(merged):
+            chunks.append(ManuscriptChunk(
+                index=index,
+                text=text,
+                context=self._tail(previous),
+                token_estimate=self.estimate_tokens(text)
+            ))
+            previous = text
+
+        return chunks
+
+    @staticmethod
+    def reassemble(parts: List[str]) -> str:
+        """Join transformed segments back into one manuscript, in order"""
+        return '\n\n'.join(part.strip() for part in parts if part and part.strip())
+
+
+def map_chunks(chunks: List[ManuscriptChunk], transform: Callable[[ManuscriptChunk], str],
+               concurrency: int = 4) -> List[str]:
+    """Transform chunks on a bounded thread pool, returning results in chunk order"""
+
+    if len(chunks) <= 1 or concurrency <= 1:
+        return [transform(chunk) for chunk in chunks]
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+        return list(executor.map(transform, chunks))
+
+
+async def amap_chunks(chunks: List[ManuscriptChunk], transform: Callable[[ManuscriptChunk], Awaitable[str]],
+                      concurrency: int = 4) -> List[str]:
+    """Transform chunks with at most `concurrency` coroutines in flight, returning results in chunk order"""
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(chunk: ManuscriptChunk) -> str:
+        async with semaphore:
+            return await transform(chunk)
+
+    return await asyncio.gather(*(run(chunk) for chunk in chunks))
+
+
+def create_markdown_chunker(**kwargs) -> MarkdownChunker:
+    """Factory function to create a markdown chunker"""
+    return MarkdownChunker(**kwargs)
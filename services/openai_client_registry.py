@@ -0,0 +1,180 @@
+"""
+Shared OpenAI Client Registry
+
+Process-wide sync and async OpenAI clients for Gilbert's writing agents. The
+agent factories and testers create agents freely, and a client per instance
+meant a fresh connection pool, DNS lookup and TLS handshake on every first
+call. Clients built here share one keep-alive pool per variant, with
+configurable pool size, timeouts and optional HTTP/2.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+from openai import DEFAULT_MAX_RETRIES, OpenAI, AsyncOpenAI
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class ClientSettings:
+    """HTTP settings shared by the sync and async clients"""
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    http2: bool = True
+
+    @classmethod
+    def from_environment(cls) -> "ClientSettings":
+        return cls(
+            max_connections=int(os.environ.get('OPENAI_HTTP_MAX_CONNECTIONS', cls.max_connections)),
+            max_keepalive_connections=int(os.environ.get('OPENAI_HTTP_MAX_KEEPALIVE', cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.environ.get('OPENAI_HTTP_KEEPALIVE_EXPIRY', cls.keepalive_expiry)),
+            connect_timeout=float(os.environ.get('OPENAI_CONNECT_TIMEOUT', cls.connect_timeout)),
+            read_timeout=float(os.environ.get('OPENAI_READ_TIMEOUT', cls.read_timeout)),
+            http2=os.environ.get('OPENAI_HTTP2', '1').lower() not in ('0', 'false', 'no')
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+
+class OpenAIClientRegistry:
+    """Lazily builds one pooled sync client and one pooled async client"""
+
+    def __init__(self, settings: Optional[ClientSettings] = None, api_key: Optional[str] = None):
+        self.settings = settings or ClientSettings()
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        self._client: Optional[OpenAI] = None
+        self._batch_client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._lock = threading.Lock()
+
+    @property
+    def http2(self) -> bool:
+        return self.settings.http2 and HTTP2_AVAILABLE
+
+    def get_client(self) -> OpenAI:
+        """Return the shared sync client"""
+
+        with self._lock:
+            if self._client is None:
+                # Retries are scheduled by the shared rate limiter rather than the client
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    max_retries=0,
+                    timeout=self.settings.timeout(),
+                    http_client=httpx.Client(
+                        limits=self.settings.limits(), timeout=self.settings.timeout(), http2=self.http2
+                    )
+                )
+            return self._client
+
+    def get_batch_client(self) -> OpenAI:
+        """
+        Return a sync client on the same pool that keeps the SDK's own retries.
+
+        Files and Batches API calls are not scheduled by the rate limiter, so
+        with max_retries=0 one 429 or 5xx would fail a whole batch submission.
+        """
+
+        client = self.get_client()
+        with self._lock:
+            if self._batch_client is None:
+                self._batch_client = client.with_options(max_retries=DEFAULT_MAX_RETRIES)
+            return self._batch_client
+
+    def get_async_client(self) -> AsyncOpenAI:
+        """
+        Return the shared async client.
+
+        Its pool belongs to the event loop that first uses it; long-lived
+        services run one loop, and scripts that call asyncio.run repeatedly
+        should `aclose()` the registry between runs.
+        """
+
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    max_retries=0,
+                    timeout=self.settings.timeout(),
+                    http_client=httpx.AsyncClient(
+                        limits=self.settings.limits(), timeout=self.settings.timeout(), http2=self.http2
+                    )
+                )
+            return self._async_client
+
+    def close(self):
+        """Close the sync pool; the async pool is closed with `aclose`"""
+
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = self._batch_client = None
+
+    async def aclose(self):
+        """Close the async pool"""
+
+        with self._lock:
+            client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.close()
+
+    def get_info(self) -> Dict:
+        """Return the pool configuration and which clients have been built"""
+
+        return {
+            "max_connections": self.settings.max_connections,
+            "max_keepalive_connections": self.settings.max_keepalive_connections,
+            "connect_timeout": self.settings.connect_timeout,
+            "read_timeout": self.settings.read_timeout,
+            "http2": self.http2,
+            "sync_client_ready": self._client is not None,
+            "async_client_ready": self._async_client is not None
+        }
+
+
+_shared_registry: Optional[OpenAIClientRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def create_openai_client_registry(**kwargs) -> OpenAIClientRegistry:
+    """Factory function to create an OpenAI client registry"""
+    return OpenAIClientRegistry(**kwargs)
+
+
+def get_shared_client_registry() -> OpenAIClientRegistry:
+    """Return the process-wide registry shared by every OpenAI call site"""
+    global _shared_registry
+
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = create_openai_client_registry(settings=ClientSettings.from_environment())
+        return _shared_registry
+
+
+def get_shared_openai_client() -> OpenAI:
+    """Return the process-wide pooled sync client"""
+    return get_shared_client_registry().get_client()
+
+
+def get_shared_async_openai_client() -> AsyncOpenAI:
+    """Return the process-wide pooled async client"""
+    return get_shared_client_registry().get_async_client()
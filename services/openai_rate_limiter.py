@@ -0,0 +1,263 @@
+"""
+Global OpenAI Rate Limiter and Retry Scheduler
+
+One process-wide limiter for every chat completion made by Gilbert's writing
+agents and their testers. Requests-per-minute and tokens-per-minute budgets are
+enforced with token buckets, and rate-limit or transient server errors are
+retried with jittered exponential backoff that honours `Retry-After` headers,
+so bulk runs can sit at the provider's limit without silently losing output.
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError'}
+
+
+@dataclass
+class RateLimiterMetrics:
+    """Queue and wait-time metrics for the rate limiter"""
+    total_requests: int = 0
+    throttled_requests: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    retries: int = 0
+    rate_limited_responses: int = 0
+    failed_requests: int = 0
+
+    @property
+    def average_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.total_requests if self.total_requests else 0.0
+
+
+class TokenBucket:
+    """Continuously refilling bucket; reservations may overdraw it and callers wait out the debt"""
+
+    def __init__(self, capacity_per_minute: float, now: Optional[float] = None):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic() if now is None else now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` from the bucket and return how long the caller must wait for it"""
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float):
+        """Return over-estimated tokens to the bucket"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def estimate_request_tokens(request: Dict, chars_per_token: float = 4.0, default_completion_tokens: int = 1000) -> int:
+    """Estimate prompt plus completion tokens for a `chat.completions.create` keyword dict"""
+
+    prompt_chars = sum(len(message.get("content") or "") for message in request.get("messages", []))
+    return int(prompt_chars / chars_per_token) + request.get("max_tokens", default_completion_tokens)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's requested delay from `retry-after-ms` / `retry-after` headers, if any"""
+
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate-limit, timeout, connection and 5xx errors from the OpenAI client"""
+
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return getattr(error, 'status_code', None) in RETRYABLE_STATUS_CODES
+
+
+class OpenAIRateLimiter:
+    """Shared requests/tokens-per-minute limiter with jittered exponential backoff"""
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 150000,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        """
+        Args:
+            requests_per_minute: Request budget
+            tokens_per_minute: Prompt plus completion token budget
+            max_retries: Retries of a retryable error before it is raised
+            base_delay: First backoff ceiling in seconds, doubled on every attempt
+            max_delay: Longest single backoff, including server-requested ones
+            clock: Monotonic time source for the buckets
+            sleep: Blocking wait used by run/acquire
+            async_sleep: Awaitable wait used by arun/aacquire
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.request_bucket = TokenBucket(requests_per_minute, clock())
+        self.token_bucket = TokenBucket(tokens_per_minute, clock())
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = RateLimiterMetrics()
+        self._lock = threading.Lock()
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        with self._lock:
+            now = self.clock()
+            wait = max(
+                self.request_bucket.reserve(1, now),
+                self.token_bucket.reserve(estimated_tokens, now)
+            )
+            self.metrics.total_requests += 1
+            self.metrics.total_wait_seconds += wait
+            self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, wait)
+            if wait > 0:
+                self.metrics.throttled_requests += 1
+                self.metrics.queue_depth += 1
+                self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.metrics.queue_depth)
+            return wait
+
+    def _leave_queue(self):
+        with self._lock:
+            self.metrics.queue_depth -= 1
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until the request fits the budget; returns the time spent waiting"""
+
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            try:
+                self.sleep(wait)
+            finally:
+                self._leave_queue()
+        return wait
+
+    async def aacquire(self, estimated_tokens: int) -> float:
+        """Async twin of acquire"""
+
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            try:
+                await self.async_sleep(wait)
+            finally:
+                self._leave_queue()
+        return wait
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the real usage of a request is known"""
+
+        if actual_tokens is None:
+            return
+        with self._lock:
+            difference = estimated_tokens - actual_tokens
+            if difference > 0:
+                self.token_bucket.refund(difference)
+            else:
+                self.token_bucket.reserve(-difference, self.clock())
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Server-requested delay when given, otherwise full-jitter exponential backoff"""
+
+        with self._lock:
+            self.metrics.retries += 1
+            if getattr(error, 'status_code', None) == 429 or type(error).__name__ == 'RateLimitError':
+                self.metrics.rate_limited_responses += 1
+
+        server_delay = retry_after_seconds(error)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _record_failure(self):
+        with self._lock:
+            self.metrics.failed_requests += 1
+
+    def run(self, call: Callable[[], T], estimated_tokens: int) -> T:
+        """Run `call` inside the budget, retrying retryable errors"""
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens)
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._record_failure()
+                    raise
+                self.sleep(self._backoff_delay(attempt, e))
+
+    async def arun(self, call: Callable[[], Awaitable[T]], estimated_tokens: int) -> T:
+        """Async twin of run"""
+
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(estimated_tokens)
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._record_failure()
+                    raise
+                await self.async_sleep(self._backoff_delay(attempt, e))
+
+    def get_metrics(self) -> Dict:
+        """Return queue depth, wait-time and retry metrics"""
+
+        with self._lock:
+            metrics = asdict(self.metrics)
+            metrics["average_wait_seconds"] = self.metrics.average_wait_seconds
+        return metrics
+
+
+_shared_limiter: Optional[OpenAIRateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def create_rate_limiter(**kwargs) -> OpenAIRateLimiter:
+    """Factory function to create an OpenAI rate limiter"""
+    return OpenAIRateLimiter(**kwargs)
+
+
+def get_shared_rate_limiter() -> OpenAIRateLimiter:
+    """Return the process-wide limiter shared by every OpenAI call site"""
+    global _shared_limiter
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = create_rate_limiter(
+                requests_per_minute=int(os.environ.get('OPENAI_REQUESTS_PER_MINUTE', 500)),
+                tokens_per_minute=int(os.environ.get('OPENAI_TOKENS_PER_MINUTE', 150000))
+            )
+        return _shared_limiter
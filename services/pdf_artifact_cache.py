@@ -0,0 +1,169 @@
+"""
+Content-Hash PDF Artifact Cache
+
+On-disk cache of rendered PDFs keyed by a hash of the enhanced content, the
+stylesheet and the renderer version, so regenerating unchanged documents
+skips WeasyPrint entirely. Writes are atomic (temp file + os.replace), reads
+refresh the file's mtime, and the directory is kept under a size cap by
+evicting the least recently used artifacts first. An optional age limit also
+drops artifacts that have not been read for that long.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+
+DEFAULT_ARTIFACT_CACHE = os.path.join('.cache', 'pdf_artifacts')
+
+
+@dataclass
+class ArtifactCacheStats:
+    """Hit/miss counters for the artifact cache"""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+class PDFArtifactCache:
+    """Size-capped, LRU-by-mtime directory of rendered PDFs"""
+
+    def __init__(self, cache_dir: str = DEFAULT_ARTIFACT_CACHE, max_bytes: int = 1024 * 1024 * 1024,
+                 max_age_seconds: Optional[float] = None):
+        """
+        Args:
+            cache_dir: Directory holding the cached PDFs
+            max_bytes: Size cap; least recently used artifacts are evicted first
+            max_age_seconds: Evict artifacts not read for this long, regardless of size
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.stats = ArtifactCacheStats()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content: str, css: str, renderer_version: str, **params) -> str:
+        """Build the content address for a rendered artifact"""
+
+        payload = json.dumps({
+            "content": content,
+            "css": css,
+            "renderer_version": renderer_version,
+            "params": params
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Return the path of the cached PDF for `key`, or None on a miss"""
+
+        path = self._path(key)
+        try:
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except FileNotFoundError:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+
+        with self._lock:
+            self.stats.hits += 1
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for `key`, or None on a miss"""
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as handle:
+                data = handle.read()
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except FileNotFoundError:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+
+        with self._lock:
+            self.stats.hits += 1
+        return data
+
+    def temporary_path(self, key: str) -> str:
+        """Unique scratch path inside the cache directory for rendering `key` straight to disk"""
+        return f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def commit(self, key: str, temporary_path: str) -> str:
+        """Atomically move a fully written scratch file into place, then evict down to the size cap"""
+
+        path = self._path(key)
+        os.replace(temporary_path, path)
+
+        with self._lock:
+            self.stats.writes += 1
+            self._evict()
+        return path
+
+    def set(self, key: str, data: bytes):
+        """Store a PDF atomically, then evict down to the size cap"""
+
+        temporary_path = self.temporary_path(key)
+        with open(temporary_path, 'wb') as handle:
+            handle.write(data)
+        self.commit(key, temporary_path)
+
+    def _evict(self):
+        """Delete expired artifacts, then least recently used ones until the directory fits the cap"""
+
+        expires_before = time.time() - self.max_age_seconds if self.max_age_seconds else None
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pdf'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        for mtime, size, name in sorted(entries):
+            if total <= self.max_bytes and (expires_before is None or mtime >= expires_before):
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats.evictions += 1
+
+    def clear(self):
+        """Remove every cached artifact"""
+
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.pdf'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and the current directory size"""
+
+        with self._lock:
+            stats = asdict(self.stats)
+        sizes = [os.path.getsize(os.path.join(self.cache_dir, name))
+                 for name in os.listdir(self.cache_dir) if name.endswith('.pdf')]
+        stats["entries"] = len(sizes)
+        stats["bytes"] = sum(sizes)
+        return stats
+
+
+def create_pdf_artifact_cache(cache_dir: str = DEFAULT_ARTIFACT_CACHE, **kwargs) -> PDFArtifactCache:
+    """Factory function to create a PDF artifact cache"""
+    return PDFArtifactCache(cache_dir=cache_dir, **kwargs)
@@ -7,13 +7,102 @@ generated by Gilbert's AI agents.
 """
 
 import os
+import time
 import base64
-import markdown2
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from weasyprint import HTML, CSS
+from weasyprint import HTML, CSS, __version__ as WEASYPRINT_VERSION
 from weasyprint.text.fonts import FontConfiguration
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from services.incremental_pdf_renderer import DEFAULT_FRAGMENT_CACHE, create_incremental_pdf_renderer
+from services.pdf_artifact_cache import DEFAULT_ARTIFACT_CACHE, create_pdf_artifact_cache
+from services.github_bulk_publisher import (StreamingContentsBody, create_github_bulk_publisher, git_blob_sha,
+                                            git_blob_sha_of_bytes)
+from services.pdf_renderers import DRAFT_RENDERERS, DocumentRenderer
+from services.document_preparation import find_title, get_shared_document_preparer
+
+
+# Bump whenever the HTML template changes so cached PDFs are not reused
+RENDERER_VERSION = "1"
+
+# (connect, read) seconds for GitHub API calls
+GITHUB_TIMEOUT = (10, 120)
+
+
+def is_github_rate_limit(headers) -> bool:
+    """True when a 403 carries GitHub's primary (remaining 0) or secondary (Retry-After) rate-limit headers"""
+    return bool(headers.get('Retry-After')) or headers.get('X-RateLimit-Remaining') == '0'
+
+
+class GitHubRetry(Retry):
+    """Retry idempotent requests on 429 and 5xx, plus 403s only when they are rate limits"""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # A plain 403 is a permissions problem; give the response back instead of retrying it
+        if response is not None and response.status == 403 and not is_github_rate_limit(response.headers):
+            raise MaxRetryError(_pool, url, ResponseError("403 without rate-limit headers"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def create_github_session(pool_size: int = 16, retries: int = 4) -> requests.Session:
+    """
+    Keep-alive session for api.github.com with a connection pool and retry policy
+
+    POST and PATCH (Git Data blobs, trees, commits, ref updates) are never
+    retried on a status, so a request that reached GitHub is not repeated.
+    """
+
+    retry = GitHubRetry(
+        total=retries,
+        backoff_factor=1.0,
+        status_forcelist=(403, 429, 500, 502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.headers['Accept'] = 'application/vnd.github.v3+json'
+    return session
+
+
+class WeasyPrintRenderer(DocumentRenderer):
+    """High-fidelity layout with the service's precompiled theme stylesheets"""
+    
+    name = "weasyprint"
+    
+    def render(self, service, content: str, content_type: str = "markdown", theme: Optional[str] = None,
+               target=None) -> Optional[bytes]:
+        if content_type == "markdown":
+            html_content = service.markdown_to_html(content, service.markdown_title(content))
+        else:
+            html_content = content
+        
+        stylesheets = [service.get_stylesheet(theme or "default")] if content_type == "markdown" or theme else []
+        
+        # Generate PDF
+        return HTML(string=html_content).write_pdf(
+            target,
+            stylesheets=stylesheets,
+            font_config=service.font_config
+        )
+
+
+@dataclass
+class UploadResult:
+    """Outcome and timing of one file upload"""
+    file_path: str
+    success: bool
+    status_code: int = 0
+    elapsed_seconds: float = 0.0
+    error: str = ""
+    unchanged: bool = False  # the repository already had identical content
 
 
 class PDFGenerationService:
@@ -193,15 +282,87 @@ class PDFGenerationService:
             margin: 30pt 0;
         }
         """
+        
+        # Theme presets layered over the base styles
+        self.theme_overrides = {
+            "default": "",
+            "sympathetic": """
+            h1, .title-page h1 { color: #7b341e; }
+            h2 { color: #9c4221; border-bottom-color: #feebc8; }
+            blockquote { background: #fffaf0; border-left-color: #dd6b20; }
+            """,
+            "professional": """
+            h1, h2, h3 { font-family: 'Helvetica Neue', 'Arial', sans-serif; }
+            h1, .title-page h1 { color: #1a365d; }
+            blockquote { border-left-color: #2c5282; font-style: normal; }
+            """,
+            "lead_magnet": """
+            @page { margin: 1.5cm; }
+            body { font-size: 10.5pt; }
+            h1 { font-size: 20pt; margin: 20pt 0 12pt 0; page-break-before: auto; }
+            .title-page { margin-top: 60pt; }
+            """
+        }
+        
+        # Parse every theme once; WeasyPrint reuses the compiled rules for each PDF
+        self.stylesheets = {
+            name: CSS(string=self.css_styles + overrides, font_config=self.font_config)
+            for name, overrides in self.theme_overrides.items()
+        }
+        
+        # Chapter-fragment renderer used by generate_pdf(..., incremental=True)
+        self.incremental_renderer = create_incremental_pdf_renderer(
+            self, cache_dir=os.environ.get('PDF_FRAGMENT_CACHE', DEFAULT_FRAGMENT_CACHE),
+            max_bytes=int(os.environ.get('PDF_FRAGMENT_CACHE_MAX_BYTES', 512 * 1024 * 1024)),
+            max_age_seconds=float(os.environ.get('PDF_FRAGMENT_CACHE_MAX_AGE_DAYS', 30)) * 24 * 3600,
+            renderer_version=RENDERER_VERSION
+        )
+        
+        # Finished PDFs keyed by content + CSS + renderer version, used by get_or_render
+        self.artifact_cache = create_pdf_artifact_cache(
+            os.environ.get('PDF_ARTIFACT_CACHE', DEFAULT_ARTIFACT_CACHE),
+            max_bytes=int(os.environ.get('PDF_ARTIFACT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+        )
+        
+        # One pooled keep-alive session for every GitHub call, so uploads reuse TLS connections
+        self.upload_workers = int(os.environ.get('GITHUB_UPLOAD_WORKERS', 8))
+        self.session = create_github_session(pool_size=max(self.upload_workers, 8))
+        self.session.headers['Authorization'] = f'token {self.github_token}'
+        
+        # Rendering backends by name; drafts skip WeasyPrint layout for fast previews
+        self.renderers: Dict[str, DocumentRenderer] = dict(DRAFT_RENDERERS, weasyprint=WeasyPrintRenderer())
+        
+        # Markdown is parsed once per distinct text and shared with the export paths
+        self.document_preparer = get_shared_document_preparer()
     
-    def markdown_to_html(self, markdown_content: str, title: str = "", author: str = "Gilbert Cesarano") -> str:
-        """Convert markdown content to HTML with professional styling"""
+    def get_renderer(self, name: str = "weasyprint") -> DocumentRenderer:
+        """Return a rendering backend by name ("weasyprint", "draft" or "draft-pdf")"""
+        
+        if name not in self.renderers:
+            raise ValueError(f"Unknown renderer '{name}', expected one of {sorted(self.renderers)}")
+        return self.renderers[name]
+    
+    def markdown_title(self, content: str) -> str:
+        """Title from the first `# ` heading, as shown on the title page"""
+        return find_title(content)
+    
+    def get_stylesheet(self, theme: str = "default") -> CSS:
+        """Return the precompiled stylesheet for a theme preset, falling back to the default"""
+        return self.stylesheets.get(theme, self.stylesheets["default"])
+    
+    def markdown_to_html(self, markdown_content: str, title: str = "", author: str = "Gilbert Cesarano",
+                         inline_styles: bool = False, include_title_page: bool = True,
+                         theme: Optional[str] = None) -> str:
+        """
+        Convert markdown content to HTML with professional styling
+        
+        PDF rendering applies the precompiled stylesheet, so styles are only
+        inlined when the HTML itself is the deliverable. The markdown body is
+        converted once per distinct text and reused from the preparer.
+        """
         
         # Convert markdown to HTML
-        html_content = markdown2.markdown(
-            markdown_content,
-            extras=['fenced-code-blocks', 'tables', 'header-ids', 'toc']
-        )
+        html_content = self.document_preparer.prepare(markdown_content).html
         
         # Create title page
         current_date = datetime.now().strftime("%B %Y")
@@ -213,7 +374,10 @@ class PDFGenerationService:
             <div class="author">By {author}</div>
             <div class="date">{current_date}</div>
         </div>
-        """
+        """ if include_title_page else ""
+        
+        style_block = (f"<style>{self.css_styles}{self.theme_overrides.get(theme or 'default', '')}</style>"
+                       if inline_styles else "")
         
         # Create complete HTML document
         full_html = f"""
@@ -223,7 +387,7 @@ class PDFGenerationService:
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>{title}</title>
-            <style>{self.css_styles}</style>
+            {style_block}
         </head>
         <body>
             {title_page}
@@ -234,34 +398,130 @@ class PDFGenerationService:
         
         return full_html
     
-    def generate_pdf(self, content: str, filename: str, content_type: str = "markdown") -> bytes:
-        """Generate PDF from content"""
+    def _write_pdf(self, content: str, content_type: str, theme: Optional[str], incremental: bool, target=None):
+        """Render content; returns the PDF bytes, or writes them to `target` and returns None"""
+        
+        if content_type == "markdown" and incremental and self.incremental_renderer.available:
+            return self.incremental_renderer.render(content, theme, target)
+        
+        return self.renderers["weasyprint"].render(self, content, content_type, theme, target)
+    
+    def generate_pdf(self, content: str, filename: str, content_type: str = "markdown",
+                     theme: Optional[str] = None, incremental: bool = False) -> bytes:
+        """
+        Generate PDF from content
+        
+        Markdown is styled with the precompiled theme (default unless given);
+        raw HTML keeps its own styles unless a theme is requested. With
+        incremental=True markdown is rendered chapter by chapter and unchanged
+        chapters are reused from the fragment cache (requires pypdf).
+        """
         
         try:
-            if content_type == "markdown":
-                # Extract title from content
-                lines = content.split('\n')
-                title = "Enhanced Content"
-                for line in lines:
-                    if line.startswith('# '):
-                        title = line[2:].strip()
-                        break
-                
-                html_content = self.markdown_to_html(content, title)
-            else:
-                html_content = content
-            
-            # Generate PDF
-            pdf_bytes = HTML(string=html_content).write_pdf(
-                font_config=self.font_config
-            )
-            
-            return pdf_bytes
+            return self._write_pdf(content, content_type, theme, incremental)
             
         except Exception as e:
             print(f"Error generating PDF: {e}")
             return b""
     
+    def render_to_file(self, content: str, target, content_type: str = "markdown",
+                       theme: Optional[str] = None, incremental: bool = False) -> bool:
+        """
+        Render straight to a path or binary file object instead of returning bytes
+        
+        Paths are written through a temporary file and renamed into place, so a
+        failed render never leaves a truncated PDF behind.
+        """
+        
+        if not isinstance(target, (str, os.PathLike)):
+            try:
+                self._write_pdf(content, content_type, theme, incremental, target)
+                return True
+            except Exception as e:
+                print(f"Error generating PDF: {e}")
+                return False
+        
+        temporary_path = f"{target}.tmp"
+        try:
+            self._write_pdf(content, content_type, theme, incremental, temporary_path)
+            os.replace(temporary_path, target)
+            return True
+        except Exception as e:
+            print(f"Error generating PDF: {e}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return False
+    
+    def render(self, content: str, renderer: str = "weasyprint", content_type: str = "markdown",
+               theme: Optional[str] = None) -> Tuple[bytes, str]:
+        """
+        Render with a named backend and return (document bytes, media type)
+        
+        Previews pass renderer="draft" or "draft-pdf"; final exports use the
+        default WeasyPrint backend. Raises ValueError for unknown backends.
+        """
+        
+        backend = self.get_renderer(renderer)
+        if backend.name == "weasyprint":
+            return self.get_or_render(content, "", content_type, theme), backend.media_type
+        return backend.render(self, content, content_type, theme), backend.media_type
+    
+    def _artifact_key(self, content: str, content_type: str, theme: Optional[str]) -> str:
+        return self.artifact_cache.make_key(
+            content,
+            self.css_styles + self.theme_overrides.get(theme or "default", ""),
+            f"{RENDERER_VERSION}/{WEASYPRINT_VERSION}",
+            content_type=content_type,
+            theme=theme,
+            # The title page shows the month of rendering
+            title_date=datetime.now().strftime("%B %Y")
+        )
+    
+    def get_or_render(self, content: str, filename: str, content_type: str = "markdown",
+                      theme: Optional[str] = None, incremental: bool = False) -> bytes:
+        """Return the cached PDF for unchanged content, rendering and caching it otherwise"""
+        
+        key = self._artifact_key(content, content_type, theme)
+        pdf_bytes = self.artifact_cache.get(key)
+        if pdf_bytes is not None:
+            return pdf_bytes
+        
+        pdf_bytes = self.generate_pdf(content, filename, content_type, theme, incremental)
+        if pdf_bytes:
+            self.artifact_cache.set(key, pdf_bytes)
+        return pdf_bytes
+    
+    def get_or_render_path(self, content: str, filename: str, content_type: str = "markdown",
+                           theme: Optional[str] = None, incremental: bool = False) -> Optional[str]:
+        """
+        Disk-only twin of get_or_render: returns the path of the cached PDF
+        
+        A miss is rendered straight into the artifact cache, so the PDF is never
+        held in memory as a whole. Returns None when rendering fails.
+        """
+        
+        key = self._artifact_key(content, content_type, theme)
+        cached_path = self.artifact_cache.get_path(key)
+        if cached_path:
+            return cached_path
+        
+        temporary_path = self.artifact_cache.temporary_path(key)
+        if not self.render_to_file(content, temporary_path, content_type, theme, incremental):
+            return None
+        return self.artifact_cache.commit(key, temporary_path)
+    
+    def _contents_url(self, file_path: str) -> str:
+        return f'https://api.github.com/repos/{self.github_username}/{self.repo_name}/contents/{file_path}'
+    
+    def _remote_sha(self, file_path: str) -> Optional[str]:
+        """Blob SHA of the file already in the repository, or None when it does not exist yet"""
+        
+        response = self.session.get(self._contents_url(file_path), timeout=GITHUB_TIMEOUT)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()['sha']
+    
     def upload_pdf_to_github(self, pdf_content: bytes, file_path: str, commit_message: str = None) -> bool:
         """Upload PDF content to GitHub repository"""
         
@@ -269,25 +529,26 @@ class PDFGenerationService:
             commit_message = f"Add enhanced PDF: {file_path}"
         
         try:
+            # Replacing a file needs its current SHA; an identical file is left alone
+            remote_sha = self._remote_sha(file_path)
+            if remote_sha == git_blob_sha_of_bytes(pdf_content):
+                print(f"⏭️  {file_path} unchanged")
+                return True
+            
             # Encode PDF content to base64
             content_encoded = base64.b64encode(pdf_content).decode('utf-8')
             
-            # GitHub API endpoint
-            url = f'https://api.github.com/repos/{self.github_username}/{self.repo_name}/contents/{file_path}'
-            
-            headers = {
-                'Authorization': f'token {self.github_token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            
             data = {
                 'message': commit_message,
                 'content': content_encoded
             }
+            if remote_sha:
+                data['sha'] = remote_sha
             
-            response = requests.put(url, headers=headers, json=data)
+            response = self.session.put(self._contents_url(file_path), json=data, timeout=GITHUB_TIMEOUT)
             
-            if response.status_code == 201:
+            # 201 creates the file, 200 updates it
+            if response.status_code in (200, 201):
                 print(f"✅ {file_path}")
                 return True
             else:
@@ -298,6 +559,95 @@ class PDFGenerationService:
             print(f"❌ Error uploading {file_path}: {str(e)}")
             return False
     
+    def _upload_file(self, local_path: str, file_path: str, commit_message: str = None) -> UploadResult:
+        """Stream one file from disk to the contents API over the pooled session"""
+        
+        if not commit_message:
+            commit_message = f"Add enhanced PDF: {file_path}"
+        
+        started = time.perf_counter()
+        try:
+            # Replacing a file needs its current SHA; an identical file is left alone
+            fields = {'message': commit_message}
+            remote_sha = self._remote_sha(file_path)
+            if remote_sha == git_blob_sha(local_path):
+                return UploadResult(file_path, True, elapsed_seconds=time.perf_counter() - started, unchanged=True)
+            if remote_sha:
+                fields['sha'] = remote_sha
+            
+            # The body rewinds itself, so the session's retries can resend it
+            with StreamingContentsBody(local_path, fields) as body:
+                response = self.session.put(self._contents_url(file_path), data=body, timeout=GITHUB_TIMEOUT,
+                                            headers={'Content-Type': 'application/json'})
+            
+            # 201 creates the file, 200 updates it
+            return UploadResult(file_path, response.status_code in (200, 201), response.status_code,
+                                time.perf_counter() - started)
+        
+        except Exception as e:
+            return UploadResult(file_path, False, elapsed_seconds=time.perf_counter() - started, error=str(e))
+    
+    def upload_file_to_github(self, local_path: str, file_path: str, commit_message: str = None) -> bool:
+        """Upload a PDF from disk, base64-encoding it while the request body is sent"""
+        
+        result = self._upload_file(local_path, file_path, commit_message)
+        
+        if result.unchanged:
+            print(f"⏭️  {file_path} unchanged")
+        elif result.success:
+            print(f"✅ {file_path}")
+        elif result.error:
+            print(f"❌ Error uploading {file_path}: {result.error}")
+        else:
+            print(f"❌ {file_path}: {result.status_code}")
+        return result.success
+    
+    def upload_many(self, files: Dict[str, str], commit_message: str = None,
+                    max_workers: Optional[int] = None) -> List[UploadResult]:
+        """
+        Upload {repo path: local path} concurrently over the pooled session.
+        
+        Each file is still its own contents API commit; use publish_files for a
+        single commit. Returns one UploadResult per file, in input order.
+        """
+        
+        workers = max(1, min(max_workers or self.upload_workers, len(files) or 1))
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda item: self._upload_file(item[1], item[0], commit_message), files.items()
+            ))
+        
+        succeeded = sum(result.success for result in results)
+        for result in results:
+            if result.unchanged:
+                print(f"⏭️  {result.file_path} unchanged")
+            elif result.success:
+                print(f"✅ {result.file_path} ({result.elapsed_seconds:.2f}s)")
+            else:
+                print(f"❌ {result.file_path}: {result.error or result.status_code}")
+        print(f"📤 Uploaded {succeeded}/{len(results)} file(s) in {time.perf_counter() - started:.2f}s")
+        return results
+    
+    def publish_files(self, files: Dict[str, str], commit_message: str, branch: str = "main") -> bool:
+        """Publish {repo path: local path} as a single commit, skipping files that are unchanged"""
+
+        try:
+            publisher = create_github_bulk_publisher(self.github_username, self.repo_name, self.github_token,
+                                                     session=self.session, concurrency=self.upload_workers)
+            result = publisher.publish(files, commit_message, branch)
+
+            for file_path in result.uploaded:
+                print(f"✅ {file_path}")
+            if result.unchanged:
+                print(f"⏭️  {len(result.unchanged)} unchanged file(s) skipped")
+            return result.success
+
+        except Exception as e:
+            print(f"❌ Error publishing {len(files)} file(s): {str(e)}")
+            return False
+
     def process_and_upload_ebook(self, enhanced_content: str, original_filename: str, 
                                 agent_type: str = "enhanced") -> bool:
         """Process enhanced eBook content and upload as PDF"""
@@ -306,13 +656,13 @@ class PDFGenerationService:
         base_name = original_filename.replace('.md', '').replace('_', '-')
         pdf_filename = f"enhanced_ebooks/{base_name}-{agent_type}-enhanced.pdf"
         
-        # Generate PDF
-        pdf_content = self.generate_pdf(enhanced_content, pdf_filename)
+        # Render into the artifact cache and upload from disk
+        pdf_path = self.get_or_render_path(enhanced_content, pdf_filename, incremental=True)
         
-        if pdf_content:
+        if pdf_path:
             # Upload to GitHub
             commit_message = f"Add {agent_type} enhanced eBook: {base_name}"
-            return self.upload_pdf_to_github(pdf_content, pdf_filename, commit_message)
+            return self.upload_file_to_github(pdf_path, pdf_filename, commit_message)
         
         return False
 
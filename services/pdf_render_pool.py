@@ -0,0 +1,120 @@
+"""
+Process-Pool PDF Rendering Engine
+
+WeasyPrint layout is CPU-bound and single-threaded, so PDFGenerationService
+renders one document per core at best. This pool keeps warm worker processes
+that each build their PDFGenerationService (fonts and CSS) once and then render
+documents in parallel, so batch rebuilds scale with the number of cores.
+
+Workers render into the service's on-disk artifact cache and hand back only
+the path, so finished PDFs are never pickled across the process boundary.
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+
+# Per-process service, created once by the pool initializer
+_worker_service = None
+
+
+def _create_default_service():
+    from services.pdf_generation_service import create_pdf_service
+    return create_pdf_service()
+
+
+def _initialize_worker(service_factory: Callable):
+    """Load fonts and CSS once per worker process"""
+    global _worker_service
+
+    _worker_service = service_factory()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _render(content: str, filename: str, content_type: str, theme: Optional[str]) -> Optional[str]:
+    return _worker_service.get_or_render_path(content, filename, content_type, theme)
+
+
+class PDFRenderPool:
+    """Warm process pool exposing `submit(content) -> Future` and `render_many(docs)`"""
+
+    def __init__(self, max_workers: Optional[int] = None, warm: bool = True, start_method: Optional[str] = None,
+                 service_factory: Callable = _create_default_service):
+        """
+        Args:
+            max_workers: Worker processes; defaults to the number of CPUs
+            warm: Start every worker and load its fonts immediately instead of on first use
+            start_method: multiprocessing start method ("fork", "spawn", "forkserver")
+            service_factory: Picklable callable building each worker's service; it must provide
+                             get_or_render_path(content, filename, content_type, theme)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        context = multiprocessing.get_context(start_method) if start_method else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=context, initializer=_initialize_worker,
+            initargs=(service_factory,)
+        )
+        if warm:
+            self.warm_up()
+
+    def warm_up(self) -> int:
+        """Spin up the workers so the first real render does not pay the startup cost"""
+
+        futures = [self._executor.submit(_warm_up) for _ in range(self.max_workers)]
+        return len({future.result() for future in futures})
+
+    def submit(self, content: str, filename: str = "", content_type: str = "markdown",
+               theme: Optional[str] = None) -> Future:
+        """Queue one document; the future resolves to the cached PDF's path (None on render failure)"""
+        return self._executor.submit(_render, content, filename, content_type, theme)
+
+    def render_many(self, docs: List[Union[str, Dict]]) -> List[Optional[str]]:
+        """
+        Render documents in parallel and return their PDF paths in input order.
+
+        Each doc is markdown content or {"content", "filename", "content_type", "theme"}.
+        """
+
+        futures = []
+        for doc in docs:
+            if isinstance(doc, str):
+                doc = {"content": doc}
+            futures.append(self.submit(doc["content"], doc.get("filename", ""), doc.get("content_type", "markdown"),
+                                       doc.get("theme")))
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+_shared_pool: Optional[PDFRenderPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def create_pdf_render_pool(**kwargs) -> PDFRenderPool:
+    """Factory function to create a PDF render pool"""
+    return PDFRenderPool(**kwargs)
+
+
+def get_shared_render_pool() -> PDFRenderPool:
+    """Return the process-wide render pool (PDF_RENDER_WORKERS overrides the worker count)"""
+    global _shared_pool
+
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            workers = os.environ.get('PDF_RENDER_WORKERS')
+            _shared_pool = create_pdf_render_pool(max_workers=int(workers) if workers else None)
+        return _shared_pool
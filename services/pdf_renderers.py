@@ -0,0 +1,162 @@
+"""
+Pluggable Document Renderers
+
+PDFGenerationService renders through a named backend. "weasyprint" is the
+high-fidelity engine used for final exports; the draft backends skip layout
+entirely for dashboard previews: "draft" returns the styled HTML document and
+"draft-pdf" writes a plain paginated PDF directly, both in milliseconds even
+for full manuscripts.
+"""
+
+import re
+import textwrap
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+
+class DocumentRenderer(ABC):
+    """Interface for a rendering backend"""
+
+    name = ""
+    media_type = "application/pdf"
+    extension = "pdf"
+
+    @abstractmethod
+    def render(self, service, content: str, content_type: str = "markdown", theme: Optional[str] = None,
+               target=None) -> Optional[bytes]:
+        """Return the document bytes, or write them to `target` (a path or binary file object) and return None"""
+
+
+def _emit(data: bytes, target) -> Optional[bytes]:
+    if target is None:
+        return data
+    if hasattr(target, 'write'):
+        target.write(data)
+    else:
+        with open(target, 'wb') as handle:
+            handle.write(data)
+    return None
+
+
+class DraftHTMLRenderer(DocumentRenderer):
+    """The themed HTML document the PDF would be laid out from, with styles inlined"""
+
+    name = "draft"
+    media_type = "text/html"
+    extension = "html"
+
+    def render(self, service, content: str, content_type: str = "markdown", theme: Optional[str] = None,
+               target=None) -> Optional[bytes]:
+        if content_type == "markdown":
+            content = service.markdown_to_html(content, service.markdown_title(content), inline_styles=True,
+                                               theme=theme)
+        return _emit(content.encode('utf-8'), target)
+
+
+# Page geometry in points: A4 with 2cm margins
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 57
+BODY_SIZE, BODY_LEADING = 11, 15
+HEADING_SIZES = {1: 20, 2: 15, 3: 13}
+FOOTER_SPACE = 30
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+INLINE_MARKUP = re.compile(r'(\*\*|__|\*|`)')
+HTML_TAG = re.compile(r'<[^>]+>')
+
+
+def _plain(text: str) -> str:
+    return INLINE_MARKUP.sub('', LINK.sub(r'\1', text))
+
+
+def _layout_lines(content: str, content_type: str) -> List[Tuple[str, int, str]]:
+    """Turn markdown (or HTML with tags stripped) into wrapped (font, size, text) lines; "" marks a gap"""
+
+    if content_type != "markdown":
+        content = HTML_TAG.sub('', content)
+
+    lines: List[Tuple[str, int, str]] = []
+    for raw_line in content.split('\n'):
+        stripped = raw_line.strip()
+        heading = HEADING.match(stripped)
+        if heading:
+            size = HEADING_SIZES.get(len(heading.group(1)), BODY_SIZE + 1)
+            lines.append(("", 0, ""))
+            lines.extend(("F2", size, text)
+                         for text in textwrap.wrap(_plain(heading.group(2)), int(960 / size)) or [""])
+        elif not stripped or stripped == "```":
+            lines.append(("", 0, ""))
+        else:
+            bullet = stripped[:2] in ("- ", "* ", "+ ")
+            text = _plain(stripped[2:] if bullet else stripped)
+            lines.extend(("F1", BODY_SIZE, wrapped) for wrapped in textwrap.wrap(
+                text, 88, initial_indent="- " if bullet else "", subsequent_indent="  " if bullet else ""
+            ))
+    return lines
+
+
+def _escape(text: str) -> bytes:
+    # WinAnsiEncoding is cp1252, which also covers curly quotes, dashes and the ellipsis
+    encoded = text.encode('cp1252', errors='replace')
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class DraftPDFRenderer(DocumentRenderer):
+    """Plain paginated PDF in Helvetica: headings, paragraphs and page numbers, no CSS layout"""
+
+    name = "draft-pdf"
+
+    def _paginate(self, lines: List[Tuple[str, int, str]]) -> List[bytes]:
+        pages, commands = [], []
+        y = PAGE_HEIGHT - MARGIN
+        for font, size, text in lines:
+            leading = BODY_LEADING if not size else size + 6
+            if y - leading < MARGIN + FOOTER_SPACE:
+                pages.append(commands)
+                commands, y = [], PAGE_HEIGHT - MARGIN
+            if not commands and not text:
+                continue  # no blank lines at the top of a page
+            y -= leading
+            if text:
+                commands.append(b"BT /%s %d Tf %d %d Td (%s) Tj ET"
+                                % (font.encode(), size, MARGIN, y, _escape(text)))
+        pages.append(commands)
+
+        streams = []
+        for number, page_commands in enumerate(pages, start=1):
+            footer = b"BT /F1 9 Tf %d %d Td (%d) Tj ET" % (PAGE_WIDTH // 2 - 5, MARGIN, number)
+            streams.append(b"\n".join(page_commands + [footer]))
+        return streams
+
+    def render(self, service, content: str, content_type: str = "markdown", theme: Optional[str] = None,
+               target=None) -> Optional[bytes]:
+        streams = self._paginate(_layout_lines(content, content_type))
+
+        # Objects: 1 catalog, 2 page tree, 3-4 fonts, then a page and a content stream per page
+        page_ids = [5 + 2 * index for index in range(len(streams))]
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids)),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        for page_id, stream in zip(page_ids, streams):
+            objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                           b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                           % (PAGE_WIDTH, PAGE_HEIGHT, page_id + 1))
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+        output = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(output))
+            output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref_offset = len(output)
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+        return _emit(bytes(output), target)
+
+
+DRAFT_RENDERERS = {renderer.name: renderer for renderer in (DraftHTMLRenderer(), DraftPDFRenderer())}
@@ -13,10 +13,13 @@ import time
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
-# Add the services directory to Python path
+# Add the services directory, and the repository root for `services.*` imports, to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from professional_thought_leader_agent import GilbertProfessionalThoughtLeaderAgent, create_professional_thought_leader_agent
+from services.openai_rate_limiter import get_shared_rate_limiter
+from services.llm_instrumentation import print_stage_summary
 
 
 @dataclass
@@ -46,8 +49,10 @@ class ProfessionalTestSuite:
 class ProfessionalAgentTester:
     """Comprehensive testing framework for Gilbert's professional thought-leadership agent"""
     
-    def __init__(self):
+    def __init__(self, use_heuristic_validation: bool = False):
         self.agent = create_professional_thought_leader_agent()
+        # Score validations locally instead of spending an LLM call per test case
+        self.use_heuristic_validation = use_heuristic_validation
         self.professional_test_cases = self._create_professional_test_cases()
         
     def _create_professional_test_cases(self) -> Dict[str, List[Dict]]:
@@ -194,7 +199,7 @@ class ProfessionalAgentTester:
             )
             
             # Validate the professional transformation
-            validation = self.agent.validate_professional_authenticity(transformed)
+            validation = self.agent.validate_professional_authenticity(transformed, use_heuristics=self.use_heuristic_validation)
             
             # Check if test passed based on minimum score requirement
             overall_score = validation.get('overall_score', 0)
@@ -291,6 +296,12 @@ class ProfessionalAgentTester:
         print(f"Average Score: {test_suite.average_score:.1f}/10")
         print(f"Total Execution Time: {test_suite.execution_time:.2f}s")
         
+        limiter_metrics = get_shared_rate_limiter().get_metrics()
+        print(f"Rate Limiter: {limiter_metrics['throttled_requests']} throttled, "
+              f"{limiter_metrics['retries']} retries, "
+              f"avg wait {limiter_metrics['average_wait_seconds']:.2f}s, "
+              f"max queue depth {limiter_metrics['max_queue_depth']}")
+        
         if test_suite.failed_tests > 0:
             print("\n❌ FAILED TESTS:")
             for result in test_suite.test_results:
@@ -320,7 +331,7 @@ class ProfessionalAgentTester:
         transformed = self.agent.transform_to_professional_style(content, enhancement_type)
         
         # Validate transformation
-        validation = self.agent.validate_professional_authenticity(transformed)
+        validation = self.agent.validate_professional_authenticity(transformed, use_heuristics=self.use_heuristic_validation)
         
         execution_time = time.time() - start_time
         
@@ -358,7 +369,7 @@ class ProfessionalAgentTester:
         framework = self.agent.create_strategic_framework(topic, "Fortune 500 enterprises")
         
         # Validate framework quality
-        validation = self.agent.validate_professional_authenticity(framework)
+        validation = self.agent.validate_professional_authenticity(framework, use_heuristics=self.use_heuristic_validation)
         
         execution_time = time.time() - start_time
         
@@ -403,6 +414,10 @@ class ProfessionalAgentTester:
             "thought_leadership": []
         }
         
+        # Per-stage tokens, cost and latency come from the agent's call instrumentation
+        instrumentation = self.agent.instrumentation
+        benchmark_start = instrumentation.mark() if instrumentation else 0
+        
         for i, content in enumerate(benchmark_content, 1):
             print(f"Benchmarking professional sample {i}/5...")
             
@@ -410,7 +425,7 @@ class ProfessionalAgentTester:
             transformed = self.agent.transform_to_professional_style(content)
             transform_time = time.time() - start_time
             
-            validation = self.agent.validate_professional_authenticity(transformed)
+            validation = self.agent.validate_professional_authenticity(transformed, use_heuristics=self.use_heuristic_validation)
             
             benchmark_results["transformation_times"].append(transform_time)
             benchmark_results["validation_scores"].append(validation.get('overall_score', 0))
@@ -432,12 +447,18 @@ class ProfessionalAgentTester:
         print(f"Average Strategic Insight: {avg_strategic_insight:.1f}/10")
         print(f"Average Thought Leadership: {avg_thought_leadership:.1f}/10")
         
+        stage_summary = instrumentation.summary(since=benchmark_start) if instrumentation else None
+        if stage_summary:
+            print(f"\n🔬 PER-STAGE LLM USAGE:")
+            print_stage_summary(stage_summary)
+        
         return {
             "avg_transformation_time": avg_transform_time,
             "avg_validation_score": avg_validation_score,
             "avg_executive_authority": avg_executive_authority,
             "avg_strategic_insight": avg_strategic_insight,
             "avg_thought_leadership": avg_thought_leadership,
+            "stage_summary": stage_summary,
             "benchmark_data": benchmark_results
         }
 
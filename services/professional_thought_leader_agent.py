@@ -7,13 +7,20 @@ authority and strategic expertise. Designed for C-level communications, lead mag
 eBooks, articles, and enterprise consulting materials.
 """
 
-import os
 import json
 import re
-from typing import Dict, List, Optional, Tuple
-from openai import OpenAI
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+from services.heuristic_style_scorer import create_heuristic_style_scorer
+from services.llm_instrumentation import get_shared_instrumentation
+from services.llm_response_cache import get_shared_response_cache
+from services.openai_client_registry import get_shared_client_registry, get_shared_openai_client
+from services.openai_rate_limiter import estimate_request_tokens, get_shared_rate_limiter
+from services.manuscript_chunker import create_markdown_chunker, map_chunks
+from services.sympathetic_writing_agent import EnhancementError, load_json_object
+
 
 @dataclass
 class ProfessionalStyleAnalysis:
@@ -39,8 +46,22 @@ class GilbertProfessionalThoughtLeaderAgent:
     - Authentic voice with professional gravitas
     """
     
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+    def __init__(self, response_cache=None, rate_limiter=None, openai_client=None, instrumentation=None):
+        # Pooled client from the shared registry unless injected; retries are
+        # scheduled by the shared rate limiter rather than the client
+        self.openai_client = openai_client or get_shared_openai_client()
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+        
+        # Zero-API lexical scorer used as a fast path for analysis and validation;
+        # heuristic_analysis switches the transformation pipeline's analysis step to it
+        self.heuristic_scorer = create_heuristic_style_scorer()
+        self.heuristic_analysis = False
+        
+        # Long manuscripts are split into token-budgeted chunks and transformed concurrently
+        self.chunker = create_markdown_chunker()
+        self.chunk_concurrency = 4
         
         # Gilbert's professional thought-leadership characteristics
         self.professional_framework = {
@@ -132,8 +153,109 @@ class GilbertProfessionalThoughtLeaderAgent:
             """
         }
     
-    def analyze_professional_content(self, content: str) -> ProfessionalStyleAnalysis:
-        """Analyze content for Gilbert's professional thought-leadership characteristics"""
+    def _create_completion(self, request: Dict, **options):
+        """Send a completion request through the shared rate limiter"""
+        
+        if not self.rate_limiter:
+            return self.openai_client.chat.completions.create(**options, **request)
+        
+        estimated_tokens = estimate_request_tokens(request)
+        response = self.rate_limiter.run(
+            lambda: self.openai_client.chat.completions.create(**options, **request), estimated_tokens
+        )
+        usage = getattr(response, 'usage', None)
+        self.rate_limiter.reconcile(estimated_tokens, usage.total_tokens if usage else None)
+        return response
+    
+    def _record_call(self, stage: str, request: Dict, started_at: float, cache_status: str,
+                     response=None, streamed: bool = False, error: str = ""):
+        """Add one completion call to the instrumentation ring buffer, if configured"""
+        
+        if self.instrumentation:
+            self.instrumentation.record("professional", stage, request, started_at, cache_status,
+                                        response, streamed, error)
+    
+    def _complete(self, request: Dict, stage: str, cache: bool = True) -> Optional[str]:
+        """
+        Run a chat completion request, serving repeated requests from the response cache
+        
+        `stage` labels the call in the instrumentation records; cache=False
+        skips the response cache, for creative calls that should vary.
+        """
+        
+        started_at = time.perf_counter()
+        
+        cache_key = self.response_cache.key_for_request(request) if self.response_cache and cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_call(stage, request, started_at, "hit")
+                return cached
+        
+        cache_status = "miss" if cache_key else "bypass"
+        try:
+            response = self._create_completion(request)
+        except Exception as e:
+            self._record_call(stage, request, started_at, cache_status, error=str(e))
+            raise
+        self._record_call(stage, request, started_at, cache_status, response)
+        content_response = response.choices[0].message.content
+        
+        if cache_key and content_response:
+            self.response_cache.set(cache_key, content_response)
+        return content_response
+    
+    def _stream_complete(self, request: Dict, error_message: str, stage: str = "stream",
+                         cache: bool = True) -> Iterator[str]:
+        """
+        Stream a chat completion as text deltas.
+        
+        A cached response is yielded in one piece; otherwise the deltas are
+        yielded as they arrive and the assembled text is cached at the end.
+        """
+        
+        started_at = time.perf_counter()
+        cache_key = self.response_cache.key_for_request(request) if self.response_cache and cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_call(stage, request, started_at, "hit", streamed=True)
+                yield cached
+                return
+        
+        parts = []
+        last_chunk = None
+        error = ""
+        try:
+            # include_usage makes the final chunk carry the token counts
+            for chunk in self._create_completion(request, stream=True, stream_options={"include_usage": True}):
+                last_chunk = chunk
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            error = str(e)
+            print(f"Error streaming professional content: {e}")
+            if not parts:
+                yield error_message
+            return
+        finally:
+            self._record_call(stage, request, started_at, "miss" if cache_key else "bypass", last_chunk,
+                              streamed=True, error=error)
+        
+        if cache_key and parts:
+            self.response_cache.set(cache_key, "".join(parts))
+    
+    def analyze_professional_content(self, content: str, use_heuristics: bool = False) -> ProfessionalStyleAnalysis:
+        """
+        Analyze content for Gilbert's professional thought-leadership characteristics
+        
+        With use_heuristics=True the local lexical scorer replaces the LLM call.
+        """
+        
+        if use_heuristics:
+            return self.heuristic_scorer.score_professional_batch([content])[0]
         
         analysis_prompt = f"""
         Analyze this content for Gilbert Cesarano's professional thought-leadership writing style.
@@ -154,15 +276,13 @@ class GilbertProfessionalThoughtLeaderAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content_response = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are an expert in analyzing professional thought-leadership writing styles, particularly Gilbert Cesarano's executive communication approach."},
                     {"role": "user", "content": analysis_prompt}
                 ]
-            )
-            
-            content_response = response.choices[0].message.content
+            }, stage="analyze_professional_content")
             if content_response:
                 analysis_data = json.loads(content_response)
             else:
@@ -181,7 +301,8 @@ class GilbertProfessionalThoughtLeaderAgent:
             print(f"Error analyzing professional content: {e}")
             return ProfessionalStyleAnalysis(0.5, 0.5, 0.5, 0.5, 0.5, 0.5)
     
-    def transform_to_professional_style(self, content: str, target_enhancement: str = "comprehensive") -> str:
+    def transform_to_professional_style(self, content: str, target_enhancement: str = "comprehensive",
+                                        fused: bool = False, strict: bool = False) -> str:
         """
         Transform content to Gilbert's professional thought-leadership style
         
@@ -189,24 +310,179 @@ class GilbertProfessionalThoughtLeaderAgent:
             content: Original content to transform
             target_enhancement: Type of enhancement ("executive_authority", "strategic_insight", 
                               "cultural_intelligence", "business_expertise", "thought_leadership", "comprehensive")
+            fused: Analyze, transform and polish in a single structured-output call
+            strict: Raise EnhancementError when a step fails instead of passing its input through
         """
         
+        if self.chunker.needs_chunking(content):
+            return self.transform_long_manuscript(content, target_enhancement, fused=fused, strict=strict)
+        
+        if fused:
+            return self.transform_and_analyze_professional(content, target_enhancement, strict=strict)[1]
+        
         # First analyze current professional style
-        current_analysis = self.analyze_professional_content(content)
+        current_analysis = self.analyze_professional_content(content, use_heuristics=self.heuristic_analysis)
         
         if target_enhancement == "comprehensive":
             # Apply comprehensive professional transformation
-            enhanced_content = self._apply_comprehensive_professional_transformation(content, current_analysis)
+            enhanced_content = self._apply_comprehensive_professional_transformation(content, current_analysis,
+                                                                                     strict=strict)
         else:
             # Apply specific professional enhancement
-            enhanced_content = self._apply_specific_professional_enhancement(content, target_enhancement)
+            enhanced_content = self._apply_specific_professional_enhancement(content, target_enhancement,
+                                                                             strict=strict)
         
         # Final polish with professional linguistic patterns
-        final_content = self._apply_professional_linguistic_patterns(enhanced_content)
+        final_content = self._apply_professional_linguistic_patterns(enhanced_content, strict=strict)
         
         return final_content
     
-    def _apply_comprehensive_professional_transformation(self, content: str, analysis: ProfessionalStyleAnalysis) -> str:
+    def transform_long_manuscript(self, content: str, target_enhancement: str = "comprehensive",
+                                  concurrency: Optional[int] = None, fused: bool = False, strict: bool = False) -> str:
+        """
+        Transform a manuscript too long for a single prompt.
+        
+        The manuscript is split on heading and paragraph boundaries, each chunk is
+        transformed and polished on a bounded thread pool, and the results are
+        reassembled in their original order.
+        """
+        
+        chunks = self.chunker.split(content)
+        if not chunks:
+            return content
+        
+        if fused:
+            parts = map_chunks(
+                chunks,
+                lambda chunk: self.transform_and_analyze_professional(chunk.text, target_enhancement, chunk.context,
+                                                                      strict=strict)[1],
+                concurrency or self.chunk_concurrency
+            )
+            return self.chunker.reassemble(parts)
+        
+        # The opening chunk is representative enough to score the manuscript's style
+        current_analysis = self.analyze_professional_content(chunks[0].text, use_heuristics=self.heuristic_analysis)
+        
+        def transform_chunk(chunk) -> str:
+            if target_enhancement == "comprehensive":
+                enhanced = self._apply_comprehensive_professional_transformation(chunk.text, current_analysis,
+                                                                                 chunk.context, strict=strict)
+            else:
+                enhanced = self._apply_specific_professional_enhancement(chunk.text, target_enhancement,
+                                                                         chunk.context, strict=strict)
+            return self._apply_professional_linguistic_patterns(enhanced, strict=strict)
+        
+        parts = map_chunks(chunks, transform_chunk, concurrency or self.chunk_concurrency)
+        return self.chunker.reassemble(parts)
+    
+    def fused_transformation_request(self, content: str, target_enhancement: str = "comprehensive",
+                                      context: str = "") -> Dict:
+        """Build the single structured-output request that analyzes, transforms and polishes content"""
+        
+        if target_enhancement in self.professional_enhancement_prompts:
+            enhancement_instructions = self.professional_enhancement_prompts[target_enhancement]
+        else:
+            enhancement_instructions = """
+            1. EXECUTIVE AUTHORITY: Include specific Fortune 500 results, ROI metrics, enterprise-scale outcomes
+            2. STRATEGIC INSIGHT: Provide frameworks, methodologies, and systems-level analysis
+            3. CULTURAL INTELLIGENCE: Integrate multicultural business perspectives and global leadership insights
+            4. BUSINESS EXPERTISE: Showcase deep technical knowledge applied to business outcomes
+            5. THOUGHT LEADERSHIP: Present original insights and industry-leading perspectives
+            6. AUTHENTIC EXPERIENCE: Reference real client engagements and implementation results
+            """
+        
+        fused_prompt = f"""
+        Complete all three steps below in one pass for Gilbert Cesarano's professional thought-leadership style.
+        
+        STEP 1 - ANALYZE the original content. Rate each dimension from 0.0 to 1.0:
+        executive_authority, strategic_insight, cultural_intelligence, business_expertise, thought_leadership, authenticity_score
+        
+        STEP 2 - TRANSFORM the content, putting the most effort into the lowest-scoring dimensions:
+        {enhancement_instructions}
+        Keep the tone confident but not arrogant, authoritative from experience, strategic, ROI-focused and culturally intelligent.
+        
+        STEP 3 - POLISH the transformed content with Gilbert's professional linguistic patterns:
+        - Bold key concepts and frameworks
+        - Clear headings, bullet points, and organized sections
+        - Specific percentages, ROI figures, and measurable outcomes
+        - Authority markers ("In my experience implementing...", "Based on Fortune 500 results...")
+        - Framework language ("The [Framework Name] Approach")
+        - Clear next steps and calls to action
+        
+        {self._continuity_note(context)}Content to transform:
+        {content}
+        
+        Respond with this exact JSON format, where "content" is the final polished text:
+        {{"scores": {{"executive_authority": 0.8, "strategic_insight": 0.7, "cultural_intelligence": 0.6, "business_expertise": 0.9, "thought_leadership": 0.8, "authenticity_score": 0.7}}, "content": "Final transformed content"}}
+        """
+        
+        return {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are Gilbert Cesarano's executive communication specialist. You analyze, transform and polish content into thought-leadership material in a single pass and always answer in JSON."},
+                {"role": "user", "content": fused_prompt}
+            ],
+            "max_tokens": 3000,
+            "temperature": 0.6
+        }
+    
+    def parse_fused_response(self, response_content: Optional[str]) -> Tuple[ProfessionalStyleAnalysis, str]:
+        """Split a fused JSON response into its analysis scores and final text"""
+        
+        data = load_json_object(response_content)
+        scores = data.get('scores', {})
+        
+        analysis = ProfessionalStyleAnalysis(
+            executive_authority=scores.get('executive_authority', 0.0),
+            strategic_insight=scores.get('strategic_insight', 0.0),
+            cultural_intelligence=scores.get('cultural_intelligence', 0.0),
+            business_expertise=scores.get('business_expertise', 0.0),
+            thought_leadership=scores.get('thought_leadership', 0.0),
+            authenticity_score=scores.get('authenticity_score', 0.0)
+        )
+        return analysis, data.get('content', "")
+    
+    def transform_and_analyze_professional(self, content: str, target_enhancement: str = "comprehensive",
+                                           context: str = "", strict: bool = False) -> Tuple[ProfessionalStyleAnalysis, str]:
+        """
+        Fused mode: analyze, transform and polish content in one structured-output call.
+        
+        Returns the analysis of the original content together with the final text,
+        using one API call instead of three.
+        """
+        
+        try:
+            analysis, final_content = self.parse_fused_response(
+                self._complete(
+                    self.fused_transformation_request(content, target_enhancement, context),
+                    stage="transform_and_analyze_professional"
+                )
+            )
+            if strict and not final_content:
+                raise ValueError("no content in response")
+            return analysis, final_content if final_content else content
+            
+        except Exception as e:
+            if strict:
+                raise EnhancementError(f"fused professional transformation failed: {e}") from e
+            print(f"Error in fused professional transformation: {e}")
+            return ProfessionalStyleAnalysis(0.5, 0.5, 0.5, 0.5, 0.5, 0.5), content
+    
+    def _continuity_note(self, context: str) -> str:
+        """Prompt fragment carrying the previous chunk's tail when transforming a long manuscript"""
+        
+        if not context:
+            return ""
+        
+        return f"""This is one section of a longer manuscript. The passage below comes right before it;
+        use it only to keep the voice continuous and do not rewrite or repeat it:
+        
+        {context}
+        
+        """
+    
+    def _apply_comprehensive_professional_transformation(self, content: str, analysis: ProfessionalStyleAnalysis,
+                                                         context: str = "", strict: bool = False) -> str:
         """Apply comprehensive professional transformation"""
         
         transformation_prompt = f"""
@@ -242,30 +518,33 @@ class GilbertProfessionalThoughtLeaderAgent:
         - Implementation-focused recommendations
         - Professional closing with clear next steps
         
-        Transform this content maintaining Gilbert's authentic voice while elevating to thought-leadership level:
+        {self._continuity_note(context)}Transform this content maintaining Gilbert's authentic voice while elevating to thought-leadership level:
         
         {content}
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content_response = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are Gilbert Cesarano's executive communication specialist, helping to transform content into thought-leadership material that reflects his Fortune 500 experience and multicultural business expertise."},
                     {"role": "user", "content": transformation_prompt}
                 ],
-                max_tokens=2500,
-                temperature=0.6
-            )
-            
-            content_response = response.choices[0].message.content
+                "max_tokens": 2500,
+                "temperature": 0.6
+            }, stage="_apply_comprehensive_professional_transformation")
+            if strict and not content_response:
+                raise ValueError("empty response")
             return content_response if content_response else ""
             
         except Exception as e:
+            if strict:
+                raise EnhancementError(f"comprehensive professional transformation failed: {e}") from e
             print(f"Error in comprehensive professional transformation: {e}")
             return content
     
-    def _apply_specific_professional_enhancement(self, content: str, enhancement_type: str) -> str:
+    def _apply_specific_professional_enhancement(self, content: str, enhancement_type: str, context: str = "",
+                                                 strict: bool = False) -> str:
         """Apply specific professional enhancement type"""
         
         if enhancement_type not in self.professional_enhancement_prompts:
@@ -274,7 +553,7 @@ class GilbertProfessionalThoughtLeaderAgent:
         enhancement_prompt = f"""
         {self.professional_enhancement_prompts[enhancement_type]}
         
-        Transform this content in Gilbert Cesarano's professional thought-leadership voice:
+        {self._continuity_note(context)}Transform this content in Gilbert Cesarano's professional thought-leadership voice:
         {content}
         
         Maintain his authentic characteristics:
@@ -287,24 +566,30 @@ class GilbertProfessionalThoughtLeaderAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content_response = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are an expert in Gilbert Cesarano's professional thought-leadership writing style, helping to enhance content with executive authority and strategic insight."},
                     {"role": "user", "content": enhancement_prompt}
                 ],
-                max_tokens=2000,
-                temperature=0.6
-            )
-            
-            content_response = response.choices[0].message.content
+                "max_tokens": 2000,
+                "temperature": 0.6
+            }, stage="_apply_specific_professional_enhancement")
+            if strict and not content_response:
+                raise ValueError("empty response")
             return content_response if content_response else ""
             
         except Exception as e:
+            if strict:
+                raise EnhancementError(f"specific professional enhancement failed: {e}") from e
             print(f"Error in specific professional enhancement: {e}")
             return content
     
-    def _apply_professional_linguistic_patterns(self, content: str) -> str:
+    def _polish_max_tokens(self, content: str) -> int:
+        """Output budget for the polish: never below the transformation's, plus headroom for the added patterns"""
+        return max(2500, self.chunker.estimate_tokens(content) * 5 // 4)
+    
+    def _apply_professional_linguistic_patterns(self, content: str, strict: bool = False) -> str:
         """Apply Gilbert's professional linguistic patterns"""
         
         linguistic_prompt = f"""
@@ -326,24 +611,27 @@ class GilbertProfessionalThoughtLeaderAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content_response = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are a professional communication specialist focused on Gilbert Cesarano's executive writing style."},
                     {"role": "user", "content": linguistic_prompt}
                 ],
-                max_tokens=2000,
-                temperature=0.5
-            )
-            
-            content_response = response.choices[0].message.content
+                "max_tokens": self._polish_max_tokens(content),
+                "temperature": 0.5
+            }, stage="_apply_professional_linguistic_patterns")
+            if strict and not content_response:
+                raise ValueError("empty response")
             return content_response if content_response else ""
             
         except Exception as e:
+            if strict:
+                raise EnhancementError(f"professional linguistic polish failed: {e}") from e
             print(f"Error applying professional linguistic patterns: {e}")
             return content
     
-    def generate_professional_content(self, topic: str, content_type: str = "thought_leadership", target_length: str = "medium") -> str:
+    def generate_professional_content(self, topic: str, content_type: str = "thought_leadership", target_length: str = "medium",
+                                      stream: bool = False, cache: bool = False) -> Union[str, Iterator[str]]:
         """
         Generate new professional content from scratch in Gilbert's thought-leadership style
         
@@ -351,6 +639,8 @@ class GilbertProfessionalThoughtLeaderAgent:
             topic: Topic to write about
             content_type: Type of content ("thought_leadership", "executive_summary", "strategic_framework", "business_case", "market_analysis")
             target_length: Length target ("short", "medium", "long")
+            stream: When True, return a generator yielding text deltas as the model produces them
+            cache: Reuse an earlier generation for the same request; off so every call writes fresh content
         """
         
         length_guidelines = {
@@ -402,26 +692,37 @@ class GilbertProfessionalThoughtLeaderAgent:
         Write compelling professional thought-leadership content about: {topic}
         """
         
+        request = {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are Gilbert Cesarano, writing professional thought-leadership content that establishes your authority in enterprise analytics, hybrid cloud architecture, and multicultural business leadership."},
+                {"role": "user", "content": generation_prompt}
+            ],
+            "max_tokens": 3000,
+            "temperature": 0.65
+        }
+        
+        if stream:
+            return self._stream_complete(request, f"Error generating professional content about {topic}",
+                                         "generate_professional_content", cache=cache)
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are Gilbert Cesarano, writing professional thought-leadership content that establishes your authority in enterprise analytics, hybrid cloud architecture, and multicultural business leadership."},
-                    {"role": "user", "content": generation_prompt}
-                ],
-                max_tokens=3000,
-                temperature=0.65
-            )
-            
-            content_response = response.choices[0].message.content
+            content_response = self._complete(request, stage="generate_professional_content", cache=cache)
             return content_response if content_response else f"Error generating professional content about {topic}"
             
         except Exception as e:
             print(f"Error generating professional content: {e}")
             return f"Error generating professional content about {topic}"
     
-    def validate_professional_authenticity(self, content: str) -> Dict[str, any]:
-        """Validate that content matches Gilbert's authentic professional thought-leadership style"""
+    def validate_professional_authenticity(self, content: str, use_heuristics: bool = False) -> Dict[str, any]:
+        """
+        Validate that content matches Gilbert's authentic professional thought-leadership style
+        
+        With use_heuristics=True the local lexical scorer replaces the LLM call.
+        """
+        
+        if use_heuristics:
+            return self.heuristic_scorer.validate_professional(content)
         
         validation_prompt = f"""
         Evaluate this content for Gilbert Cesarano's authentic professional thought-leadership style.
@@ -446,15 +747,13 @@ class GilbertProfessionalThoughtLeaderAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content_response = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are an expert evaluator of Gilbert Cesarano's authentic professional thought-leadership style and executive communication quality."},
                     {"role": "user", "content": validation_prompt}
                 ]
-            )
-            
-            content_response = response.choices[0].message.content
+            }, stage="validate_professional_authenticity")
             if content_response:
                 return json.loads(content_response)
             else:
@@ -494,17 +793,15 @@ class GilbertProfessionalThoughtLeaderAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content_response = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are Gilbert Cesarano, creating a strategic framework that reflects your Fortune 500 experience and multicultural business expertise."},
                     {"role": "user", "content": framework_prompt}
                 ],
-                max_tokens=3000,
-                temperature=0.6
-            )
-            
-            content_response = response.choices[0].message.content
+                "max_tokens": 3000,
+                "temperature": 0.6
+            }, stage="create_strategic_framework", cache=False)
             return content_response if content_response else f"Error creating strategic framework for {framework_topic}"
             
         except Exception as e:
@@ -513,9 +810,15 @@ class GilbertProfessionalThoughtLeaderAgent:
 
 
 # Factory function for easy instantiation
-def create_professional_thought_leader_agent() -> GilbertProfessionalThoughtLeaderAgent:
+def create_professional_thought_leader_agent(client_registry=None) -> GilbertProfessionalThoughtLeaderAgent:
     """Create and return a new instance of Gilbert's Professional Thought-Leader Agent"""
-    return GilbertProfessionalThoughtLeaderAgent()
+    registry = client_registry or get_shared_client_registry()
+    return GilbertProfessionalThoughtLeaderAgent(
+        response_cache=get_shared_response_cache(),
+        rate_limiter=get_shared_rate_limiter(),
+        instrumentation=get_shared_instrumentation(),
+        openai_client=registry.get_client()
+    )
 
 
 # Example usage and testing
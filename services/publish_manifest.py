@@ -0,0 +1,272 @@
+"""
+Resumable Publish Manifest
+
+Tracks every source document through the enhance -> render -> upload stages
+in one JSON manifest: the source hash, the enhanced-text hash, the PDF hash and
+the git blob SHA last published. `resume` redoes only the stages whose inputs
+changed or that failed, so rebuilding a batch after a transient outage costs
+the documents that were actually affected instead of a full LLM re-run.
+"""
+
+import os
+import json
+import time
+import glob
+import hashlib
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+from services.github_bulk_publisher import git_blob_sha
+
+
+DEFAULT_MANIFEST = os.path.join('.cache', 'publish', 'manifest.json')
+STAGES = ("enhance", "render", "upload")
+
+
+def sha256_file(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Per-document record of what each stage last produced"""
+    source_path: str
+    repo_path: str
+    agent_type: str = ""
+    source_hash: str = ""
+    enhanced_hash: str = ""
+    rendered_from: str = ""  # enhanced_hash the current PDF was rendered from
+    pdf_hash: str = ""
+    remote_sha: str = ""  # git blob SHA of the PDF as last published
+    status: str = "pending"  # pending -> enhanced -> rendered -> published, or failed
+    failed_stage: str = ""
+    error: str = ""
+    updated_at: float = 0.0
+
+
+class PublishManifest:
+    """JSON manifest of ManifestEntries plus the enhanced texts and PDFs they point at"""
+
+    def __init__(self, path: str = DEFAULT_MANIFEST):
+        """
+        Args:
+            path: Manifest file; enhanced texts and PDFs are kept in its directory
+        """
+        self.path = path
+        self.work_dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.entries: Dict[str, ManifestEntry] = self._load()
+
+    def _load(self) -> Dict[str, ManifestEntry]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as handle:
+            documents = json.load(handle)["documents"]
+        return {source_path: ManifestEntry(**entry) for source_path, entry in documents.items()}
+
+    def save(self):
+        """Write the manifest atomically so a crash never leaves it half written"""
+
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as handle:
+            json.dump({"documents": {path: asdict(entry) for path, entry in self.entries.items()}},
+                      handle, indent=2, ensure_ascii=False)
+        os.replace(temporary_path, self.path)
+
+    def add(self, source_path: str, repo_path: str, agent_type: Optional[str] = None) -> ManifestEntry:
+        """Track a source document; re-adding it keeps its stage history"""
+
+        entry = self.entries.get(source_path)
+        if entry is None:
+            entry = self.entries[source_path] = ManifestEntry(source_path, repo_path)
+        entry.repo_path = repo_path
+        if agent_type and agent_type != entry.agent_type:
+            # A different voice invalidates the enhanced text and everything after it
+            entry.agent_type = agent_type
+            entry.enhanced_hash = ""
+        return entry
+
+    def enhanced_path(self, entry: ManifestEntry) -> str:
+        return os.path.join(self.work_dir, "enhanced", f"{entry.enhanced_hash}.md")
+
+    def pdf_path(self, entry: ManifestEntry) -> str:
+        return os.path.join(self.work_dir, "pdfs", entry.repo_path)
+
+    def plan(self, entry: ManifestEntry) -> List[str]:
+        """Return the stages that have to run for `entry`, in order"""
+
+        if (not entry.enhanced_hash or entry.source_hash != sha256_file(entry.source_path)
+                or not os.path.exists(self.enhanced_path(entry))):
+            return list(STAGES)
+
+        pdf_path = self.pdf_path(entry)
+        if (entry.rendered_from != entry.enhanced_hash or not os.path.exists(pdf_path)
+                or sha256_file(pdf_path) != entry.pdf_hash):
+            return ["render", "upload"]
+
+        if entry.remote_sha != git_blob_sha(pdf_path):
+            return ["upload"]
+        return []
+
+
+class ManifestPublisher:
+    """Drives manifest entries through enhance, render and one bulk upload, skipping finished stages"""
+
+    def __init__(self, manifest: PublishManifest, agents: Dict, pdf_service,
+                 determine_agent_type: Optional[Callable[[str], str]] = None, branch: str = "main"):
+        """
+        Args:
+            manifest: Manifest to read and update
+            agents: {"sympathetic": agent, "professional": agent}
+            pdf_service: PDFGenerationService used for rendering and publishing
+            determine_agent_type: Picks an agent for entries added without one
+            branch: Branch the PDFs are published to
+        """
+        self.manifest = manifest
+        self.agents = agents
+        self.pdf_service = pdf_service
+        self.determine_agent_type = determine_agent_type or (lambda content: "professional")
+        self.branch = branch
+
+    def _fail(self, entry: ManifestEntry, stage: str, error: Exception):
+        entry.status = "failed"
+        entry.failed_stage = stage
+        entry.error = str(error)
+        entry.updated_at = time.time()
+        self.manifest.save()
+        print(f"❌ {entry.source_path} ({stage}): {error}")
+
+    def _enhance(self, entry: ManifestEntry):
+        with open(entry.source_path, encoding='utf-8') as handle:
+            content = handle.read()
+
+        entry.agent_type = entry.agent_type or self.determine_agent_type(content)
+        # strict: a failed LLM step raises instead of handing back the source text,
+        # so an unenhanced fallback is never recorded under enhanced_hash
+        if entry.agent_type == "sympathetic":
+            enhanced = self.agents["sympathetic"].transform_to_sympathetic_style(content, strict=True)
+        else:
+            enhanced = self.agents["professional"].transform_to_professional_style(content, "comprehensive",
+                                                                                   strict=True)
+
+        entry.source_hash = sha256_file(entry.source_path)
+        entry.enhanced_hash = hashlib.sha256(enhanced.encode('utf-8')).hexdigest()
+        enhanced_path = self.manifest.enhanced_path(entry)
+        os.makedirs(os.path.dirname(enhanced_path), exist_ok=True)
+        with open(enhanced_path, 'w', encoding='utf-8') as handle:
+            handle.write(enhanced)
+
+    def _render(self, entry: ManifestEntry):
+        with open(self.manifest.enhanced_path(entry), encoding='utf-8') as handle:
+            enhanced = handle.read()
+
+        pdf_path = self.manifest.pdf_path(entry)
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        if not self.pdf_service.render_to_file(enhanced, pdf_path, theme=entry.agent_type):
+            raise ValueError("PDF rendering failed")
+        entry.rendered_from = entry.enhanced_hash
+        entry.pdf_hash = sha256_file(pdf_path)
+
+    def resume(self, upload: bool = True, commit_message: Optional[str] = None) -> Dict:
+        """Run only the stages each document still needs; returns per-stage counts"""
+
+        summary = {"documents": len(self.manifest.entries), "skipped": 0, "failed": 0}
+        summary.update({stage: 0 for stage in STAGES})
+        to_upload: List[ManifestEntry] = []
+
+        for entry in self.manifest.entries.values():
+            stages = self.manifest.plan(entry)
+            if not stages:
+                summary["skipped"] += 1
+                continue
+
+            for stage in stages:
+                if stage == "upload":
+                    to_upload.append(entry)
+                    break
+                try:
+                    getattr(self, f"_{stage}")(entry)
+                except Exception as e:
+                    self._fail(entry, stage, e)
+                    summary["failed"] += 1
+                    break
+                summary[stage] += 1
+                entry.status = "enhanced" if stage == "enhance" else "rendered"
+                entry.failed_stage = entry.error = ""
+                entry.updated_at = time.time()
+                self.manifest.save()
+
+        if upload and to_upload:
+            files = {entry.repo_path: self.manifest.pdf_path(entry) for entry in to_upload}
+            message = commit_message or f"Publish {len(files)} enhanced document(s)"
+            if self.pdf_service.publish_files(files, message, self.branch):
+                for entry in to_upload:
+                    entry.remote_sha = git_blob_sha(files[entry.repo_path])
+                    entry.status = "published"
+                    entry.failed_stage = entry.error = ""
+                    entry.updated_at = time.time()
+                summary["upload"] = len(to_upload)
+                self.manifest.save()
+            else:
+                for entry in to_upload:
+                    self._fail(entry, "upload", RuntimeError("publish failed"))
+                summary["failed"] += len(to_upload)
+
+        return summary
+
+    def get_status(self) -> Dict:
+        """Return document counts by status and the failures with their stage"""
+
+        counts: Dict[str, int] = {}
+        for entry in self.manifest.entries.values():
+            counts[entry.status] = counts.get(entry.status, 0) + 1
+        return {
+            "documents": len(self.manifest.entries),
+            "status_counts": counts,
+            "failed": {entry.source_path: f"{entry.failed_stage}: {entry.error}"
+                       for entry in self.manifest.entries.values() if entry.status == "failed"}
+        }
+
+
+def create_manifest_publisher(manifest_path: str = DEFAULT_MANIFEST, **kwargs) -> ManifestPublisher:
+    """Factory function to create a manifest publisher wired to the automatic PDF generator"""
+    # Imported here so the manifest stays usable without WeasyPrint or OpenAI installed
+    from services.automatic_pdf_generation import create_automatic_pdf_generator
+
+    generator = create_automatic_pdf_generator()
+    agents = {"sympathetic": generator.sympathetic_agent, "professional": generator.professional_agent}
+    return ManifestPublisher(
+        PublishManifest(manifest_path), agents, generator.pdf_service,
+        determine_agent_type=generator.determine_agent_type, **kwargs
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enhance, render and publish documents, redoing only stale stages")
+    parser.add_argument("command", choices=["resume", "status"])
+    parser.add_argument("source_dir", nargs="?", help="Directory of markdown sources to add before resuming")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--repo-dir", default="enhanced_ebooks", help="Repository directory the PDFs publish to")
+    parser.add_argument("--agent", choices=["sympathetic", "professional"], default=None)
+    parser.add_argument("--branch", default="main")
+    parser.add_argument("--no-upload", action="store_true", help="Stop after rendering")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print(json.dumps(ManifestPublisher(PublishManifest(args.manifest), {}, None).get_status(), indent=2))
+    else:
+        publisher = create_manifest_publisher(args.manifest, branch=args.branch)
+        if args.source_dir:
+            for source_path in sorted(glob.glob(os.path.join(args.source_dir, "*.md"))):
+                stem = os.path.splitext(os.path.basename(source_path))[0]
+                publisher.manifest.add(source_path, f"{args.repo_dir}/{stem}.pdf", args.agent)
+            publisher.manifest.save()
+
+        print("\n📊 Resume Summary:")
+        print(json.dumps(publisher.resume(upload=not args.no_upload), indent=2))
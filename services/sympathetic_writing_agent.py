@@ -5,13 +5,42 @@ This AI agent captures Gilbert Cesarano's unique writing style with enhanced
 sympathy, relatability, and emotional depth while maintaining his authentic voice.
 """
 
-import os
 import json
 import re
-from typing import Dict, List, Optional, Tuple
-from openai import OpenAI
+import time
+import asyncio
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+from services.heuristic_style_scorer import create_heuristic_style_scorer
+from services.llm_instrumentation import get_shared_instrumentation
+from services.llm_response_cache import get_shared_response_cache
+from services.openai_client_registry import (
+    get_shared_async_openai_client, get_shared_client_registry, get_shared_openai_client
+)
+from services.openai_rate_limiter import estimate_request_tokens, get_shared_rate_limiter
+from services.manuscript_chunker import create_markdown_chunker, map_chunks, amap_chunks
+
+
+class EnhancementError(Exception):
+    """A transformation step failed; raised instead of falling back to the input when strict=True"""
+
+
+def load_json_object(response_content: Optional[str]) -> Dict:
+    """
+    Parse the JSON object in a model reply
+    
+    gpt-4 has no JSON mode, so the reply may wrap the object in a code fence
+    or prose and put raw newlines inside long strings; both are tolerated.
+    """
+    
+    if not response_content:
+        return {}
+    start, end = response_content.find('{'), response_content.rfind('}')
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in model response")
+    return json.loads(response_content[start:end + 1], strict=False)
+
 
 @dataclass
 class StyleAnalysis:
@@ -37,8 +66,24 @@ class GilbertSympatheticWritingAgent:
     - Universal human experience connections
     """
     
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+    def __init__(self, response_cache=None, rate_limiter=None, openai_client=None, async_openai_client=None,
+                 instrumentation=None):
+        # Pooled clients from the shared registry unless injected; retries are
+        # scheduled by the shared rate limiter rather than the client
+        self.openai_client = openai_client or get_shared_openai_client()
+        self.async_openai_client = async_openai_client or get_shared_async_openai_client()
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+        
+        # Zero-API lexical scorer used as a fast path for analysis and validation;
+        # heuristic_analysis switches the transformation pipeline's analysis step to it
+        self.heuristic_scorer = create_heuristic_style_scorer()
+        self.heuristic_analysis = False
+        
+        # Long manuscripts are split into token-budgeted chunks and transformed concurrently
+        self.chunker = create_markdown_chunker()
+        self.chunk_concurrency = 4
         
         # Gilbert's core style characteristics
         self.style_framework = {
@@ -127,8 +172,141 @@ class GilbertSympatheticWritingAgent:
             """
         }
     
-    def analyze_content_style(self, content: str) -> StyleAnalysis:
-        """Analyze content for Gilbert's style characteristics"""
+    def _create_completion(self, request: Dict, **options):
+        """Send a completion request through the shared rate limiter"""
+        
+        if not self.rate_limiter:
+            return self.openai_client.chat.completions.create(**options, **request)
+        
+        estimated_tokens = estimate_request_tokens(request)
+        response = self.rate_limiter.run(
+            lambda: self.openai_client.chat.completions.create(**options, **request), estimated_tokens
+        )
+        usage = getattr(response, 'usage', None)
+        self.rate_limiter.reconcile(estimated_tokens, usage.total_tokens if usage else None)
+        return response
+    
+    async def _acreate_completion(self, request: Dict, **options):
+        """Async twin of _create_completion"""
+        
+        if not self.rate_limiter:
+            return await self.async_openai_client.chat.completions.create(**options, **request)
+        
+        estimated_tokens = estimate_request_tokens(request)
+        response = await self.rate_limiter.arun(
+            lambda: self.async_openai_client.chat.completions.create(**options, **request), estimated_tokens
+        )
+        usage = getattr(response, 'usage', None)
+        self.rate_limiter.reconcile(estimated_tokens, usage.total_tokens if usage else None)
+        return response
+    
+    def _record_call(self, stage: str, request: Dict, started_at: float, cache_status: str,
+                     response=None, streamed: bool = False, error: str = ""):
+        """Add one completion call to the instrumentation ring buffer, if configured"""
+        
+        if self.instrumentation:
+            self.instrumentation.record("sympathetic", stage, request, started_at, cache_status,
+                                        response, streamed, error)
+    
+    def _complete(self, request: Dict, stage: str, cache: bool = True) -> Optional[str]:
+        """
+        Run a chat completion request, serving repeated requests from the response cache
+        
+        `stage` labels the call in the instrumentation records; cache=False
+        skips the response cache, for creative calls that should vary.
+        """
+        
+        started_at = time.perf_counter()
+        
+        cache_key = self.response_cache.key_for_request(request) if self.response_cache and cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_call(stage, request, started_at, "hit")
+                return cached
+        
+        cache_status = "miss" if cache_key else "bypass"
+        try:
+            response = self._create_completion(request)
+        except Exception as e:
+            self._record_call(stage, request, started_at, cache_status, error=str(e))
+            raise
+        self._record_call(stage, request, started_at, cache_status, response)
+        response_content = response.choices[0].message.content
+        
+        if cache_key and response_content:
+            self.response_cache.set(cache_key, response_content)
+        return response_content
+    
+    async def _acomplete(self, request: Dict, stage: str, cache: bool = True) -> Optional[str]:
+        """Async twin of _complete"""
+        
+        started_at = time.perf_counter()
+        
+        cache_key = self.response_cache.key_for_request(request) if self.response_cache and cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_call(stage, request, started_at, "hit")
+                return cached
+        
+        cache_status = "miss" if cache_key else "bypass"
+        try:
+            response = await self._acreate_completion(request)
+        except Exception as e:
+            self._record_call(stage, request, started_at, cache_status, error=str(e))
+            raise
+        self._record_call(stage, request, started_at, cache_status, response)
+        response_content = response.choices[0].message.content
+        
+        if cache_key and response_content:
+            self.response_cache.set(cache_key, response_content)
+        return response_content
+    
+    def _stream_complete(self, request: Dict, error_message: str, stage: str = "stream",
+                         cache: bool = True) -> Iterator[str]:
+        """
+        Stream a chat completion as text deltas.
+        
+        A cached response is yielded in one piece; otherwise the deltas are
+        yielded as they arrive and the assembled text is cached at the end.
+        """
+        
+        started_at = time.perf_counter()
+        cache_key = self.response_cache.key_for_request(request) if self.response_cache and cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_call(stage, request, started_at, "hit", streamed=True)
+                yield cached
+                return
+        
+        parts = []
+        last_chunk = None
+        error = ""
+        try:
+            # include_usage makes the final chunk carry the token counts
+            for chunk in self._create_completion(request, stream=True, stream_options={"include_usage": True}):
+                last_chunk = chunk
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            error = str(e)
+            print(f"Error streaming sympathetic content: {e}")
+            if not parts:
+                yield error_message
+            return
+        finally:
+            self._record_call(stage, request, started_at, "miss" if cache_key else "bypass", last_chunk,
+                              streamed=True, error=error)
+        
+        if cache_key and parts:
+            self.response_cache.set(cache_key, "".join(parts))
+    
+    def _analysis_request(self, content: str) -> Dict:
+        """Build the chat completion request for style analysis"""
         
         analysis_prompt = f"""
         Analyze this content for Gilbert Cesarano's writing style characteristics.
@@ -148,36 +326,66 @@ class GilbertSympatheticWritingAgent:
         {{"vulnerability_score": 0.8, "relatability_score": 0.7, "authenticity_score": 0.9, "cultural_intelligence": 0.6, "emotional_depth": 0.8, "flow_integration": 0.7, "analysis_notes": "Brief explanation of scores"}}
         """
         
+        return {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are an expert in analyzing writing styles, particularly Gilbert Cesarano's sympathetic and authentic approach."},
+                {"role": "user", "content": analysis_prompt}
+            ]
+        }
+    
+    def _parse_style_analysis(self, response_content: Optional[str]) -> StyleAnalysis:
+        """Convert the JSON analysis response into a StyleAnalysis"""
+        
+        analysis_data = json.loads(response_content) if response_content else {}
+        
+        return StyleAnalysis(
+            vulnerability_score=analysis_data.get('vulnerability_score', 0.0),
+            relatability_score=analysis_data.get('relatability_score', 0.0),
+            authenticity_score=analysis_data.get('authenticity_score', 0.0),
+            cultural_intelligence=analysis_data.get('cultural_intelligence', 0.0),
+            emotional_depth=analysis_data.get('emotional_depth', 0.0),
+            flow_integration=analysis_data.get('flow_integration', 0.0)
+        )
+    
+    def analyze_content_style(self, content: str, use_heuristics: bool = False) -> StyleAnalysis:
+        """
+        Analyze content for Gilbert's style characteristics
+        
+        With use_heuristics=True the local lexical scorer replaces the LLM call.
+        """
+        
+        if use_heuristics:
+            return self.heuristic_scorer.score_sympathetic_batch([content])[0]
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are an expert in analyzing writing styles, particularly Gilbert Cesarano's sympathetic and authentic approach."},
-                    {"role": "user", "content": analysis_prompt}
-                ],
-
-            )
-            
-            content = response.choices[0].message.content
-            if content:
-                analysis_data = json.loads(content)
-            else:
-                analysis_data = {}
+            return self._parse_style_analysis(self._complete(
+                self._analysis_request(content),
+                stage="analyze_content_style"
+            ))
             
-            return StyleAnalysis(
-                vulnerability_score=analysis_data.get('vulnerability_score', 0.0),
-                relatability_score=analysis_data.get('relatability_score', 0.0),
-                authenticity_score=analysis_data.get('authenticity_score', 0.0),
-                cultural_intelligence=analysis_data.get('cultural_intelligence', 0.0),
-                emotional_depth=analysis_data.get('emotional_depth', 0.0),
-                flow_integration=analysis_data.get('flow_integration', 0.0)
-            )
+        except Exception as e:
+            print(f"Error analyzing content style: {e}")
+            return StyleAnalysis(0.5, 0.5, 0.5, 0.5, 0.5, 0.5)
+    
+    async def aanalyze_content_style(self, content: str, use_heuristics: bool = False) -> StyleAnalysis:
+        """Async twin of analyze_content_style"""
+        
+        if use_heuristics:
+            return self.heuristic_scorer.score_sympathetic_batch([content])[0]
+        
+        try:
+            return self._parse_style_analysis(await self._acomplete(
+                self._analysis_request(content),
+                stage="analyze_content_style"
+            ))
             
         except Exception as e:
             print(f"Error analyzing content style: {e}")
             return StyleAnalysis(0.5, 0.5, 0.5, 0.5, 0.5, 0.5)
     
-    def transform_to_sympathetic_style(self, content: str, target_enhancement: str = "comprehensive") -> str:
+    def transform_to_sympathetic_style(self, content: str, target_enhancement: str = "comprehensive",
+                                       fused: bool = False, strict: bool = False) -> str:
         """
         Transform content to Gilbert's sympathetic writing style
         
@@ -185,25 +393,270 @@ class GilbertSympatheticWritingAgent:
             content: Original content to transform
             target_enhancement: Type of enhancement ("vulnerability", "emotional_depth", 
                               "journey_focus", "universal_connection", "cultural_wisdom", "comprehensive")
+            fused: Analyze, transform and polish in a single structured-output call
+            strict: Raise EnhancementError when a step fails instead of passing its input through
         """
         
+        if self.chunker.needs_chunking(content):
+            return self.transform_long_manuscript(content, target_enhancement, fused=fused, strict=strict)
+        
+        if fused:
+            return self.transform_and_analyze_sympathetic(content, target_enhancement, strict=strict)[1]
+        
         # First analyze current style
-        current_analysis = self.analyze_content_style(content)
+        current_analysis = self.analyze_content_style(content, use_heuristics=self.heuristic_analysis)
         
         if target_enhancement == "comprehensive":
             # Apply all enhancements in sequence
-            enhanced_content = self._apply_comprehensive_transformation(content, current_analysis)
+            enhanced_content = self._apply_comprehensive_transformation(content, current_analysis, strict=strict)
         else:
             # Apply specific enhancement
-            enhanced_content = self._apply_specific_enhancement(content, target_enhancement)
+            enhanced_content = self._apply_specific_enhancement(content, target_enhancement, strict=strict)
         
         # Final polish with Gilbert's linguistic patterns
-        final_content = self._apply_linguistic_patterns(enhanced_content)
+        final_content = self._apply_linguistic_patterns(enhanced_content, strict=strict)
         
         return final_content
     
-    def _apply_comprehensive_transformation(self, content: str, analysis: StyleAnalysis) -> str:
-        """Apply comprehensive transformation based on analysis gaps"""
+    async def atransform_to_sympathetic_style(self, content: str, target_enhancement: str = "comprehensive",
+                                              fused: bool = False, strict: bool = False) -> str:
+        """
+        Async twin of transform_to_sympathetic_style built on AsyncOpenAI.
+        
+        The three steps still depend on each other, but awaiting them frees the
+        event loop to drive other documents while this one waits on the API.
+        """
+        
+        if self.chunker.needs_chunking(content):
+            return await self.atransform_long_manuscript(content, target_enhancement, fused=fused, strict=strict)
+        
+        if fused:
+            return (await self.atransform_and_analyze_sympathetic(content, target_enhancement, strict=strict))[1]
+        
+        current_analysis = await self.aanalyze_content_style(content, use_heuristics=self.heuristic_analysis)
+        
+        if target_enhancement == "comprehensive":
+            enhanced_content = await self._aapply_comprehensive_transformation(content, current_analysis, strict=strict)
+        else:
+            enhanced_content = await self._aapply_specific_enhancement(content, target_enhancement, strict=strict)
+        
+        return await self._aapply_linguistic_patterns(enhanced_content, strict=strict)
+    
+    async def atransform_many(self, contents: List[str], target_enhancement: str = "comprehensive",
+                              concurrency: int = 4, fused: bool = False) -> List[str]:
+        """
+        Transform many documents, keeping up to `concurrency` of them in flight at once.
+        
+        Results are returned in the same order as `contents`.
+        """
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def transform_one(content: str) -> str:
+            async with semaphore:
+                return await self.atransform_to_sympathetic_style(content, target_enhancement, fused=fused)
+        
+        return await asyncio.gather(*(transform_one(content) for content in contents))
+    
+    def transform_long_manuscript(self, content: str, target_enhancement: str = "comprehensive",
+                                  concurrency: Optional[int] = None, fused: bool = False, strict: bool = False) -> str:
+        """
+        Transform a manuscript too long for a single prompt.
+        
+        The manuscript is split on heading and paragraph boundaries, each chunk is
+        transformed and polished on a bounded thread pool, and the results are
+        reassembled in their original order.
+        """
+        
+        chunks = self.chunker.split(content)
+        if not chunks:
+            return content
+        
+        if fused:
+            parts = map_chunks(
+                chunks,
+                lambda chunk: self.transform_and_analyze_sympathetic(chunk.text, target_enhancement, chunk.context,
+                                                                     strict=strict)[1],
+                concurrency or self.chunk_concurrency
+            )
+            return self.chunker.reassemble(parts)
+        
+        # The opening chunk is representative enough to score the manuscript's style
+        current_analysis = self.analyze_content_style(chunks[0].text, use_heuristics=self.heuristic_analysis)
+        
+        def transform_chunk(chunk) -> str:
+            if target_enhancement == "comprehensive":
+                enhanced = self._apply_comprehensive_transformation(chunk.text, current_analysis, chunk.context,
+                                                                    strict=strict)
+            else:
+                enhanced = self._apply_specific_enhancement(chunk.text, target_enhancement, chunk.context,
+                                                            strict=strict)
+            return self._apply_linguistic_patterns(enhanced, strict=strict)
+        
+        parts = map_chunks(chunks, transform_chunk, concurrency or self.chunk_concurrency)
+        return self.chunker.reassemble(parts)
+    
+    async def atransform_long_manuscript(self, content: str, target_enhancement: str = "comprehensive",
+                                         concurrency: Optional[int] = None, fused: bool = False,
+                                         strict: bool = False) -> str:
+        """Async twin of transform_long_manuscript"""
+        
+        chunks = self.chunker.split(content)
+        if not chunks:
+            return content
+        
+        if fused:
+            async def transform_fused_chunk(chunk) -> str:
+                return (await self.atransform_and_analyze_sympathetic(chunk.text, target_enhancement, chunk.context,
+                                                                      strict=strict))[1]
+            
+            parts = await amap_chunks(chunks, transform_fused_chunk, concurrency or self.chunk_concurrency)
+            return self.chunker.reassemble(parts)
+        
+        current_analysis = await self.aanalyze_content_style(chunks[0].text, use_heuristics=self.heuristic_analysis)
+        
+        async def transform_chunk(chunk) -> str:
+            if target_enhancement == "comprehensive":
+                enhanced = await self._aapply_comprehensive_transformation(chunk.text, current_analysis, chunk.context,
+                                                                           strict=strict)
+            else:
+                enhanced = await self._aapply_specific_enhancement(chunk.text, target_enhancement, chunk.context,
+                                                                   strict=strict)
+            return await self._aapply_linguistic_patterns(enhanced, strict=strict)
+        
+        parts = await amap_chunks(chunks, transform_chunk, concurrency or self.chunk_concurrency)
+        return self.chunker.reassemble(parts)
+    
+    def fused_transformation_request(self, content: str, target_enhancement: str = "comprehensive",
+                                      context: str = "") -> Dict:
+        """Build the single structured-output request that analyzes, transforms and polishes content"""
+        
+        if target_enhancement in self.sympathy_prompts:
+            enhancement_instructions = self.sympathy_prompts[target_enhancement]
+        else:
+            enhancement_instructions = """
+            1. ADD VULNERABILITY: Include personal failures, embarrassing moments, times when strategies failed
+            2. SHOW EMOTIONAL COST: The price of growth, impact on family/relationships, moments of doubt
+            3. FOCUS ON JOURNEY: Process over achievements, multiple attempts, learning through mistakes
+            4. UNIVERSAL CONNECTION: Shared human experiences everyone can relate to
+            5. CULTURAL STORYTELLING: How different cultures taught lessons through personal experience
+            6. SELF-DEPRECATING HUMOR: Light humor about imperfections and learning moments
+            """
+        
+        fused_prompt = f"""
+        Complete all three steps below in one pass for Gilbert Cesarano's sympathetic writing style.
+        
+        STEP 1 - ANALYZE the original content. Rate each dimension from 0.0 to 1.0:
+        vulnerability_score, relatability_score, authenticity_score, cultural_intelligence, emotional_depth, flow_integration
+        
+        STEP 2 - TRANSFORM the content, putting the most effort into the lowest-scoring dimensions:
+        {enhancement_instructions}
+        Keep Gilbert's multicultural wisdom (German precision, Italian passion, Swiss discipline),
+        "training grounds" philosophy, spiritual integration and flow philosophy.
+        
+        STEP 3 - POLISH the transformed content with Gilbert's linguistic patterns:
+        - Ellipses for dramatic pauses and emphasis
+        - Strategic capitalization for key concepts (FLOW, Me vs Me!)
+        - Fragmented sentences for urgency and rhythm
+        - Question cascades at section ends
+        - Cultural expressions like "AHO!" for closing
+        - Sacred language ("sanctuary", "temple", "holy")
+        
+        {self._continuity_note(context)}Content to transform:
+        {content}
+        
+        Respond with this exact JSON format, where "content" is the final polished text:
+        {{"scores": {{"vulnerability_score": 0.8, "relatability_score": 0.7, "authenticity_score": 0.9, "cultural_intelligence": 0.6, "emotional_depth": 0.8, "flow_integration": 0.7}}, "content": "Final transformed content"}}
+        """
+        
+        return {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are Gilbert Cesarano's writing coach. You analyze, transform and polish content into his sympathetic voice in a single pass and always answer in JSON."},
+                {"role": "user", "content": fused_prompt}
+            ],
+            "max_tokens": 2500,
+            "temperature": 0.7
+        }
+    
+    def parse_fused_response(self, response_content: Optional[str]) -> Tuple[StyleAnalysis, str]:
+        """Split a fused JSON response into its analysis scores and final text"""
+        
+        data = load_json_object(response_content)
+        scores = data.get('scores', {})
+        
+        analysis = StyleAnalysis(
+            vulnerability_score=scores.get('vulnerability_score', 0.0),
+            relatability_score=scores.get('relatability_score', 0.0),
+            authenticity_score=scores.get('authenticity_score', 0.0),
+            cultural_intelligence=scores.get('cultural_intelligence', 0.0),
+            emotional_depth=scores.get('emotional_depth', 0.0),
+            flow_integration=scores.get('flow_integration', 0.0)
+        )
+        return analysis, data.get('content', "")
+    
+    def transform_and_analyze_sympathetic(self, content: str, target_enhancement: str = "comprehensive",
+                                          context: str = "", strict: bool = False) -> Tuple[StyleAnalysis, str]:
+        """
+        Fused mode: analyze, transform and polish content in one structured-output call.
+        
+        Returns the analysis of the original content together with the final text,
+        using one API call instead of three.
+        """
+        
+        try:
+            analysis, final_content = self.parse_fused_response(
+                self._complete(
+                    self.fused_transformation_request(content, target_enhancement, context),
+                    stage="transform_and_analyze_sympathetic"
+                )
+            )
+            if strict and not final_content:
+                raise ValueError("no content in response")
+            return analysis, final_content if final_content else content
+        
+        except Exception as e:
+            if strict:
+                raise EnhancementError(f"fused transformation failed: {e}") from e
+            print(f"Error in fused transformation: {e}")
+            return StyleAnalysis(0.5, 0.5, 0.5, 0.5, 0.5, 0.5), content
+    
+    async def atransform_and_analyze_sympathetic(self, content: str, target_enhancement: str = "comprehensive",
+                                                 context: str = "", strict: bool = False) -> Tuple[StyleAnalysis, str]:
+        """Async twin of transform_and_analyze_sympathetic"""
+        
+        try:
+            analysis, final_content = self.parse_fused_response(
+                await self._acomplete(
+                    self.fused_transformation_request(content, target_enhancement, context),
+                    stage="transform_and_analyze_sympathetic"
+                )
+            )
+            if strict and not final_content:
+                raise ValueError("no content in response")
+            return analysis, final_content if final_content else content
+        
+        except Exception as e:
+            if strict:
+                raise EnhancementError(f"fused transformation failed: {e}") from e
+            print(f"Error in fused transformation: {e}")
+            return StyleAnalysis(0.5, 0.5, 0.5, 0.5, 0.5, 0.5), content
+    
+    def _continuity_note(self, context: str) -> str:
+        """Prompt fragment carrying the previous chunk's tail when transforming a long manuscript"""
+        
+        if not context:
+            return ""
+        
+        return f"""This is one section of a longer manuscript. The passage below comes right before it;
+        use it only to keep the voice continuous and do not rewrite or repeat it:
+        
+        {context}
+        
+        """
+    
+    def _comprehensive_transformation_request(self, content: str, analysis: StyleAnalysis, context: str = "") -> Dict:
+        """Build the chat completion request for the comprehensive transformation"""
         
         transformation_prompt = f"""
         Transform this content to match Gilbert Cesarano's sympathetic writing style.
@@ -236,39 +689,66 @@ class GilbertSympatheticWritingAgent:
         Instead of: "Success requires discipline and focus."
         Gilbert's style: "I've failed at discipline more times than I care to count. There was this morning last month when I hit snooze six times, skipped my workout, and felt like a complete fraud teaching others about focus. But that failure taught me something powerful - discipline isn't about being perfect. It's about showing up again after you've fallen down. The German side of me wants systematic perfection, the Italian side craves passionate commitment, but the human side? The human side just needs grace to begin again."
         
-        Transform this content maintaining Gilbert's authentic voice while adding sympathetic depth:
+        {self._continuity_note(context)}Transform this content maintaining Gilbert's authentic voice while adding sympathetic depth:
         
         {content}
         """
         
+        return {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are Gilbert Cesarano's writing coach, helping to enhance his authentic voice with deeper sympathy and relatability while maintaining his unique multicultural wisdom and flow philosophy."},
+                {"role": "user", "content": transformation_prompt}
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.7
+        }
+    
+    def _apply_comprehensive_transformation(self, content: str, analysis: StyleAnalysis, context: str = "",
+                                            strict: bool = False) -> str:
+        """Apply comprehensive transformation based on analysis gaps"""
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are Gilbert Cesarano's writing coach, helping to enhance his authentic voice with deeper sympathy and relatability while maintaining his unique multicultural wisdom and flow philosophy."},
-                    {"role": "user", "content": transformation_prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.7
+            response_content = self._complete(
+                self._comprehensive_transformation_request(content, analysis, context),
+                stage="_apply_comprehensive_transformation"
             )
-            
-            content = response.choices[0].message.content
-            return content if content else ""
+            if strict and not response_content:
+                raise ValueError("empty response")
+            return response_content if response_content else ""
             
         except Exception as e:
+            if strict:
+                raise EnhancementError(f"comprehensive transformation failed: {e}") from e
             print(f"Error in comprehensive transformation: {e}")
             return content
     
-    def _apply_specific_enhancement(self, content: str, enhancement_type: str) -> str:
-        """Apply specific enhancement type"""
+    async def _aapply_comprehensive_transformation(self, content: str, analysis: StyleAnalysis,
+                                                   context: str = "", strict: bool = False) -> str:
+        """Async twin of _apply_comprehensive_transformation"""
         
-        if enhancement_type not in self.sympathy_prompts:
+        try:
+            response_content = await self._acomplete(
+                self._comprehensive_transformation_request(content, analysis, context),
+                stage="_apply_comprehensive_transformation"
+            )
+            if strict and not response_content:
+                raise ValueError("empty response")
+            return response_content if response_content else ""
+            
+        except Exception as e:
+            if strict:
+                raise EnhancementError(f"comprehensive transformation failed: {e}") from e
+            print(f"Error in comprehensive transformation: {e}")
             return content
+    
+    def _specific_enhancement_request(self, content: str, enhancement_type: str, context: str = "") -> Dict:
+        """Build the chat completion request for a specific enhancement type"""
         
         enhancement_prompt = f"""
         {self.sympathy_prompts[enhancement_type]}
         
-        Transform this content in Gilbert Cesarano's voice:
+        {self._continuity_note(context)}Transform this content in Gilbert Cesarano's voice:
         {content}
         
         Maintain his authentic characteristics:
@@ -279,26 +759,66 @@ class GilbertSympatheticWritingAgent:
         - Question cascades for reflection
         """
         
+        return {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are an expert in Gilbert Cesarano's writing style, helping to enhance his content with greater sympathy and relatability."},
+                {"role": "user", "content": enhancement_prompt}
+            ],
+            "max_tokens": 1500,
+            "temperature": 0.7
+        }
+    
+    def _apply_specific_enhancement(self, content: str, enhancement_type: str, context: str = "",
+                                    strict: bool = False) -> str:
+        """Apply specific enhancement type"""
+        
+        if enhancement_type not in self.sympathy_prompts:
+            return content
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are an expert in Gilbert Cesarano's writing style, helping to enhance his content with greater sympathy and relatability."},
-                    {"role": "user", "content": enhancement_prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.7
+            response_content = self._complete(
+                self._specific_enhancement_request(content, enhancement_type, context),
+                stage="_apply_specific_enhancement"
             )
+            if strict and not response_content:
+                raise ValueError("empty response")
+            return response_content if response_content else ""
             
-            content = response.choices[0].message.content
-            return content if content else ""
+        except Exception as e:
+            if strict:
+                raise EnhancementError(f"specific enhancement failed: {e}") from e
+            print(f"Error in specific enhancement: {e}")
+            return content
+    
+    async def _aapply_specific_enhancement(self, content: str, enhancement_type: str, context: str = "",
+                                           strict: bool = False) -> str:
+        """Async twin of _apply_specific_enhancement"""
+        
+        if enhancement_type not in self.sympathy_prompts:
+            return content
+        
+        try:
+            response_content = await self._acomplete(
+                self._specific_enhancement_request(content, enhancement_type, context),
+                stage="_apply_specific_enhancement"
+            )
+            if strict and not response_content:
+                raise ValueError("empty response")
+            return response_content if response_content else ""
             
         except Exception as e:
+            if strict:
+                raise EnhancementError(f"specific enhancement failed: {e}") from e
             print(f"Error in specific enhancement: {e}")
             return content
     
-    def _apply_linguistic_patterns(self, content: str) -> str:
-        """Apply Gilbert's specific linguistic patterns"""
+    def _polish_max_tokens(self, content: str) -> int:
+        """Output budget for the polish: never below the transformation's, plus headroom for the added patterns"""
+        return max(2000, self.chunker.estimate_tokens(content) * 5 // 4)
+    
+    def _linguistic_patterns_request(self, content: str) -> Dict:
+        """Build the chat completion request for the linguistic polish"""
         
         linguistic_prompt = f"""
         Apply Gilbert Cesarano's specific linguistic patterns to this content:
@@ -318,25 +838,55 @@ class GilbertSympatheticWritingAgent:
         Return the content with these linguistic patterns applied naturally.
         """
         
+        return {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are a linguistic pattern specialist for Gilbert Cesarano's writing style."},
+                {"role": "user", "content": linguistic_prompt}
+            ],
+            "max_tokens": self._polish_max_tokens(content),
+            "temperature": 0.6
+        }
+    
+    def _apply_linguistic_patterns(self, content: str, strict: bool = False) -> str:
+        """Apply Gilbert's specific linguistic patterns"""
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are a linguistic pattern specialist for Gilbert Cesarano's writing style."},
-                    {"role": "user", "content": linguistic_prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.6
+            response_content = self._complete(
+                self._linguistic_patterns_request(content),
+                stage="_apply_linguistic_patterns"
             )
+            if strict and not response_content:
+                raise ValueError("empty response")
+            return response_content if response_content else ""
             
-            content = response.choices[0].message.content
-            return content if content else ""
+        except Exception as e:
+            if strict:
+                raise EnhancementError(f"linguistic polish failed: {e}") from e
+            print(f"Error applying linguistic patterns: {e}")
+            return content
+    
+    async def _aapply_linguistic_patterns(self, content: str, strict: bool = False) -> str:
+        """Async twin of _apply_linguistic_patterns"""
+        
+        try:
+            response_content = await self._acomplete(
+                self._linguistic_patterns_request(content),
+                stage="_apply_linguistic_patterns"
+            )
+            if strict and not response_content:
+                raise ValueError("empty response")
+            return response_content if response_content else ""
             
         except Exception as e:
+            if strict:
+                raise EnhancementError(f"linguistic polish failed: {e}") from e
             print(f"Error applying linguistic patterns: {e}")
             return content
     
-    def generate_sympathetic_content(self, topic: str, content_type: str = "blog_post", target_length: str = "medium") -> str:
+
+    def generate_sympathetic_content(self, topic: str, content_type: str = "blog_post", target_length: str = "medium",
+                                     stream: bool = False, cache: bool = False) -> Union[str, Iterator[str]]:
         """
         Generate new content from scratch in Gilbert's sympathetic style
         
@@ -344,6 +894,8 @@ class GilbertSympatheticWritingAgent:
             topic: Topic to write about
             content_type: Type of content ("blog_post", "social_media", "email", "article")
             target_length: Length target ("short", "medium", "long")
+            stream: When True, return a generator yielding text deltas as the model produces them
+            cache: Reuse an earlier generation for the same request; off so every call writes fresh content
         """
         
         length_guidelines = {
@@ -390,26 +942,37 @@ class GilbertSympatheticWritingAgent:
         Write compelling, sympathetic content about: {topic}
         """
         
+        request = {
+            "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+            "messages": [
+                {"role": "system", "content": "You are Gilbert Cesarano, writing in your signature sympathetic style that blends vulnerability, multicultural wisdom, and spiritual insight to create deeply relatable content."},
+                {"role": "user", "content": generation_prompt}
+            ],
+            "max_tokens": 2500,
+            "temperature": 0.75
+        }
+        
+        if stream:
+            return self._stream_complete(request, f"Error generating content about {topic}",
+                                         "generate_sympathetic_content", cache=cache)
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are Gilbert Cesarano, writing in your signature sympathetic style that blends vulnerability, multicultural wisdom, and spiritual insight to create deeply relatable content."},
-                    {"role": "user", "content": generation_prompt}
-                ],
-                max_tokens=2500,
-                temperature=0.75
-            )
-            
-            content = response.choices[0].message.content
+            content = self._complete(request, stage="generate_sympathetic_content", cache=cache)
             return content if content else ""
             
         except Exception as e:
             print(f"Error generating sympathetic content: {e}")
             return f"Error generating content about {topic}"
     
-    def validate_style_authenticity(self, content: str) -> Dict[str, any]:
-        """Validate that content matches Gilbert's authentic sympathetic style"""
+    def validate_style_authenticity(self, content: str, use_heuristics: bool = False) -> Dict[str, any]:
+        """
+        Validate that content matches Gilbert's authentic sympathetic style
+        
+        With use_heuristics=True the local lexical scorer replaces the LLM call.
+        """
+        
+        if use_heuristics:
+            return self.heuristic_scorer.validate_sympathetic(content)
         
         validation_prompt = f"""
         Evaluate this content for Gilbert Cesarano's authentic sympathetic writing style.
@@ -434,16 +997,13 @@ class GilbertSympatheticWritingAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
-                messages=[
+            content = self._complete({
+                "model": "gpt-4",  # the newest OpenAI model is "gpt-5" which was released August 7, 2025. do not change this unless explicitly requested by the user
+                "messages": [
                     {"role": "system", "content": "You are an expert evaluator of Gilbert Cesarano's authentic sympathetic writing style."},
                     {"role": "user", "content": validation_prompt}
-                ],
-
-            )
-            
-            content = response.choices[0].message.content
+                ]
+            }, stage="validate_style_authenticity")
             if content:
                 return json.loads(content)
             else:
@@ -455,9 +1015,16 @@ class GilbertSympatheticWritingAgent:
 
 
 # Factory function for easy instantiation
-def create_sympathetic_writing_agent() -> GilbertSympatheticWritingAgent:
+def create_sympathetic_writing_agent(client_registry=None) -> GilbertSympatheticWritingAgent:
     """Create and return a new instance of Gilbert's Sympathetic Writing Agent"""
-    return GilbertSympatheticWritingAgent()
+    registry = client_registry or get_shared_client_registry()
+    return GilbertSympatheticWritingAgent(
+        response_cache=get_shared_response_cache(),
+        rate_limiter=get_shared_rate_limiter(),
+        instrumentation=get_shared_instrumentation(),
+        openai_client=registry.get_client(),
+        async_openai_client=registry.get_async_client()
+    )
 
 
 # Example usage and testing
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test Batch Enhancement
+Tests the checkpointed offline batch mode with the local backend
+"""
+
+import os
+import json
+import tempfile
+
+from services.batch_enhancement import BatchEnhancementJob, LocalBatchBackend
+from services.manuscript_chunker import MarkdownChunker
+
+
+class _Agent:
+    """Minimal agent exposing the fused request/response hooks the batch job uses"""
+    response_cache = None
+
+    def __init__(self):
+        self.chunker = MarkdownChunker(max_tokens=200, overlap_tokens=20)
+
+    def fused_transformation_request(self, content, target_enhancement="comprehensive", context=""):
+        return {"model": "gpt-4", "messages": [{"role": "user", "content": content}]}
+
+    def parse_fused_response(self, response_content):
+        return None, json.loads(response_content).get("content", "")
+
+
+class _Cache:
+    def __init__(self):
+        self.entries = {}
+
+    def key_for_request(self, request):
+        return request["messages"][0]["content"]
+
+    def set(self, key, value):
+        self.entries[key] = value
+
+
+class _PDFService:
+    def render_to_file(self, content, target, content_type="markdown", theme=None):
+        with open(target, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return True
+
+
+def _echo(request):
+    return json.dumps({"scores": {}, "content": request["messages"][0]["content"].upper()})
+
+
+def _job(job_dir, complete):
+    agent = _Agent()
+    return BatchEnhancementJob(job_dir, LocalBatchBackend(complete), {"sympathetic": agent, "professional": agent},
+                               _PDFService())
+
+
+def test_documents_are_batched_and_rendered_in_order():
+    """Long documents become several requests that are reassembled before rendering"""
+    with tempfile.TemporaryDirectory() as directory:
+        long_text = "\n\n".join(f"paragraph {i} " + "word " * 120 for i in range(4))
+        output = os.path.join(directory, "out", "long.pdf")
+        job = _job(os.path.join(directory, "job"), _echo)
+        job.add_documents([{"source_path": "long.md", "output_path": output, "content": long_text}])
+
+        summary = job.run(poll_interval=0)
+
+        assert summary["requests"] > 1
+        assert summary["status_counts"] == {"rendered": 1}
+        with open(output, encoding='utf-8') as handle:
+            assert handle.read().split() == long_text.upper().split()
+
+
+def test_resume_only_resubmits_missing_results():
+    """Failed requests are retried from the checkpoint without repeating finished ones"""
+    with tempfile.TemporaryDirectory() as directory:
+        calls = []
+
+        def flaky(request):
+            calls.append(request["messages"][0]["content"])
+            if request["messages"][0]["content"] == "second" and calls.count("second") == 1:
+                raise RuntimeError("server error")
+            return _echo(request)
+
+        job_dir = os.path.join(directory, "job")
+        job = _job(job_dir, flaky)
+        job.add_documents([
+            {"source_path": name, "output_path": os.path.join(directory, f"{name}.pdf"), "content": name}
+            for name in ("first", "second")
+        ])
+        job.submit()
+        job.wait(poll_interval=0)
+        job.collect()
+
+        resumed = _job(job_dir, flaky)
+        summary = resumed.run(poll_interval=0)
+
+        assert sorted(calls) == ["first", "second", "second"]
+        assert summary["status_counts"] == {"rendered": 2}
+        assert len(summary["batches"]) == 2
+
+
+def test_local_backend_answers_each_request_with_its_own_agent():
+    """Requests are routed by the agent type in their custom_id"""
+    with tempfile.TemporaryDirectory() as directory:
+        answered = []
+
+        def completer(agent_type):
+            def complete(request):
+                answered.append((agent_type, request["messages"][0]["content"]))
+                return _echo(request)
+            return complete
+
+        agent = _Agent()
+        backend = LocalBatchBackend({name: completer(name) for name in ("sympathetic", "professional")})
+        job = BatchEnhancementJob(os.path.join(directory, "job"), backend,
+                                  {"sympathetic": agent, "professional": agent}, _PDFService())
+        job.add_documents([
+            {"source_path": name, "output_path": os.path.join(directory, f"{name}.pdf"), "content": name,
+             "agent_type": name}
+            for name in ("sympathetic", "professional")
+        ])
+
+        summary = job.run(poll_interval=0)
+
+        assert sorted(answered) == [("professional", "professional"), ("sympathetic", "sympathetic")]
+        assert summary["status_counts"] == {"rendered": 2}
+
+
+def test_unusable_responses_keep_the_source_text_and_are_not_cached():
+    """A refused or malformed chunk falls back to its source text instead of vanishing from the book"""
+    with tempfile.TemporaryDirectory() as directory:
+        def unusable_middle(request):
+            content = request["messages"][0]["content"]
+            if content.startswith("paragraph 1 "):
+                return json.dumps({"refusal": "I can't help with that."})
+            if content.startswith("paragraph 2 "):
+                return "not json"
+            return _echo(request)
+
+        long_text = "\n\n".join(f"paragraph {i} " + "word " * 120 for i in range(4))
+        output = os.path.join(directory, "long.pdf")
+        job = _job(os.path.join(directory, "job"), unusable_middle)
+        cache = job.agents["sympathetic"].response_cache = _Cache()
+        job.add_documents([{"source_path": "long.md", "output_path": output, "content": long_text}])
+
+        summary = job.run(poll_interval=0)
+
+        assert summary["status_counts"] == {"rendered": 1}
+        paragraphs = long_text.split("\n\n")
+        with open(output, encoding='utf-8') as handle:
+            assert handle.read().split() == " ".join([paragraphs[0].upper(), paragraphs[1], paragraphs[2],
+                                                      paragraphs[3].upper()]).split()
+        assert sorted(key[:12] for key in cache.entries) == ["paragraph 0 ", "paragraph 3 "]
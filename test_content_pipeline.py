@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test Content Pipeline
+Tests the bounded, multi-stage worker pipeline
+"""
+
+import os
+import time
+import tempfile
+from dataclasses import dataclass, field
+
+from services.content_pipeline import ContentPipeline, PipelineItem, StagedPipeline
+
+
+@dataclass
+class _Item:
+    value: int
+    failed_stage: str = ""
+    error: str = ""
+    stage_seconds: dict = field(default_factory=dict)
+
+
+def _slow_double(item):
+    time.sleep(0.05)
+    item.value *= 2
+    return item
+
+
+def _reject_odd_inputs(item):
+    if item.value % 4:
+        raise ValueError("odd")
+    return item
+
+
+def test_every_item_finishes_and_failures_stop_at_their_stage():
+    """Failed items skip later stages; the rest pass through all of them"""
+    pipeline = StagedPipeline([
+        ("double", _slow_double, 4),
+        ("check", _reject_odd_inputs, 2),
+        ("tag", lambda item: item, 1)
+    ], queue_size=2)
+
+    finished = pipeline.run(_Item(value) for value in range(8))
+
+    assert sorted(item.value for item in finished) == [0, 2, 4, 6, 8, 10, 12, 14]
+    assert {item.value for item in finished if item.failed_stage == "check"} == {2, 6, 10, 14}
+    assert [(stats.name, stats.processed, stats.failed) for stats in pipeline.stats] == [
+        ("double", 8, 0), ("check", 4, 4), ("tag", 4, 0)
+    ]
+
+
+def test_stage_workers_run_concurrently():
+    """Four workers on a 50ms stage finish eight items in about two rounds, not eight"""
+    pipeline = StagedPipeline([("double", _slow_double, 4)])
+
+    started = time.perf_counter()
+    pipeline.run(_Item(value) for value in range(8))
+
+    assert time.perf_counter() - started < 0.3
+    assert pipeline.stats[0].throughput > 0
+    assert pipeline.run([]) == []
+
+
+def test_stats_describe_only_the_latest_run():
+    pipeline = StagedPipeline([("check", _reject_odd_inputs, 2)])
+
+    pipeline.run(_Item(value) for value in range(8))
+    pipeline.run(_Item(value) for value in (0, 4))
+
+    assert [(stats.processed, stats.failed) for stats in pipeline.stats] == [(2, 0)]
+
+
+class _Generator:
+    """AutomaticPDFGenerator stand-in whose enhancement fails for one document"""
+
+    def __init__(self):
+        self.pdf_service = self
+        self.strict_calls = []
+
+    def determine_agent_type(self, content):
+        return "professional"
+
+    def pdf_filename(self, title, agent_type, custom_filename=None):
+        return f"enhanced_content/{custom_filename}.pdf"
+
+    def enhance_content(self, content, agent_type, strict=False):
+        self.strict_calls.append(strict)
+        if "broken" in content and strict:
+            raise RuntimeError("comprehensive professional transformation failed")
+        return content.upper()
+
+    def get_or_render_path(self, content, filename, theme=None):
+        return filename
+
+
+def test_failed_enhancement_stops_the_document_at_the_enhance_stage():
+    """The unenhanced source is never rendered when an LLM step fails"""
+    with tempfile.TemporaryDirectory() as directory:
+        items = []
+        for name in ("fine", "broken"):
+            path = os.path.join(directory, f"{name}.md")
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(f"# {name}\n\nbody")
+            items.append(PipelineItem(path, "ebook"))
+        generator = _Generator()
+
+        report = ContentPipeline(generator, upload=False).run(items)
+
+        assert generator.strict_calls == [True, True]
+        assert report["succeeded"] == 1
+        assert list(report["failed"].values()) == ["enhance: comprehensive professional transformation failed"]
+        assert report["stages"]["render"]["processed"] == 1
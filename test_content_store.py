@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Content Store
+Tests compressed storage and lookup of generated content
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from services.content_store import ContentStore
+
+
+def _course(course_id, modules=20):
+    return {
+        "success": True,
+        "course_id": course_id,
+        "modules": [{"title": f"Module {i}", "content": "Lesson text " * 50} for i in range(modules)],
+    }
+
+
+def test_content_round_trips_compressed_by_generated_id():
+    """Payloads are keyed by the generator's id and stored smaller than their JSON"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = ContentStore(os.path.join(directory, "content.sqlite3"))
+
+        content_id = store.save("course", _course("course_1"), expertise_area="Tax", title="Swiss Tax")
+        record = store.get_record(content_id)
+
+        assert content_id == "course_1"
+        assert record["content"] == _course("course_1")
+        assert (record["title"], record["expertise_area"]) == ("Swiss Tax", "Tax")
+        assert record["stored_size"] < record["raw_size"]
+        assert store.get("missing") is None
+
+        with pytest.raises(ValueError):
+            store.save("ebook", {"success": True})
+
+
+def test_listing_filters_by_type_area_and_time():
+    """Listings come back newest first and never include the payload"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = ContentStore(os.path.join(directory, "content.sqlite3"))
+        store.save("course", _course("course_1"), expertise_area="Tax")
+        store.save("ebook", {"book_id": "ebook_1"}, expertise_area="Tax")
+        store.save("course", _course("course_2"), expertise_area="M&A")
+
+        assert [item["content_id"] for item in store.list()] == ["course_2", "ebook_1", "course_1"]
+        assert [item["content_id"] for item in store.list(content_type="course", expertise_area="Tax")] == ["course_1"]
+        assert store.list(since=store.get_record("course_2")["created_at"])[0]["content_id"] == "course_2"
+        assert "content" not in store.list(limit=1)[0]
+
+        assert store.get_stats()["course"]["entries"] == 2
+        assert store.delete("course_1") and not store.delete("course_1")
+
+
+def test_same_second_saves_get_unique_ids():
+    """A colliding generator id is suffixed instead of overwriting the earlier content"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = ContentStore(os.path.join(directory, "content.sqlite3"))
+
+        first = store.save("course", _course("course_1700000000", modules=1), title="First")
+        second = store.save("course", _course("course_1700000000", modules=2), title="Second")
+
+        assert first == "course_1700000000" and second.startswith("course_1700000000_")
+        assert store.get_record(first)["title"] == "First" and len(store.get(first)["modules"]) == 1
+        assert store.get(second)["course_id"] == second and len(store.get(second)["modules"]) == 2
+
+        assert store.save("course", _course(first, modules=3), replace=True) == first
+        assert len(store.get(first)["modules"]) == 3 and len(store.list()) == 2
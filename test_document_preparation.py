@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Test Document Preparation
+Tests the single-pass title scan and the memoized markdown conversion
+"""
+
+from services.document_preparation import DocumentPreparer, find_title
+
+
+def _convert(markdown):
+    _convert.calls += 1
+    return '<h1 id="guide">The <em>Guide</em></h1><h2 id="step-one">Step One</h2>', '<ul><li>Step One</li></ul>'
+
+
+_convert.calls = 0
+
+
+def test_title_is_the_first_top_level_heading():
+    """Only `# ` headings count, wherever the first one appears"""
+    assert find_title("intro\n## Section\n# Real Title \n# Later") == "Real Title"
+    assert find_title("no headings here") == "Enhanced Content"
+    assert find_title("##Tight\ntext", default="") == ""
+
+
+def test_documents_are_converted_once_and_evicted_least_recently_used():
+    """Repeat content hits the memo; the oldest document is dropped past the cap"""
+    preparer = DocumentPreparer(max_entries=2, convert=_convert)
+
+    document = preparer.prepare("# Guide\n\n## Step One")
+    assert document.title == "Guide"
+    assert document.headings == [(1, "The Guide", "guide"), (2, "Step One", "step-one")]
+    assert preparer.prepare("# Guide\n\n## Step One") is document
+    assert _convert.calls == 1
+
+    preparer.prepare("second")
+    preparer.prepare("third")
+    assert preparer.get_stats() == {"entries": 2, "hits": 1, "misses": 3}
+    preparer.prepare("# Guide\n\n## Step One")
+    assert _convert.calls == 4
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test Export Engine
+Tests multi-format exports and the rendition cache
+"""
+
+import os
+import json
+import time
+import zipfile
+import tempfile
+
+from services.content_store import ContentStore
+from services.export_engine import ExportEngine, content_to_markdown
+
+
+EBOOK = {
+    "success": True,
+    "book_id": "ebook_1",
+    "publishing_package": {
+        "manuscript": {
+            "subtitle": "Legal savings",
+            "chapters": [{"title": "Residency & Treaties", "key_points": ["Pick a canton", "File on time"]}],
+        }
+    },
+    "timestamp": "2026-01-01T00:00:00",
+}
+
+
+class FakePDFService:
+    """Stands in for PDFGenerationService and counts renders"""
+
+    def __init__(self):
+        self.renders = 0
+
+    def markdown_to_html(self, markdown, title="", inline_styles=False, **kwargs):
+        self.renders += 1
+        return f"<html><title>{title}</title><body><pre>{markdown}</pre></body></html>"
+
+    def render_to_file(self, markdown, target, **kwargs):
+        self.renders += 1
+        with open(target, 'wb') as handle:
+            handle.write(b"%PDF-1.4 " + markdown.encode('utf-8') * 200)
+        return True
+
+
+def _engine(directory, **kwargs):
+    store = ContentStore(os.path.join(directory, "content.sqlite3"))
+    store.save("ebook", EBOOK, expertise_area="tax_optimization", title="Swiss Tax Advantage")
+    service = FakePDFService()
+    engine = ExportEngine(store, os.path.join(directory, "exports"), pdf_service_factory=lambda: service, **kwargs)
+    return store, service, engine
+
+
+def test_markdown_layout_skips_bookkeeping_fields():
+    """Nested keys become headings, titled list items become sections and ids stay out"""
+    markdown = content_to_markdown(EBOOK, "Swiss Tax Advantage")
+
+    assert markdown.startswith("# Swiss Tax Advantage\n")
+    assert "## Publishing Package" in markdown
+    assert "**Subtitle:** Legal savings" in markdown
+    assert "#### Residency & Treaties" in markdown
+    assert "- Pick a canton" in markdown
+    assert "ebook_1" not in markdown and "Timestamp" not in markdown
+
+
+def test_every_format_renders_once_and_streams_in_chunks():
+    """Renditions are cached on disk, so a repeat download does not render again"""
+    with tempfile.TemporaryDirectory() as directory:
+        _, service, engine = _engine(directory, chunk_size=1024)
+
+        pdf = engine.export("ebook_1", "pdf")
+        again = engine.export("ebook_1", "pdf")
+        chunks = list(engine.iter_chunks(again))
+
+        assert (pdf.path, pdf.etag, service.renders) == (again.path, again.etag, 1)
+        assert len(chunks) > 1 and max(len(chunk) for chunk in chunks) == 1024
+        assert b"".join(chunks) == open(pdf.path, 'rb').read()
+        assert engine.get_stats() == {"hits": 1, "misses": 1}
+
+        assert json.load(open(engine.export("ebook_1", "json").path))["book_id"] == "ebook_1"
+        assert "<title>Swiss Tax Advantage</title>" in open(engine.export("ebook_1", "html").path).read()
+
+        with zipfile.ZipFile(engine.export("ebook_1", "docx").path) as archive:
+            document = archive.read("word/document.xml").decode('utf-8')
+            assert "word/styles.xml" in archive.namelist()
+        assert 'w:val="Heading1"' in document and "Residency &amp; Treaties" in document
+
+        assert engine.export("missing", "pdf") is None and engine.etag("missing", "pdf") is None
+
+
+def test_new_version_changes_etag_and_replaces_old_rendition():
+    """Re-saving the content gives a new ETag; the superseded file goes once it has been idle long enough"""
+    with tempfile.TemporaryDirectory() as directory:
+        store, service, engine = _engine(directory)
+
+        first = engine.export("ebook_1", "pdf")
+        assert engine.etag("ebook_1", "pdf") == first.etag
+        assert engine.etag("ebook_1", "pdf") != engine.etag("ebook_1", "docx")
+        stream = engine.iter_chunks(first)
+
+        store.save("ebook", dict(EBOOK, publishing_package={"manuscript": {"subtitle": "Revised"}}), replace=True)
+        second = engine.export("ebook_1", "pdf")
+
+        assert second.etag != first.etag and service.renders == 2
+        # Just served, so a download of the old version can still finish
+        assert os.path.exists(first.path) and os.path.exists(second.path)
+        assert b"".join(stream) == open(first.path, 'rb').read()
+
+        idle = time.time() - 2 * engine.stale_after
+        os.utime(first.path, (idle, idle))
+        store.save("ebook", dict(EBOOK, publishing_package={"manuscript": {"subtitle": "Third"}}), replace=True)
+        third = engine.export("ebook_1", "pdf")
+
+        assert not os.path.exists(first.path)
+        assert os.path.exists(second.path) and os.path.exists(third.path)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test Fused Transformation
+Tests the single-call analyze+transform+polish request and its response parsing
+"""
+
+import json
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+from services.sympathetic_writing_agent import EnhancementError, GilbertSympatheticWritingAgent, load_json_object
+from services.professional_thought_leader_agent import GilbertProfessionalThoughtLeaderAgent
+from services.llm_response_cache import LLMResponseCache
+
+
+def _response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+class StubCompletions:
+    """Records chat.completions.create calls and answers with a canned reply"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+
+    def create(self, **request):
+        self.requests.append(request)
+        return _response(self.reply)
+
+
+def _echo(request):
+    """Deterministic reply per request, so the sync and async paths can be compared"""
+    return "reply " + hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class AsyncStubCompletions:
+    """AsyncOpenAI stand-in that tracks how many requests are awaited at once"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        return _response(_echo(request))
+
+
+def _client(reply):
+    return SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions(reply)))
+
+
+# gpt-4 without JSON mode: fenced, with a preamble and a raw newline inside the content string
+SYMPATHETIC_REPLY = 'Here you go:\n```json\n{"scores": {"vulnerability_score": 0.2, "emotional_depth": 0.4}, ' \
+                    '"content": "I failed...\nAnd then I learned."}\n```'
+
+
+def test_sympathetic_fused_request_and_parsed_result():
+    """No response_format is sent to gpt-4, and a loosely formatted reply still parses"""
+    client = _client(SYMPATHETIC_REPLY)
+    agent = GilbertSympatheticWritingAgent(openai_client=client, async_openai_client=_client(""))
+
+    analysis, content = agent.transform_and_analyze_sympathetic("Discipline matters.")
+
+    request = client.chat.completions.requests[0]
+    assert request["model"] == "gpt-4" and "response_format" not in request
+    assert "Discipline matters." in request["messages"][1]["content"]
+    assert (analysis.vulnerability_score, analysis.emotional_depth) == (0.2, 0.4)
+    assert content == "I failed...\nAnd then I learned."
+
+
+def test_professional_fused_request_and_parsed_result():
+    reply = json.dumps({"scores": {"executive_authority": 0.3}, "content": "The ROI Framework"})
+    client = _client(reply)
+    agent = GilbertProfessionalThoughtLeaderAgent(openai_client=client)
+
+    analysis, content = agent.transform_and_analyze_professional("Leaders decide.")
+
+    assert "response_format" not in client.chat.completions.requests[0]
+    assert analysis.executive_authority == 0.3 and content == "The ROI Framework"
+
+
+def test_load_json_object_rejects_replies_without_an_object():
+    assert load_json_object(None) == {}
+    with pytest.raises(ValueError):
+        load_json_object("Sorry, I can't help with that.")
+
+
+def test_strict_mode_raises_instead_of_passing_the_input_through():
+    """By default an empty reply falls back to the input; strict=True reports it"""
+    agent = GilbertProfessionalThoughtLeaderAgent(openai_client=_client(""))
+
+    assert agent.transform_and_analyze_professional("Leaders decide.")[1] == "Leaders decide."
+    with pytest.raises(EnhancementError):
+        agent.transform_to_professional_style("Leaders decide.", fused=True, strict=True)
+    with pytest.raises(EnhancementError):
+        agent.transform_to_professional_style("Leaders decide.", strict=True)
+
+
+def test_polish_budget_covers_the_transformed_chunk():
+    """The polish never gets a smaller output budget than the chunk transformation that fed it"""
+    reply = "I failed... and then I learned. " * 300
+    client = _client(reply)
+    agent = GilbertSympatheticWritingAgent(openai_client=client, async_openai_client=_client(""))
+    agent.heuristic_analysis = True
+
+    agent.transform_long_manuscript("# Part one\n\n" + "Discipline matters. " * 100)
+
+    transform, polish = client.chat.completions.requests
+    assert "linguistic pattern specialist" in polish["messages"][0]["content"]
+    assert polish["max_tokens"] >= transform["max_tokens"]
+    assert polish["max_tokens"] > agent.chunker.estimate_tokens(reply)
+
+
+def test_atransform_many_awaits_documents_together_and_matches_the_sync_path():
+    """Up to `concurrency` documents wait on the API at once, and each result equals the sync transformation"""
+    completions = AsyncStubCompletions()
+    sync_client = _client("")
+    sync_client.chat.completions.create = lambda **request: _response(_echo(request))
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    agent = GilbertSympatheticWritingAgent(openai_client=sync_client, async_openai_client=async_client)
+    agent.heuristic_analysis = True
+    contents = [f"Lesson {n}: discipline matters." for n in range(6)]
+
+    results = asyncio.run(agent.atransform_many(contents, concurrency=3))
+
+    assert completions.max_in_flight == 3
+    assert results == [agent.transform_to_sympathetic_style(content) for content in contents]
+    assert len(set(results)) == len(contents)
+
+
+def test_creative_generation_bypasses_the_response_cache():
+    """Repeated generations call the API each time unless cache=True; transformations are still cached"""
+    client = _client("Fresh words.")
+    agent = GilbertProfessionalThoughtLeaderAgent(openai_client=client, response_cache=LLMResponseCache(db_path=None))
+
+    for _ in range(2):
+        agent.generate_professional_content("Cloud strategy")
+        agent.create_strategic_framework("Data mesh")
+    assert len(client.chat.completions.requests) == 4
+
+    for _ in range(2):
+        agent.generate_professional_content("Cloud strategy", cache=True)
+        agent._apply_professional_linguistic_patterns("Leaders decide.")
+    assert len(client.chat.completions.requests) == 6
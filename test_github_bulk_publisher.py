@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test GitHub Bulk Publisher
+Tests single-commit publishing against a local bare repository
+"""
+
+import os
+import subprocess
+import tempfile
+
+from services.github_bulk_publisher import GitHubBulkPublisher, LocalBareRepoBackend, git_blob_sha
+
+
+def _write(path: str, data: bytes) -> str:
+    with open(path, 'wb') as handle:
+        handle.write(data)
+    return path
+
+
+def _commit_count(repo_path: str) -> int:
+    output = subprocess.run(["git", "--git-dir", repo_path, "rev-list", "--count", "refs/heads/main"],
+                            capture_output=True, text=True, check=True).stdout
+    return int(output.strip())
+
+
+def test_blob_sha_matches_git():
+    """Local blob hashing agrees with git hash-object"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write(os.path.join(directory, "book.pdf"), b"%PDF-1.7 test")
+        expected = subprocess.run(["git", "hash-object", path], capture_output=True, text=True, check=True)
+
+        assert git_blob_sha(path) == expected.stdout.strip()
+
+
+def test_publish_is_one_commit_and_skips_unchanged_blobs():
+    """Every publish is a single commit; unchanged files are skipped and no-op publishes make no commit"""
+    with tempfile.TemporaryDirectory() as directory:
+        repo_path = os.path.join(directory, "remote.git")
+        publisher = GitHubBulkPublisher(LocalBareRepoBackend(repo_path), concurrency=4)
+        files = {
+            f"enhanced_ebooks/book-{index}.pdf": _write(os.path.join(directory, f"book-{index}.pdf"),
+                                                        f"PDF {index}".encode())
+            for index in range(3)
+        }
+
+        first = publisher.publish(files, "Add enhanced ebooks")
+        assert first.commit_sha and sorted(first.uploaded) == sorted(files)
+        assert _commit_count(repo_path) == 1
+
+        _write(files["enhanced_ebooks/book-1.pdf"], b"PDF 1, revised")
+        second = publisher.publish(files, "Update one ebook")
+        assert second.uploaded == ["enhanced_ebooks/book-1.pdf"]
+        assert len(second.unchanged) == 2
+        assert _commit_count(repo_path) == 2
+
+        third = publisher.publish(files, "Nothing changed")
+        assert third.commit_sha is None and third.success
+        assert len(third.unchanged) == 3
+        assert _commit_count(repo_path) == 2
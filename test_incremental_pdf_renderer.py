@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test Incremental PDF Renderer
+Tests that chapter fragments are reused regardless of where they land in the book
+"""
+
+import io
+import tempfile
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("weasyprint")
+pypdf = pytest.importorskip("pypdf")
+
+from services import incremental_pdf_renderer
+from services.incremental_pdf_renderer import IncrementalPDFRenderer
+
+
+class _PDFService:
+    css_styles = "body {}"
+    theme_overrides = {}
+
+
+def _blank_pdf(pages):
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class _CountingRenderer(IncrementalPDFRenderer):
+    """Lays out one blank page per 100 characters and records what it laid out"""
+
+    def __init__(self, cache_dir, renderer_version="1"):
+        super().__init__(_PDFService(), cache_dir=cache_dir, renderer_version=renderer_version)
+        self.laid_out = []
+        self.numbered = []
+
+    def _render_fragment(self, section, book_title, theme):
+        self.laid_out.append(section.title or "front matter")
+        return _blank_pdf(1 + len(section.markdown) // 100)
+
+    def _render_page_numbers(self, theme, pages):
+        self.numbered.append(pages)
+        return _blank_pdf(pages)
+
+
+def _book(first_chapter):
+    return "\n".join([
+        "Front matter", "",
+        "# One", first_chapter, "",
+        "# Two", "Second chapter " * 20, "",
+        "# Three", "Third chapter " * 20,
+    ])
+
+
+def test_editing_chapter_one_lays_out_only_chapter_one():
+    """A longer chapter 1 shifts later page numbers, but later fragments are still reused"""
+    with tempfile.TemporaryDirectory() as directory:
+        renderer = _CountingRenderer(directory)
+
+        first = renderer.render(_book("Short."))
+        assert renderer.laid_out == ["front matter", "One", "Two", "Three"]
+
+        renderer.laid_out.clear()
+        edited = renderer.render(_book("Much longer now. " * 30))
+
+        assert renderer.laid_out == ["One"]
+        assert (renderer.last_stats.cache_hits, renderer.last_stats.rendered) == (3, 1)
+        assert len(pypdf.PdfReader(io.BytesIO(edited)).pages) == len(pypdf.PdfReader(io.BytesIO(first)).pages) + 5
+        # Page numbers are stamped for the new total instead of being baked into fragments
+        assert renderer.numbered == [renderer.last_stats.pages - 5, renderer.last_stats.pages]
+
+        renderer.laid_out.clear()
+        renderer.render(_book("Much longer now. " * 30))
+        assert renderer.laid_out == [] and len(renderer.numbered) == 2
+
+
+def test_new_month_and_new_renderer_version_invalidate_fragments(monkeypatch):
+    """The title page's month only affects the front matter; a renderer upgrade affects every fragment"""
+    class _NextMonth(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2099, 1, 15)
+
+    with tempfile.TemporaryDirectory() as directory:
+        _CountingRenderer(directory).render(_book("Short."))
+
+        monkeypatch.setattr(incremental_pdf_renderer, "datetime", _NextMonth)
+        renderer = _CountingRenderer(directory)
+        renderer.render(_book("Short."))
+        assert renderer.laid_out == ["front matter"] and renderer.numbered == []
+
+        upgraded = _CountingRenderer(directory, renderer_version="2")
+        upgraded.render(_book("Short."))
+        assert upgraded.laid_out == ["front matter", "One", "Two", "Three"] and len(upgraded.numbered) == 1
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test Job Queue
+Tests SQLite-backed background jobs
+"""
+
+import os
+import time
+import socket
+import tempfile
+import subprocess
+import sys
+
+from services.job_queue import JobQueue, JobStore
+
+
+def _generate(payload):
+    if payload.get("explode"):
+        raise RuntimeError("boom")
+    if payload.get("silent"):
+        raise ValueError()
+    return {"success": payload.get("ok", True), "title": payload["title"], "error": "agent said no"}
+
+
+def test_jobs_run_in_the_background_and_persist_results():
+    """Succeeded, agent-reported failures and exceptions all end up in the store"""
+    with tempfile.TemporaryDirectory() as directory:
+        queue = JobQueue(JobStore(os.path.join(directory, "jobs.sqlite3")), max_workers=2,
+                         handlers={"ebook": _generate})
+
+        done = queue.submit("ebook", {"title": "Guide"})
+        refused = queue.submit("ebook", {"title": "Other", "ok": False})
+        crashed = queue.submit("ebook", {"title": "Bad", "explode": True})
+        silent = queue.submit("ebook", {"title": "Quiet", "silent": True})
+        queue.shutdown()
+
+        assert queue.get(done)["status"] == "succeeded"
+        assert queue.get(done)["result"]["title"] == "Guide"
+        assert (queue.get(refused)["status"], queue.get(refused)["error"]) == ("failed", "agent said no")
+        assert (queue.get(crashed)["status"], queue.get(crashed)["error"]) == ("failed", "boom")
+        assert (queue.get(silent)["status"], queue.get(silent)["error"]) == ("failed", "ValueError")
+        assert queue.get("missing") is None
+
+
+def test_queued_jobs_survive_a_restart_and_run_once():
+    """Jobs left queued are picked up by the next queue; a claimed job is not run twice"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(os.path.join(directory, "jobs.sqlite3"))
+        job_id = store.create("ebook", {"title": "Queued before restart"})
+
+        calls = []
+        queue = JobQueue(store, handlers={"ebook": lambda payload: calls.append(payload) or {"success": True}})
+        assert queue.resume_queued() == 1
+        queue.resume_queued()
+        queue.shutdown()
+
+        assert store.get(job_id)["status"] == "succeeded"
+        assert len(calls) == 1
+        assert store.counts() == {"succeeded": 1}
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_stale_running_jobs_are_recovered_on_startup():
+    """Orphans of a dead process are requeued, long-running and poison jobs are failed, live ones kept"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(os.path.join(directory, "jobs.sqlite3"))
+        host = socket.gethostname()
+        jobs = {}
+        # (owner, started seconds ago, attempts so far)
+        for name, owner, age, attempts in [
+            ("orphaned", f"{host}:{_dead_pid()}", 5, 1),
+            ("poison", f"{host}:{_dead_pid()}", 5, 3),
+            ("too_long", "other-host:42", 7200, 1),
+            ("elsewhere", "other-host:42", 5, 1),
+        ]:
+            jobs[name] = store.create("ebook", {"title": name})
+            store._execute("UPDATE jobs SET status = 'running', owner = ?, started_at = ?, attempts = ? WHERE id = ?",
+                           (owner, time.time() - age, attempts, jobs[name]))
+
+        calls = []
+        queue = JobQueue(store, handlers={"ebook": lambda payload: calls.append(payload["title"]) or {"success": True}})
+        assert queue.resume_queued() == 1
+        queue.shutdown()
+
+        assert calls == ["orphaned"]
+        assert store.get(jobs["orphaned"])["status"] == "succeeded"
+        assert store.get(jobs["orphaned"])["attempts"] == 2
+        assert store.get(jobs["poison"])["status"] == "failed"
+        assert store.get(jobs["too_long"])["error"].startswith("Abandoned: still running")
+        assert store.get(jobs["elsewhere"])["status"] == "running"
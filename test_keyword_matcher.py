@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test Keyword Matcher
+Tests single-pass whole-word keyword scoring
+"""
+
+from services.keyword_matcher import KeywordMatcher
+
+
+def _matcher():
+    return KeywordMatcher({
+        "professional": ["ai", "strategy", "growth", "data"],
+        "sympathetic": ["learn", "story", "growth", "heart"]
+    })
+
+
+def test_keywords_match_whole_words_only():
+    """"ai" is not found inside "said" or "chair", but inflected keywords still count"""
+    scores = _matcher().score("She said the chair was learning the Stories and Strategies")
+
+    assert scores == {"professional": 0, "sympathetic": 1}
+    assert _matcher().matches("AI drives data; learners share stories")["professional"] == {"ai", "data"}
+
+
+def test_scores_count_distinct_keywords_and_shared_ones_in_both_groups():
+    """Repeats score once; a keyword in both lists scores for both"""
+    matcher = _matcher()
+
+    assert matcher.score("growth growth growth, heart and strategy") == {"professional": 2, "sympathetic": 2}
+    assert matcher.score_many(["data", "a story", ""]) == [
+        {"professional": 1, "sympathetic": 0},
+        {"professional": 0, "sympathetic": 1},
+        {"professional": 0, "sympathetic": 0}
+    ]
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test LLM Instrumentation
+Tests the per-stage token, cost and latency ring buffer
+"""
+
+import time
+from types import SimpleNamespace
+
+from services.llm_instrumentation import LLMInstrumentation
+
+
+def _response(prompt_tokens, completion_tokens):
+    return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens))
+
+
+def test_summary_groups_tokens_and_cache_hits_by_stage():
+    """Tokens come from response.usage and cache hits are counted per stage"""
+    recorder = LLMInstrumentation()
+    request = {"model": "gpt-4"}
+
+    recorder.record("sympathetic", "analyze_content_style", request, time.perf_counter(), "miss", _response(100, 50))
+    recorder.record("sympathetic", "analyze_content_style", request, time.perf_counter(), "hit")
+    recorder.record("sympathetic", "_apply_linguistic_patterns", request, time.perf_counter(), "miss", _response(10, 20))
+
+    summary = recorder.summary()
+    analysis = summary["stages"]["analyze_content_style"]
+
+    assert analysis["calls"] == 2 and analysis["cache_hits"] == 1
+    assert analysis["prompt_tokens"] == 100 and analysis["completion_tokens"] == 50
+    assert analysis["estimated_cost"] == round((100 * 0.03 + 50 * 0.06) / 1000, 6)
+    assert summary["totals"]["calls"] == 3
+
+
+def test_ring_buffer_is_bounded_and_mark_scopes_summaries():
+    """Old records fall out of the buffer and mark() limits a summary to later calls"""
+    recorder = LLMInstrumentation(capacity=3)
+    for _ in range(5):
+        recorder.record("professional", "stage", {"model": "gpt-4"}, time.perf_counter(), "bypass")
+
+    start = recorder.mark()
+    recorder.record("professional", "later", {"model": "gpt-4"}, time.perf_counter(), "bypass")
+
+    assert len(recorder.records()) == 3
+    assert list(recorder.summary(since=start)["stages"]) == ["later"]
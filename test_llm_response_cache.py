@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test LLM Response Cache
+Tests the content-addressed response cache shared by the writing agents
+"""
+
+import os
+import time
+import tempfile
+
+from services.llm_response_cache import LLMResponseCache
+
+
+def _request(user_prompt, temperature=0.7):
+    return {
+        "model": "gpt-4",
+        "messages": [
+            {"role": "system", "content": "You are a writing coach."},
+            {"role": "user", "content": user_prompt}
+        ],
+        "max_tokens": 2000,
+        "temperature": temperature
+    }
+
+
+def test_key_depends_on_every_request_field():
+    """Changing any keyed field must change the cache key"""
+    cache = LLMResponseCache(db_path=None)
+
+    base = cache.key_for_request(_request("chapter one"))
+    assert base == cache.key_for_request(_request("chapter one"))
+    assert base != cache.key_for_request(_request("chapter two"))
+    assert base != cache.key_for_request(_request("chapter one", temperature=0.5))
+
+
+def test_memory_tier_lru_eviction_and_counters():
+    """The memory tier keeps only the most recently used entries"""
+    cache = LLMResponseCache(db_path=None, memory_entries=2)
+
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_disk_tier_survives_new_instance():
+    """Responses written to SQLite are served by a fresh cache instance"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "cache.sqlite3")
+        LLMResponseCache(db_path=db_path).set("key", "enhanced text")
+
+        cache = LLMResponseCache(db_path=db_path)
+        assert cache.get("key") == "enhanced text"
+        assert cache.get("key") == "enhanced text"
+        assert cache.get_stats()["disk_hits"] == 1
+        assert cache.get_stats()["memory_hits"] == 1
+
+
+def test_ttl_and_disk_size_cap():
+    """Expired entries are dropped and the disk tier stays under its size cap"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = LLMResponseCache(db_path=os.path.join(directory, "cache.sqlite3"),
+                                 ttl_seconds=0.05, max_disk_bytes=10)
+        cache.set("short", "12345")
+        cache.set("long", "67890")
+        assert cache.get_stats()["disk_bytes"] <= 10
+
+        time.sleep(0.1)
+        assert cache.get("long") is None
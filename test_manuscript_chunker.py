@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test Manuscript Chunker
+Tests the token-budgeted markdown splitter used for long manuscripts
+"""
+
+from services.manuscript_chunker import MarkdownChunker, map_chunks
+
+
+def _manuscript(chapters=6, paragraphs=5, words=150):
+    sections = []
+    for chapter in range(chapters):
+        sections.append(f"# Chapter {chapter + 1}")
+        for paragraph in range(paragraphs):
+            sections.append(" ".join(f"word{chapter}_{paragraph}_{i}." for i in range(words)))
+    return "\n\n".join(sections)
+
+
+def test_chunks_respect_budget_and_preserve_text():
+    """Every chunk stays within budget and reassembly loses no words"""
+    chunker = MarkdownChunker(max_tokens=900, overlap_tokens=50)
+    manuscript = _manuscript()
+
+    chunks = chunker.split(manuscript)
+
+    assert len(chunks) > 1
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert all(chunk.token_estimate <= chunker.max_tokens * 1.1 for chunk in chunks)
+    assert chunker.reassemble([chunk.text for chunk in chunks]).split() == manuscript.split()
+
+
+def test_headings_start_chunks_and_overlap_is_carried():
+    """Chunks never end on a dangling heading and carry the previous tail as context"""
+    chunker = MarkdownChunker(max_tokens=900, overlap_tokens=50)
+    chunks = chunker.split(_manuscript())
+
+    assert chunks[0].context == ""
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert not previous.text.rstrip().split('\n')[-1].startswith('#')
+        assert chunk.context and previous.text.endswith(chunk.context)
+
+
+def test_oversized_paragraph_is_split():
+    """A single paragraph larger than the budget is broken on sentence boundaries"""
+    chunker = MarkdownChunker(max_tokens=100, overlap_tokens=0)
+    chunks = chunker.split(_manuscript(chapters=1, paragraphs=1, words=400))
+
+    assert len(chunks) > 2
+    assert all(chunk.token_estimate <= 100 for chunk in chunks)
+
+
+def test_map_chunks_keeps_order():
+    """Concurrent transformation returns results in chunk order"""
+    chunker = MarkdownChunker(max_tokens=200, overlap_tokens=0)
+    chunks = chunker.split(_manuscript(chapters=3))
+
+    results = map_chunks(chunks, lambda chunk: str(chunk.index), concurrency=4)
+
+    assert results == [str(chunk.index) for chunk in chunks]
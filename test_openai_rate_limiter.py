@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test OpenAI Rate Limiter
+Tests bucket refill, Retry-After handling and retries with a fake clock
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.openai_rate_limiter import OpenAIRateLimiter, retry_after_seconds
+
+
+class FakeClock:
+    """Time that only moves when the limiter sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+class APIStatusError(Exception):
+    """Shaped like the OpenAI client's HTTP errors"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def _limiter(clock, **kwargs):
+    return OpenAIRateLimiter(clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+
+def _flaky(errors, result="ok"):
+    """A call that raises each of `errors` in turn, then returns `result`"""
+    remaining = list(errors)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+    return call, calls
+
+
+def test_bucket_refills_at_its_per_minute_rate():
+    """An empty 60 rpm bucket makes the next caller wait one second, and refills with time"""
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=60, tokens_per_minute=10 ** 6)
+
+    for _ in range(60):
+        assert limiter.acquire(1) == 0.0
+    assert limiter.acquire(1) == pytest.approx(1.0)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+    clock.now += 30
+    for _ in range(30):
+        assert limiter.acquire(1) == 0.0
+    assert limiter.acquire(1) > 0
+
+    metrics = limiter.get_metrics()
+    assert (metrics["total_requests"], metrics["throttled_requests"], metrics["queue_depth"]) == (92, 2, 0)
+
+
+def test_token_budget_throttles_large_requests():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=1000, tokens_per_minute=6000)
+
+    assert limiter.acquire(6000) == 0.0
+    assert limiter.acquire(600) == pytest.approx(6.0)
+
+
+def test_retry_after_header_sets_the_delay():
+    """A 429 with Retry-After waits exactly what the server asked, capped at max_delay"""
+    clock = FakeClock()
+    limiter = _limiter(clock, max_delay=30.0)
+    call, calls = _flaky([APIStatusError(429, {"retry-after": "7"}),
+                          APIStatusError(503, {"retry-after-ms": "250"}),
+                          APIStatusError(429, {"retry-after": "120"})])
+
+    assert limiter.run(call, estimated_tokens=10) == "ok"
+
+    assert len(calls) == 4
+    assert clock.sleeps == [7.0, 0.25, 30.0]
+    metrics = limiter.get_metrics()
+    assert (metrics["retries"], metrics["rate_limited_responses"], metrics["failed_requests"]) == (3, 2, 0)
+
+
+def test_gives_up_after_max_attempts_and_on_client_errors():
+    clock = FakeClock()
+    limiter = _limiter(clock, max_retries=2, base_delay=1.0)
+    call, calls = _flaky([APIStatusError(500)] * 5)
+
+    with pytest.raises(APIStatusError):
+        limiter.run(call, estimated_tokens=10)
+    assert len(calls) == 3
+    # Full jitter: each backoff is within its doubling ceiling
+    assert len(clock.sleeps) == 2 and clock.sleeps[0] <= 1.0 and clock.sleeps[1] <= 2.0
+
+    call, calls = _flaky([APIStatusError(400)])
+    with pytest.raises(APIStatusError):
+        limiter.run(call, estimated_tokens=10)
+    assert len(calls) == 1 and limiter.get_metrics()["failed_requests"] == 2
+
+
+def test_async_twin_retries_and_throttles_without_real_sleeps():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=60, tokens_per_minute=10 ** 6, max_retries=1)
+    sync_call, calls = _flaky([APIStatusError(429, {"retry-after": "2"})], result="done")
+
+    async def call():
+        return sync_call()
+
+    async def main():
+        for _ in range(60):
+            await limiter.aacquire(1)
+        return await limiter.arun(call, estimated_tokens=1)
+
+    assert asyncio.run(main()) == "done"
+    # One second for the emptied request bucket, then the two the server asked for
+    assert clock.sleeps == [pytest.approx(1.0), 2.0]
+    assert len(calls) == 2
+
+    failing, _ = _flaky([APIStatusError(502)] * 3)
+
+    async def always_fails():
+        return failing()
+
+    with pytest.raises(APIStatusError):
+        asyncio.run(limiter.arun(always_fails, estimated_tokens=1))
+
+
+def test_retry_after_accepts_http_dates_and_ignores_garbage():
+    assert retry_after_seconds(APIStatusError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(APIStatusError(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError("no response")) is None
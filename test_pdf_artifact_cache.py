@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test PDF Artifact Cache
+Tests the content-hash cache of rendered PDFs
+"""
+
+import os
+import time
+import tempfile
+
+from services.pdf_artifact_cache import PDFArtifactCache
+
+
+def test_key_covers_content_css_and_renderer_version():
+    """Any change to content, stylesheet or renderer version yields a new key"""
+    base = PDFArtifactCache.make_key("# Book", "body {}", "1/61.0", theme="default")
+
+    assert base == PDFArtifactCache.make_key("# Book", "body {}", "1/61.0", theme="default")
+    assert base != PDFArtifactCache.make_key("# Book!", "body {}", "1/61.0", theme="default")
+    assert base != PDFArtifactCache.make_key("# Book", "h1 {}", "1/61.0", theme="default")
+    assert base != PDFArtifactCache.make_key("# Book", "body {}", "2/61.0", theme="default")
+    assert base != PDFArtifactCache.make_key("# Book", "body {}", "1/61.0", theme="professional")
+
+
+def test_least_recently_used_artifacts_are_evicted():
+    """Reads refresh recency, and the oldest artifact goes once the cap is exceeded"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PDFArtifactCache(directory, max_bytes=250)
+        cache.set("a", b"a" * 100)
+        cache.set("b", b"b" * 100)
+        past = time.time() - 60
+        os.utime(os.path.join(directory, "a.pdf"), (past, past))
+        os.utime(os.path.join(directory, "b.pdf"), (past - 60, past - 60))
+
+        assert cache.get("b") == b"b" * 100
+        cache.set("c", b"c" * 100)
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None and cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+        assert not [name for name in os.listdir(directory) if name.endswith('.tmp')]
+
+
+def test_artifacts_unread_past_the_age_limit_are_evicted():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PDFArtifactCache(directory, max_age_seconds=3600)
+        cache.set("old", b"old")
+        past = time.time() - 7200
+        os.utime(os.path.join(directory, "old.pdf"), (past, past))
+
+        cache.set("new", b"new")
+
+        assert cache.get("old") is None and cache.get("new") == b"new"
+        assert cache.get_stats()["evictions"] == 1
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test PDF Generation Service
+Tests the GitHub session's retry policy and contents API uploads
+"""
+
+import json
+import base64
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("weasyprint")
+pytest.importorskip("requests")
+urllib3 = pytest.importorskip("urllib3")
+
+from urllib3.exceptions import MaxRetryError
+
+from services.github_bulk_publisher import git_blob_sha_of_bytes
+from services.pdf_generation_service import PDFGenerationService, create_github_session
+
+
+def _retry():
+    return create_github_session().get_adapter("https://api.github.com").max_retries
+
+
+def _response(status, headers=None):
+    return urllib3.response.HTTPResponse(body=b"", status=status, headers=headers or {}, preload_content=False)
+
+
+def test_only_idempotent_methods_are_retried_on_server_errors():
+    retry = _retry()
+
+    assert retry.is_retry("GET", 502) and retry.is_retry("PUT", 503) and retry.is_retry("GET", 429)
+    assert not retry.is_retry("POST", 502) and not retry.is_retry("PATCH", 500)
+    assert not retry.is_retry("PUT", 409) and not retry.is_retry("PUT", 422)
+
+
+def test_forbidden_is_retried_only_when_rate_limited():
+    """A permissions 403 comes straight back; primary and secondary rate limits are retried"""
+    retry = _retry()
+    url = "https://api.github.com/repos/o/r/contents/a.pdf"
+
+    with pytest.raises(MaxRetryError):
+        retry.increment("PUT", url, response=_response(403))
+
+    assert retry.increment("PUT", url, response=_response(403, {"Retry-After": "1"})).total == retry.total - 1
+    assert retry.increment("GET", url, response=_response(403, {"X-RateLimit-Remaining": "0"})).total == retry.total - 1
+
+
+class _ContentsSession:
+    """In-memory stand-in for the contents API: GET returns the blob SHA, PUT requires it to replace"""
+
+    def __init__(self):
+        self.files = {}
+        self.puts = []
+
+    def get(self, url, timeout=None):
+        if url not in self.files:
+            return SimpleNamespace(status_code=404)
+        return SimpleNamespace(status_code=200, json=lambda: {"sha": git_blob_sha_of_bytes(self.files[url])},
+                               raise_for_status=lambda: None)
+
+    def put(self, url, data=None, timeout=None, headers=None, **kwargs):
+        body = kwargs["json"] if "json" in kwargs else json.loads(data.read())
+        self.puts.append(body)
+        if url in self.files and body.get("sha") != git_blob_sha_of_bytes(self.files[url]):
+            return SimpleNamespace(status_code=422)
+        created = url not in self.files
+        self.files[url] = base64.b64decode(body["content"])
+        return SimpleNamespace(status_code=201 if created else 200)
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setenv("PDF_ARTIFACT_CACHE", str(tmp_path / "artifacts"))
+    monkeypatch.setenv("PDF_FRAGMENT_CACHE", str(tmp_path / "fragments"))
+    service = PDFGenerationService()
+    service.session = _ContentsSession()
+    return service
+
+
+def test_reupload_sends_the_existing_sha_and_skips_identical_files(service, tmp_path):
+    """Replacing a file passes its blob SHA; re-sending the same bytes makes no commit"""
+    path = tmp_path / "book.pdf"
+
+    for version in (b"%PDF-1 first", b"%PDF-1 second", b"%PDF-1 second"):
+        path.write_bytes(version)
+        assert service.upload_file_to_github(str(path), "enhanced/book.pdf")
+
+    assert [("sha" in put) for put in service.session.puts] == [False, True]
+    assert service.session.puts[1]["sha"] == git_blob_sha_of_bytes(b"%PDF-1 first")
+
+    assert service.upload_pdf_to_github(b"%PDF-1 third", "enhanced/book.pdf")
+    assert service.upload_pdf_to_github(b"%PDF-1 third", "enhanced/book.pdf")
+    assert len(service.session.puts) == 3 and service.session.puts[2]["sha"] == git_blob_sha_of_bytes(b"%PDF-1 second")
+
+    results = service.upload_many({"enhanced/book.pdf": str(path), "enhanced/new.pdf": str(path)})
+    assert [(result.success, result.unchanged) for result in results] == [(True, False), (True, False)]
+    assert len(service.session.puts) == 5
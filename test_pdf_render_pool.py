@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test PDF Render Pool
+Tests that worker processes render to disk and return paths
+"""
+
+import os
+import tempfile
+
+from services.pdf_render_pool import PDFRenderPool
+
+
+class _TextRenderer:
+    """Trivial worker service: writes the content to a file named after its hash"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_or_render_path(self, content, filename, content_type="markdown", theme=None):
+        if "fail" in content:
+            return None
+        path = os.path.join(self.directory, f"{abs(hash((content, theme)))}.pdf")
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(f"{os.getpid()}|{theme}|{content}")
+        return path
+
+
+class _RendererFactory:
+    """Picklable factory, so it works with every start method"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self):
+        return _TextRenderer(self.directory)
+
+
+def test_workers_render_in_parallel_processes_and_return_paths():
+    with tempfile.TemporaryDirectory() as directory:
+        with PDFRenderPool(max_workers=2, service_factory=_RendererFactory(directory)) as pool:
+            paths = pool.render_many(["one", {"content": "two", "theme": "professional"}, "fail"])
+            single = pool.submit("three").result()
+
+        assert paths[2] is None
+        contents = [open(path, encoding='utf-8').read().split("|") for path in paths[:2] + [single]]
+        assert [(theme, content) for _, theme, content in contents] == [
+            ("None", "one"), ("professional", "two"), ("None", "three")
+        ]
+        assert str(os.getpid()) not in {pid for pid, _, _ in contents}
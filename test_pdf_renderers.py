@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test Draft Renderers
+Tests the fast preview backends that skip WeasyPrint layout
+"""
+
+import re
+
+from services.pdf_renderers import DraftHTMLRenderer, DraftPDFRenderer
+
+
+class _Service:
+    def markdown_title(self, content):
+        return "Book"
+
+    def markdown_to_html(self, markdown_content, title="", inline_styles=False, theme=None):
+        return f"<html><style>{theme}</style><h1>{title}</h1>{markdown_content}</html>"
+
+
+def test_draft_pdf_is_paginated_with_valid_xref():
+    """Long manuscripts span several pages and every xref offset points at its object"""
+    manuscript = "# Title\n\n" + "\n\n".join(f"## Section {i}\n\n" + "A (long) sentence. " * 60 for i in range(20))
+
+    pdf = DraftPDFRenderer().render(_Service(), manuscript)
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    page_count = int(re.search(rb"/Count (\d+)", pdf).group(1))
+    assert page_count > 3
+
+    xref_offset = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    offsets = re.findall(rb"(\d{10}) 00000 n", pdf[xref_offset:])
+    for number, offset in enumerate(offsets, start=1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+    assert b"\\(long\\)" in pdf
+
+
+def test_draft_html_inlines_the_theme():
+    """The HTML draft is the themed document with styles inlined"""
+    html = DraftHTMLRenderer().render(_Service(), "body text", theme="sympathetic")
+
+    assert html.decode('utf-8') == "<html><style>sympathetic</style><h1>Book</h1>body text</html>"
+
+
+def test_draft_pdf_encodes_text_as_win_ansi():
+    """Curly quotes, dashes and ellipses survive as their WinAnsi codes; unmapped text becomes '?'"""
+    pdf = DraftPDFRenderer().render(_Service(), "It’s “FLOW” — wait… 漢")
+
+    assert b"It\x92s \x93FLOW\x94 \x97 wait\x85 ?" in pdf
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test Publish Manifest
+Tests that resume only redoes stale or failed stages
+"""
+
+import os
+import tempfile
+
+from services.publish_manifest import ManifestPublisher, PublishManifest
+
+
+class _Agent:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def transform_to_professional_style(self, content, target_enhancement="comprehensive", strict=False):
+        self.calls += 1
+        if self.fail:
+            assert strict, "the publisher must ask for failures instead of a pass-through"
+            raise RuntimeError("comprehensive professional transformation failed: rate limited")
+        return content.upper()
+
+
+class _PDFService:
+    def __init__(self):
+        self.renders = 0
+        self.published = []
+        self.fail_publish = False
+
+    def render_to_file(self, content, target, content_type="markdown", theme=None):
+        self.renders += 1
+        with open(target, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return True
+
+    def publish_files(self, files, commit_message, branch="main"):
+        if self.fail_publish:
+            return False
+        self.published.append(sorted(files))
+        return True
+
+
+def _setup(directory):
+    sources = []
+    for name in ("one", "two"):
+        path = os.path.join(directory, f"{name}.md")
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(f"# {name}\n\nbody of {name}")
+        sources.append(path)
+
+    manifest = PublishManifest(os.path.join(directory, "work", "manifest.json"))
+    for path in sources:
+        manifest.add(path, f"enhanced_ebooks/{os.path.basename(path)}.pdf", "professional")
+    agent, pdf_service = _Agent(), _PDFService()
+    return sources, ManifestPublisher(manifest, {"professional": agent}, pdf_service), agent, pdf_service
+
+
+def test_resume_only_redoes_changed_documents():
+    """A finished manifest is a no-op; an edited source reruns only its own stages"""
+    with tempfile.TemporaryDirectory() as directory:
+        sources, publisher, agent, pdf_service = _setup(directory)
+
+        first = publisher.resume()
+        assert (first["enhance"], first["render"], first["upload"]) == (2, 2, 2)
+
+        assert publisher.resume()["skipped"] == 2
+        assert agent.calls == 2 and pdf_service.renders == 2
+
+        with open(sources[0], 'a', encoding='utf-8') as handle:
+            handle.write("\n\nnew paragraph")
+        # A fresh manifest object proves the state survives a restart
+        reloaded = ManifestPublisher(PublishManifest(publisher.manifest.path), publisher.agents, pdf_service)
+        third = reloaded.resume()
+        assert (third["enhance"], third["render"], third["upload"], third["skipped"]) == (1, 1, 1, 1)
+        assert pdf_service.published[-1] == ["enhanced_ebooks/one.md.pdf"]
+
+
+def test_failed_upload_is_retried_without_enhancing_again():
+    """After an upload outage only the upload stage runs again"""
+    with tempfile.TemporaryDirectory() as directory:
+        _, publisher, agent, pdf_service = _setup(directory)
+
+        pdf_service.fail_publish = True
+        assert publisher.resume()["failed"] == 2
+        assert publisher.get_status()["status_counts"] == {"failed": 2}
+
+        pdf_service.fail_publish = False
+        summary = publisher.resume()
+        assert (summary["enhance"], summary["render"], summary["upload"]) == (0, 0, 2)
+        assert agent.calls == 2 and pdf_service.renders == 2
+        assert publisher.get_status()["status_counts"] == {"published": 2}
+
+
+def test_failed_enhancement_is_not_recorded_and_resumes():
+    """A failed LLM step leaves no enhanced_hash, so the next resume enhances it properly"""
+    with tempfile.TemporaryDirectory() as directory:
+        _, publisher, agent, pdf_service = _setup(directory)
+
+        agent.fail = True
+        summary = publisher.resume()
+        assert (summary["failed"], summary["enhance"], pdf_service.renders) == (2, 0, 0)
+        assert all(not entry.enhanced_hash for entry in publisher.manifest.entries.values())
+        assert all(failure.startswith("enhance:") for failure in publisher.get_status()["failed"].values())
+
+        agent.fail = False
+        summary = publisher.resume()
+        assert (summary["enhance"], summary["render"], summary["upload"]) == (2, 2, 2)
+        for entry in publisher.manifest.entries.values():
+            with open(publisher.manifest.enhanced_path(entry), encoding='utf-8') as handle:
+                assert handle.read() == open(entry.source_path, encoding='utf-8').read().upper()
+            assert entry.enhanced_hash and entry.status == "published"